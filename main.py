@@ -3,13 +3,14 @@ import time
 
 from scripts.consts.model import NN_MODEL, FUNC_MODEL
 from scripts.loaders import load_embedder_from_model_path, load_model_from_path, load_embedder_by_name, \
-    load_distance_method
+    load_distance_method, load_graph
 from wikisearch.astar import Astar
+from wikisearch.consts.paths import PATH_TO_GRAPH_SNAPSHOT
 from wikisearch.costs.uniform_cost import UniformCost
-from wikisearch.graph import WikiGraph
 from wikisearch.heuristics import BFSHeuristic
 from wikisearch.heuristics.nn_heuristic import NNHeuristic
-from wikisearch.strategies import DefaultAstarStrategy
+from wikisearch.strategies import DefaultAstarStrategy, HeapAstarStrategy
+from wikisearch.utils.vector_store import VectorStore
 
 if __name__ == '__main__':
     """
@@ -22,12 +23,18 @@ if __name__ == '__main__':
     parser.add_argument('-c', '--cost', default=1, help='The cost price')
     parser.add_argument('-t', '--time_limit', type=float,
                         help="Time limit (seconds) for source-dest distance calculation")
+    parser.add_argument('-cg', '--compact-graph', action='store_true', help='Use the compact (CSR) graph')
+    parser.add_argument('-gs', '--graph-snapshot', default=PATH_TO_GRAPH_SNAPSHOT,
+                        help='Path to a graph snapshot directory (created if doesn\'t exist)')
+    parser.add_argument('-hs', '--heap-open-set', action='store_true', help='Keep A*\'s open set as a binary heap')
     subparsers = parser.add_subparsers(help='sub-command help', dest="model_type")
 
     # Creates the parser for a nn model
     nn_parser = subparsers.add_parser(NN_MODEL, help='nn_model help')
     nn_parser.add_argument('-m', '--model', required=True, help='Path to the model file. When running from linux '
                                                                 '- notice to not put a \'/\' after the file name')
+    nn_parser.add_argument('-enc', '--encodings', help='Path to a store of the pages\' encodings by the model, '
+                                                       'created by scripts/encode_the_graph.py')
 
     # Creates the parser for a distance heuristic model
     dist_h_parser = subparsers.add_parser(FUNC_MODEL, help='func_model help')
@@ -37,13 +44,14 @@ if __name__ == '__main__':
     args = parser.parse_args()
 
     cost = UniformCost(int(args.cost))
-    strategy = DefaultAstarStrategy()
-    graph = WikiGraph()
+    strategy = HeapAstarStrategy() if args.heap_open_set else DefaultAstarStrategy()
+    graph = load_graph(args.compact_graph, args.graph_snapshot)
 
     if args.model_type == NN_MODEL:
         embedder = load_embedder_from_model_path(args.model)
         model = load_model_from_path(args.model)
-        heuristic = NNHeuristic(model, embedder)
+        encodings = VectorStore.load(args.encodings) if args.encodings else None
+        heuristic = NNHeuristic(model, embedder, encodings)
     if args.distance_heuristic == "BFSHeuristic":
         heuristic = BFSHeuristic()
     else:
@@ -0,0 +1,75 @@
+import argparse
+import os
+import time
+
+import numpy as np
+
+from scripts.loaders import load_embedder_by_name, load_graph
+from scripts.utils import print_progress_bar
+from wikisearch.consts.mongo import ENTRY_TITLE, ENTRY_EMBEDDING
+from wikisearch.consts.paths import PATH_TO_GRAPH_SNAPSHOT, PATH_TO_EMBEDDINGS_STORES
+from wikisearch.embeddings import AVAILABLE_EMBEDDINGS, CategoriesMultiHot
+from wikisearch.utils.vector_store import VectorStore, STORE_META
+
+if __name__ == "__main__":
+    """
+    Builds the embeddings stores into the directory of WIKISEARCH_EMBEDDINGS_STORES. The rows of the stores are
+    ordered as the graph's nodes ids. Concatenated embeddings are built out of the stores of their parts, so the
+    parts should be built first
+    """
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--embeddings", required=True, choices=AVAILABLE_EMBEDDINGS, nargs="+")
+    parser.add_argument("-b", "--batch", default=1000, type=int)
+    parser.add_argument('-gs', '--graph-snapshot', default=PATH_TO_GRAPH_SNAPSHOT,
+                        help='Path to a graph snapshot directory (created if doesn\'t exist)')
+    parser.add_argument('--overwrite', action='store_true')
+    args = parser.parse_args()
+
+    if not PATH_TO_EMBEDDINGS_STORES:
+        raise ValueError("WIKISEARCH_EMBEDDINGS_STORES is not set")
+
+    graph = load_graph(compact=True, snapshot_path=args.graph_snapshot)
+    titles = list(graph.keys())
+    for embedding in args.embeddings:
+        embedder = load_embedder_by_name(embedding, save_to_db=False)
+        if isinstance(embedder, CategoriesMultiHot):
+            # Categories are kept as indices, and a store of their multi-hot vectors would be huge
+            print(f"-INFO- {embedding} is kept sparse, without a store")
+            continue
+        store_path = embedder.get_store_path()
+        if embedder.store is not None:
+            if not args.overwrite:
+                print(f"-INFO- {embedding} store already exists in {store_path}")
+                continue
+            # The existing store is memory-mapped by the embedder, so it's dropped before overwriting it
+            os.remove(os.path.join(store_path, STORE_META))
+            embedder = load_embedder_by_name(embedding, save_to_db=False)
+
+        store = None
+        filled = np.zeros(len(titles), dtype=bool)
+        start = time.time()
+        # Embeddings which are in the database are copied as is, by streaming the collection
+        documents = embedder._mongo_handler_embeddings.get_all_documents().batch_size(args.batch)
+        for document in documents:
+            node_id = graph.get_node_id(document[ENTRY_TITLE])
+            if node_id is None or graph.titles[node_id] != document[ENTRY_TITLE]:
+                continue
+            vector = embedder._decode_vector(document[ENTRY_EMBEDDING]).cpu().numpy()
+            if store is None:
+                store = VectorStore.create(store_path, titles, vector.shape, embedding=embedding)
+            store.vectors[node_id] = vector
+            filled[node_id] = True
+
+        # The rest of the pages are embedded now. They are not cached by the embedder, so they don't pile up in memory
+        missing_ids = np.flatnonzero(~filled)
+        for idx, node_id in enumerate(missing_ids, 1):
+            page = embedder._mongo_handler_pages.get_page(titles[node_id])
+            vector = embedder._embed(page).cpu().numpy()
+            if store is None:
+                store = VectorStore.create(store_path, titles, vector.shape, embedding=embedding)
+            store.vectors[node_id] = vector
+            print_progress_bar(idx, len(missing_ids), time.time() - start, prefix=f'Embedding {embedding}',
+                               length=50, interval=args.batch)
+        store.finalize()
+        print(f"-INFO- Saved {embedding} store to {store_path} ({len(titles) - len(missing_ids)} embeddings were "
+              f"copied from the database, {len(missing_ids)} were embedded)")
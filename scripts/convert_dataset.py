@@ -0,0 +1,23 @@
+import argparse
+
+from wikisearch.pairs_dataset import csv_to_pairs, is_pairs_dataset, pairs_to_csv
+
+if __name__ == "__main__":
+    """
+    Converts a dataset CSV to a pairs dataset, which is loaded without parsing its titles, or a pairs dataset back
+    to a CSV
+    """
+    parser = argparse.ArgumentParser()
+    parser.add_argument('-i', '--input', required=True, help='Path to the dataset to convert')
+    parser.add_argument('-o', '--out', required=True, help='Path to the converted dataset')
+    parser.add_argument('-gs', '--graph-snapshot',
+                        help='Path to a graph snapshot, whose nodes\' ids the pairs dataset would reference, instead '
+                             'of keeping its own titles')
+    args = parser.parse_args()
+
+    if is_pairs_dataset(args.input):
+        print(f"-INFO- Converting pairs dataset '{args.input}' to CSV '{args.out}'")
+        pairs_to_csv(args.input, args.out)
+    else:
+        print(f"-INFO- Converting CSV '{args.input}' to pairs dataset '{args.out}'")
+        csv_to_pairs(args.input, args.out, args.graph_snapshot)
@@ -0,0 +1,21 @@
+import argparse
+
+from wikisearch.consts.paths import PATH_TO_PRETRAINED_FASTTEXT_MODEL, PATH_TO_PRETRAINED_WORD2VEC_MODEL
+from wikisearch.utils.word_vectors import convert_word_vectors, get_word_vectors_store_path
+
+if __name__ == "__main__":
+    """
+    Converts the pretrained vectors to memory-mappable vector stores, once, before starting the processes which
+    load them. Otherwise they're converted by the first embedder which loads them
+    """
+    parser = argparse.ArgumentParser()
+    parser.add_argument('-p', '--pretrained', nargs='+',
+                        default=[path for path in [PATH_TO_PRETRAINED_WORD2VEC_MODEL, PATH_TO_PRETRAINED_FASTTEXT_MODEL]
+                                 if path],
+                        help='Paths to pretrained vectors in word2vec format')
+    args = parser.parse_args()
+
+    for pretrained_path in args.pretrained:
+        store_path = get_word_vectors_store_path(pretrained_path)
+        print(f"-INFO- Converting '{pretrained_path}' to '{store_path}'")
+        convert_word_vectors(pretrained_path, store_path)
@@ -3,69 +3,24 @@ import os
 import random
 import time
 from collections import defaultdict
+from functools import partial
+from multiprocessing import Pool
 
 import matplotlib.pyplot as plt
 import numpy as np
 import pandas as pd
 import tabulate
 
-from scripts.utils import print_progress_bar
-from wikisearch.graph import WikiGraph
+from scripts.dataset_generation import rnd_generator, _worker, generate_rows, init_worker, generate_sharded_dataset
+from scripts.loaders import load_graph
+from wikisearch.consts.paths import PATH_TO_GRAPH_SNAPSHOT
+from wikisearch.pairs_dataset import create_csv_writer
 
 # Options used for printing dataset summaries and statistics
 pd.set_option('display.max_columns', 10)
 pd.set_option('precision', 2)
 
 dataset_types = ['train', 'validation', 'test']
-rnd_generator = random.Random()
-
-
-def find_at_distance(graph, source_node, desired_distance):
-    """
-    Find a node at desired distance from source node
-    :param graph: wikisearch.WikiGraph instance
-    :param source_node: wikisearch.GraphNode instance of source page
-    :param desired_distance: distance (minimal) at which a node should be found
-    :return: node at desired distance / shorter, if there are no nodes at such distance, and the real distance
-    """
-    if not list(graph.get_node_neighbors(source_node)):
-        return None, 0, 0, 0
-
-    actual_distance = 0
-    nodes_developed = 0
-    current_distance_nodes = {source_node}
-    all_nodes = set(current_distance_nodes)
-    nodes_at_distances = []
-    developed_at_distances = []
-    times_at_distances = []
-
-    start = time.time()
-    while actual_distance < desired_distance:
-        # If neighbor has been found before, then there's a shorter path, and we don't add it to current
-        # distance
-        next_distance_nodes = [neighbor for node in current_distance_nodes
-                               for neighbor in graph.get_node_neighbors(node)]
-        nodes_developed += len(next_distance_nodes)
-        # After getting the number of nodes developed, we can get rid of duplicate nodes in the list
-        next_distance_nodes = set(next_distance_nodes)
-        next_distance_nodes = next_distance_nodes - all_nodes
-        if not next_distance_nodes:
-            # No neighboring nodes (in shortest distance), so we break and choose one at random
-            break
-        nodes_at_distances.append(next_distance_nodes)
-        developed_at_distances.append(nodes_developed)
-        all_nodes.update(next_distance_nodes)
-        times_at_distances.append(time.time() - start)
-        actual_distance += 1
-        current_distance_nodes = next_distance_nodes
-
-    if actual_distance == 0:
-        return None, 0, 0, 0
-
-    actual_distance = desired_distance if actual_distance == desired_distance else rnd_generator.randint(1, actual_distance)
-    index = actual_distance - 1
-    # Return a random neighbor at actual_distance (which may also be desired distance) away from source page
-    return rnd_generator.choice(list(nodes_at_distances[index])), actual_distance, developed_at_distances[index], times_at_distances[index]
 
 
 if __name__ == '__main__':
@@ -75,17 +30,45 @@ if __name__ == '__main__':
     parser.add_argument('--seed', '-s', type=int, help='Seed used by random generator')
     parser.add_argument('--out', '-o', required=True, help='Output dir path')
     parser.add_argument('--max-distance', '-d', type=int, default=20, help='Maximum distance to search for')
+    parser.add_argument('--compact-graph', '-cg', action='store_true', help='Use the compact (CSR) graph')
+    parser.add_argument('--graph-snapshot', '-gs', default=PATH_TO_GRAPH_SNAPSHOT,
+                        help='Path to a graph snapshot directory (created if doesn\'t exist)')
+    parser.add_argument('--rows-per-source', '-rps', type=int,
+                        help='Sample up to this number of rows, at different distances, from one BFS of each source. '
+                             'If not given, each row is sampled from a BFS of its own')
+    parser.add_argument('--multi-source-bfs', '-ms', action='store_true',
+                        help='With --rows-per-source, run the BFS of 64 sources at once (requires --compact-graph)')
+    parser.add_argument('--distance-weights', '-dw', type=float, nargs='+',
+                        help='Weights of the distances from 1 to max distance, by which the rows are divided between '
+                             'them when sampling several rows per source. Equal weights by default')
+    parser.add_argument('--workers', '-w', type=int,
+                        help='Generate the datasets in shards, by this number of worker processes. The rows depend '
+                             'only on the seed and the shard size, not on the number of workers')
+    parser.add_argument('--shard-size', type=int, default=10000, help='Number of rows in a shard')
+    parser.add_argument('--max-misses', type=int, default=1000,
+                        help='Number of consecutive sources which don\'t reach any distance still needed, after which '
+                             'the farthest distance\'s quota moves to a shorter distance')
     args = parser.parse_args()
 
     if args.max_distance < 1:
         raise ValueError('Distance is not a positive integer')
+    if args.distance_weights is not None and len(args.distance_weights) != args.max_distance:
+        raise ValueError('There should be a weight for each distance, from 1 to max distance')
+    if args.multi_source_bfs and (args.rows_per_source is None or not args.compact_graph):
+        raise ValueError('Multi-source BFS requires --rows-per-source and --compact-graph')
 
     os.makedirs(args.out, exist_ok=True)
 
     rnd_generator.seed(args.seed)  # If args.seed is None, system's time is used (default behavior)
+    # Shards are seeded by seeds derived from one base seed
+    base_seed = args.seed if args.seed is not None else random.SystemRandom().getrandbits(64)
 
-    graph = WikiGraph()
+    graph = load_graph(args.compact_graph, args.graph_snapshot)
     graph_keys = sorted(graph.keys())
+    # Workers are forked after the graph is loaded, so they share it
+    _worker.update(graph=graph, graph_keys=graph_keys)
+    pool = Pool(args.workers, init_worker, (args, partial(load_graph, args.compact_graph, args.graph_snapshot))) \
+        if args.workers else None
 
     entire_start = time.time()
     distances = defaultdict(list)
@@ -95,33 +78,25 @@ if __name__ == '__main__':
     # Go over all types of datasets
     for dataset_type, num_records in zip(dataset_types, args.num_records):
         dataset_start = time.time()
-        dataset = []
+        # Define path to save dataset to
+        dataset_path = os.path.abspath(os.path.join(args.out, dataset_type + '.csv'))
         # Build current dataset
-        for i in range(num_records):
-            dest = None
-            source = None
-            desired_distance = rnd_generator.randint(1, args.max_distance)
-            distance, runtime, developed = 0, 0, 0
-            while dest is None:  # This is to make sure that the source node actually has neighbors in the first place
-                source = rnd_generator.choice(graph_keys)
-                dest, distance, developed, runtime = find_at_distance(graph, graph.get_node(source), desired_distance)
+        if pool is None:
+            with open(dataset_path, 'w', encoding='utf8', newline='') as dataset_file:
+                rows_statistics = generate_rows(graph, graph_keys, num_records, args, create_csv_writer(dataset_file),
+                                                progress_prefix=dataset_type.capitalize())
+        else:
+            rows_statistics = generate_sharded_dataset(pool, dataset_type, num_records, args.shard_size, base_seed,
+                                                       dataset_path, progress_prefix=dataset_type.capitalize())
+        for distance, developed, runtime in rows_statistics:
             distances[dataset_type].append(distance)
-            dataset.append((source, dest.title, distance))
             runtimes_per_distance[distance].append(runtime)
             developed_per_distance[distance].append(developed)
-            print_progress_bar(i + 1, num_records, time.time() - dataset_start, prefix=dataset_type.capitalize(), length=50)
         print(f'-INFO- {dataset_type.capitalize()}: {num_records} datapoints created.')
-
-        # Create dataframe from dataset
-        df = pd.DataFrame.from_records(dataset, columns=['source', 'destination', 'min_distance'])
-        # Define path to save dataset to
-        dataset_path = os.path.abspath(os.path.join(args.out, dataset_type + '.csv'))
-        # Save dataset (through dataframe)
-        df.to_csv(dataset_path, header=True, index=False, sep='\t')
         runtimes[dataset_type] = time.time() - dataset_start
 
         # Generate distances histogram
-        distance_occurrences = df['min_distance'].tolist()
+        distance_occurrences = distances[dataset_type]
         distances_ticks = range(min(distance_occurrences), max(distance_occurrences) + 2)
 
         plt.figure(figsize=(16, 9))
@@ -133,6 +108,9 @@ if __name__ == '__main__':
         for i, distance in enumerate(distances_ticks[:-1]):
             plt.text(distance, counts[i] + 0.1, str(int(counts[i])))
         plt.savefig(os.path.splitext(dataset_path)[0] + '_distance_histogram.jpg')
+    if pool is not None:
+        pool.close()
+        pool.join()
 
     # Create statistics for dataset
     statistics_df = pd.DataFrame(columns=['Dataset', 'Number of entries', 'Build time', 'Average build time/entry',
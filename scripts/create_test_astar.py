@@ -6,27 +6,27 @@ import random
 import pandas as pd
 
 from scripts.utils import print_progress_bar
-from wikisearch.consts.mongo import CSV_SEPARATOR
+from wikisearch.pairs_dataset import read_pairs
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser()
-    parser.add_argument("-t", "--test", help="Path to testing file")
+    parser.add_argument("-t", "--test", help="Path to testing file (a CSV or a pairs dataset)")
     parser.add_argument("-max", "--max_distance", default=14, help="The maximum distance exist in the dataset")
     parser.add_argument("-a", "--amount_per_distance", default=10, help="amount of couples per distance")
 
     args = parser.parse_args()
 
-    test_dataset = pd.read_csv(args.test, sep=CSV_SEPARATOR).values
-    dataset_len = len(test_dataset)
+    sources, destinations, min_distances = read_pairs(args.test)
+    dataset_len = len(min_distances)
 
-    # Dictionary where the distances are the keys and the value is a list of couples where the keyed
-    # distance is the distance between them
+    # Dictionary where the distances are the keys and the value is a list of the indices of the couples where the
+    # keyed distance is the distance between them. The couples' titles are read only for the sampled couples
     max_distance = args.max_distance
     distances_couples = {idx: [] for idx in range(1, max_distance + 1)}
 
     start = time.time()
-    for idx, (source, destination, distance) in enumerate(test_dataset, 1):
-        distances_couples[distance].append((source, destination, distance))
+    for idx, distance in enumerate(min_distances.tolist(), 1):
+        distances_couples[distance].append(idx - 1)
         print_progress_bar(
             idx, dataset_len, time.time() - start, prefix=f'Collecting distances\' couples', length=50)
 
@@ -38,7 +38,8 @@ if __name__ == "__main__":
         if len(distances_couples[idx]) < couples_amount_per_distance:
             couples_amount_per_distance = len(distances_couples[idx])
         randomed_couples_per_distance.extend(
-            rnd_generator.sample(distances_couples[idx], couples_amount_per_distance))
+            (sources[couple], destinations[couple], idx)
+            for couple in rnd_generator.sample(distances_couples[idx], couples_amount_per_distance))
 
     randomed_couples_per_distance_df = pd.DataFrame.from_records(randomed_couples_per_distance,
                                                                  columns=['source', 'destination', 'min_distance'])
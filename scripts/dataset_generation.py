@@ -0,0 +1,247 @@
+import os
+import random
+import shutil
+import time
+
+import numpy as np
+
+from scripts.utils import print_progress_bar
+from wikisearch.bfs_layers import BFSLayers
+from wikisearch.multi_source_bfs import MultiSourceBFS, SOURCES_PER_RUN
+from wikisearch.pairs_dataset import create_csv_writer
+
+# The rows of the datasets are generated by the functions here, which create_datasets.py runs in one process or in
+# shards, by a pool of workers
+rnd_generator = random.Random()
+# Number of rows which are held to be written in a random order, when sampling several rows per source, so the rows
+# of a source are spread over the dataset
+SHUFFLE_BUFFER_ROWS = 100000
+# The graph and the arguments of the current worker process
+_worker = {}
+
+
+def find_at_distance(graph, source_node, desired_distance):
+    """
+    Find a node at desired distance from source node
+    :param graph: wikisearch.WikiGraph instance
+    :param source_node: wikisearch.GraphNode instance of source page
+    :param desired_distance: distance (minimal) at which a node should be found
+    :return: node at desired distance / shorter, if there are no nodes at such distance, and the real distance
+    """
+    bfs_layers = BFSLayers(graph, source_node, desired_distance)
+    if bfs_layers.max_distance == 0:
+        return None, 0, 0, 0
+
+    actual_distance = desired_distance if bfs_layers.max_distance == desired_distance else \
+        rnd_generator.randint(1, bfs_layers.max_distance)
+    index = actual_distance - 1
+    # Return a random neighbor at actual_distance (which may also be desired distance) away from source page
+    return bfs_layers.get_node(actual_distance, rnd_generator.randrange(bfs_layers.get_layer_size(actual_distance))), \
+        actual_distance, bfs_layers.developed[index], bfs_layers.times[index]
+
+
+def sample_from_source(bfs_layers, remaining_quotas, rows_per_source):
+    """
+    Samples several destinations from one BFS of the source: each at a different distance which still has a
+    quota to fill
+    :param bfs_layers: The BFSLayers of the source, up to the farthest distance which still has a quota
+    :param remaining_quotas: Dictionary from distance to the number of rows still needed at it
+    :param rows_per_source: Maximal number of rows to sample from the source
+    :return: List of (destination node, distance, developed nodes, runtime) of the sampled rows
+    """
+    candidate_distances = [distance for distance in range(1, bfs_layers.max_distance + 1)
+                           if remaining_quotas.get(distance, 0) > 0]
+    samples = []
+    for distance in rnd_generator.sample(candidate_distances, min(rows_per_source, len(candidate_distances))):
+        dest = bfs_layers.get_node(distance, rnd_generator.randrange(bfs_layers.get_layer_size(distance)))
+        samples.append((dest, distance, bfs_layers.developed[distance - 1], bfs_layers.times[distance - 1]))
+    return samples
+
+
+def iterate_sources_layers(graph, graph_keys, remaining_quotas, multi_source_bfs=None):
+    """
+    Yields random sources, along with their BFS layers up to the farthest distance which still has a quota
+    :param graph: wikisearch.WikiGraph instance
+    :param graph_keys: Sorted titles of the graph's pages
+    :param remaining_quotas: Dictionary from distance to the number of rows still needed at it
+    :param multi_source_bfs: MultiSourceBFS of the graph, to find the layers of SOURCES_PER_RUN sources at once.
+    Their runtime is the runtime of the run, divided between them
+    :return: Generator of (source title, BFSLayers)
+    """
+    while True:
+        needed_distance = max(distance for distance, quota in remaining_quotas.items() if quota > 0)
+        if multi_source_bfs is None:
+            source = rnd_generator.choice(graph_keys)
+            yield source, BFSLayers(graph, graph.get_node(source), needed_distance)
+            continue
+        sources = [rnd_generator.choice(graph_keys) for _ in range(SOURCES_PER_RUN)]
+        start = time.time()
+        sources_distances = multi_source_bfs.run([graph.get_node_id(source) for source in sources], needed_distance)
+        runtime = (time.time() - start) / len(sources)
+        for source, distances in zip(sources, sources_distances):
+            yield source, BFSLayers.from_distances(graph, graph.get_node(source), distances, runtime)
+
+
+def get_distance_quotas(num_records, max_distance, weights=None):
+    """
+    Divides the records between the distances, by their weights
+    :param num_records: Number of records
+    :param max_distance: Maximum distance
+    :param weights: Weight of each distance, from 1 to max_distance. If None, the distances are weighted equally
+    :return: Dictionary from distance to its number of records
+    """
+    weights = np.ones(max_distance) if weights is None else np.asarray(weights, dtype=float)
+    quotas = np.floor(weights / weights.sum() * num_records).astype(int)
+    # The records which are left by the rounding go to the heaviest distances
+    for index in np.argsort(-weights, kind='stable')[:num_records - quotas.sum()]:
+        quotas[index] += 1
+    return {distance: int(quota) for distance, quota in enumerate(quotas, 1)}
+
+
+def move_unreachable_quota(remaining_quotas):
+    """
+    Moves the quota of the farthest distance which still has a quota to a random shorter distance, as
+    find_at_distance does when there are no nodes at the desired distance
+    :param remaining_quotas: Dictionary from distance to the number of rows still needed at it
+    """
+    farthest_distance = max(distance for distance, quota in remaining_quotas.items() if quota > 0)
+    if farthest_distance == 1:
+        raise ValueError('No source has neighbors')
+    remaining_quotas[rnd_generator.randint(1, farthest_distance - 1)] += remaining_quotas[farthest_distance]
+    remaining_quotas[farthest_distance] = 0
+
+
+def generate_rows(graph, graph_keys, num_records, args, writer, progress_prefix=None):
+    """
+    Generates dataset rows, by random sources and destinations, and writes each row when it's generated
+    :param graph: wikisearch.WikiGraph instance
+    :param graph_keys: Sorted titles of the graph's pages
+    :param num_records: Number of rows to generate
+    :param args: The script's arguments
+    :param writer: csv.writer of the dataset's CSV (see create_csv_writer), to which the rows are written
+    :param progress_prefix: Prefix of the progress bar, or None to not print progress
+    :return: List of (distance, developed nodes, runtime) of the rows
+    """
+    start = time.time()
+    rows_statistics = []
+    if args.rows_per_source is None:
+        for i in range(num_records):
+            dest = None
+            source = None
+            desired_distance = rnd_generator.randint(1, args.max_distance)
+            distance, runtime, developed = 0, 0, 0
+            # This is to make sure that the source node actually has neighbors in the first place
+            while dest is None:
+                source = rnd_generator.choice(graph_keys)
+                dest, distance, developed, runtime = find_at_distance(graph, graph.get_node(source), desired_distance)
+            writer.writerow((source, dest.title, distance))
+            rows_statistics.append((distance, developed, runtime))
+            if progress_prefix:
+                print_progress_bar(i + 1, num_records, time.time() - start, prefix=progress_prefix, length=50)
+    else:
+        remaining_quotas = get_distance_quotas(num_records, args.max_distance, args.distance_weights)
+        multi_source_bfs = MultiSourceBFS(graph) if args.multi_source_bfs else None
+        sources_layers = iterate_sources_layers(graph, graph_keys, remaining_quotas, multi_source_bfs)
+        # Rows of the same source are spread over the dataset: they're held in a buffer, from which random rows
+        # are written
+        shuffle_buffer = []
+        misses = 0
+        while len(rows_statistics) < num_records:
+            source, bfs_layers = next(sources_layers)
+            samples = sample_from_source(bfs_layers, remaining_quotas, args.rows_per_source)
+            misses = 0 if samples else misses + 1
+            if misses == args.max_misses:
+                move_unreachable_quota(remaining_quotas)
+                misses = 0
+            for dest, distance, developed, runtime in samples:
+                remaining_quotas[distance] -= 1
+                rows_statistics.append((distance, developed, runtime))
+                shuffle_buffer.append((source, dest.title, distance))
+                if len(shuffle_buffer) == SHUFFLE_BUFFER_ROWS:
+                    index = rnd_generator.randrange(len(shuffle_buffer))
+                    shuffle_buffer[index], shuffle_buffer[-1] = shuffle_buffer[-1], shuffle_buffer[index]
+                    writer.writerow(shuffle_buffer.pop())
+            if progress_prefix:
+                print_progress_bar(len(rows_statistics), num_records, time.time() - start, prefix=progress_prefix,
+                                   length=50, interval=args.rows_per_source)
+        rnd_generator.shuffle(shuffle_buffer)
+        writer.writerows(shuffle_buffer)
+    return rows_statistics
+
+
+def get_shard_seed(base_seed, dataset_type, shard_index):
+    """
+    The seed of a shard, derived from the base seed, so the shard's rows don't depend on the worker which
+    generates it
+    """
+    return f'{base_seed}:{dataset_type}:{shard_index}'
+
+
+def init_worker(args, graph_loader):
+    """
+    Loads the graph in a worker process, unless it was forked after the graph was loaded and shares it
+    :param args: The script's arguments
+    :param graph_loader: Function which loads the graph
+    """
+    if 'graph' not in _worker:
+        _worker['graph'] = graph_loader()
+        _worker['graph_keys'] = sorted(_worker['graph'].keys())
+    _worker['args'] = args
+
+
+def generate_shard(task):
+    """
+    Generates a shard of a dataset, whose rows are written to its own CSV as they're generated
+    :param task: (dataset type, shard index, number of rows, seed, shard path)
+    :return: (shard index, list of (distance, developed nodes, runtime) of the shard's rows)
+    """
+    dataset_type, shard_index, num_rows, seed, shard_path = task
+    rnd_generator.seed(seed)
+    with open(shard_path, 'w', encoding='utf8', newline='') as shard_file:
+        rows_statistics = generate_rows(_worker['graph'], _worker['graph_keys'], num_rows, _worker['args'],
+                                        create_csv_writer(shard_file))
+    return shard_index, rows_statistics
+
+
+def merge_shards(shards_paths, dataset_path):
+    """
+    Concatenates the shards' CSVs, by their order, to the dataset's CSV, and removes them
+    :param shards_paths: Paths of the shards' CSVs
+    :param dataset_path: Path of the dataset's CSV
+    """
+    with open(dataset_path, 'w', encoding='utf8') as dataset_file:
+        for index, shard_path in enumerate(shards_paths):
+            with open(shard_path, encoding='utf8') as shard_file:
+                header = shard_file.readline()
+                if index == 0:
+                    dataset_file.write(header)
+                shutil.copyfileobj(shard_file, dataset_file)
+            os.remove(shard_path)
+
+
+def generate_sharded_dataset(pool, dataset_type, num_records, shard_size, base_seed, dataset_path,
+                             progress_prefix=None):
+    """
+    Generates a dataset in shards, by the workers of the pool, and merges them to the dataset's CSV. The rows depend
+    only on the base seed and the shard size
+    :param pool: Pool of workers, which were initialized by init_worker
+    :param dataset_type: The dataset's type, from which the shards' seeds are derived
+    :param num_records: Number of rows to generate
+    :param shard_size: Number of rows in a shard
+    :param base_seed: The seed from which the shards' seeds are derived
+    :param dataset_path: Path of the dataset's CSV. The shards are written next to it
+    :param progress_prefix: Prefix of the progress bar, or None to not print progress
+    :return: List of (distance, developed nodes, runtime) of the dataset's rows
+    """
+    start = time.time()
+    tasks = [(dataset_type, shard_index, min(shard_size, num_records - shard_start),
+              get_shard_seed(base_seed, dataset_type, shard_index),
+              f'{os.path.splitext(dataset_path)[0]}.shard{shard_index:05d}.csv')
+             for shard_index, shard_start in enumerate(range(0, num_records, shard_size))]
+    rows_statistics = []
+    for done_shards, (_, shard_statistics) in enumerate(pool.imap_unordered(generate_shard, tasks), 1):
+        rows_statistics.extend(shard_statistics)
+        if progress_prefix:
+            print_progress_bar(done_shards, len(tasks), time.time() - start, prefix=progress_prefix, length=50)
+    merge_shards([task[-1] for task in tasks], dataset_path)
+    return rows_statistics
@@ -0,0 +1,215 @@
+import math
+import os
+
+import numpy as np
+import torch
+
+from wikisearch.consts.mongo import CSV_SEPARATOR
+from wikisearch.graph_snapshot import StringTable
+from wikisearch.pairs_dataset import load_pairs, get_pairs_titles, is_pairs_dataset
+from wikisearch.utils.sparse_categories import gather_bags
+
+# Suffix of the file which caches the ids arrays of a dataset, next to its CSV
+PAIRS_CACHE_SUFFIX = ".pairs.npz"
+
+
+class DistanceDataset:
+    """
+    A dataset of pairs of pages and their distances, kept as arrays. Each pair is the ids of its pages, which are
+    rows of one matrix of embeddings, so a batch is gathered from it at once: the embedder's memory-mapped store,
+    or, without a store, a matrix of the embeddings of the dataset's pages. Only the batches are moved to the device
+    """
+
+    def __init__(self, titles, source_ids, destination_ids, min_distances, embedder):
+        """
+        :param titles: List of the distinct titles of the dataset's pages, by their ids
+        :param source_ids: int64 array of the pairs' source ids
+        :param destination_ids: int64 array of the pairs' destination ids
+        :param min_distances: Array of the pairs' distances
+        :param embedder: Embedder to be used to embed wikipedia pages
+        """
+        self._titles = titles
+        self._source_ids = torch.from_numpy(source_ids)
+        self._destination_ids = torch.from_numpy(destination_ids)
+        self._min_distances = torch.from_numpy(np.asarray(min_distances, dtype=np.int64))
+        self._device = "cuda" if torch.cuda.is_available() else "cpu"
+        # Categories are given to the model sparsely, when the embedder can
+        self._sparse = embedder.sparse_categories
+        self._store = None if self._sparse else embedder.store
+        if self._store is not None:
+            # The pages' rows in the store. Pages which aren't in it are embedded, and given the rows after it
+            store_rows = [self._store.get_row(title) for title in titles]
+            missing = [i for i, row in enumerate(store_rows) if row is None]
+            for extra_row, i in enumerate(missing, len(self._store)):
+                store_rows[i] = extra_row
+            self._store_rows = np.array(store_rows, dtype=np.int64)
+            self._embeddings = embedder.embed_batch([titles[i] for i in missing]).cpu() if missing else None
+        elif self._sparse:
+            self._embeddings = tuple(tensor.cpu() for tensor in embedder.embed_batch_sparse(titles))
+        else:
+            self._embeddings = embedder.embed_batch(titles).cpu()
+
+    @classmethod
+    def from_csv(cls, path, embedder, cache=False):
+        """
+        Loads a dataset CSV (source, destination, min_distance)
+        :param path: Path to the dataset CSV
+        :param embedder: Embedder to be used to embed wikipedia pages
+        :param cache: Whether to cache the ids arrays next to the CSV, and load them from there if the CSV hasn't
+        changed since
+        :return: The DistanceDataset
+        """
+        cache_path = path + PAIRS_CACHE_SUFFIX
+        if cache and os.path.exists(cache_path) and os.path.getmtime(cache_path) >= os.path.getmtime(path):
+            with np.load(cache_path) as arrays:
+                # Caches from before the titles were kept as a StringTable are rebuilt
+                if "titles_blob" in arrays:
+                    titles = StringTable(arrays["titles_blob"], arrays["titles_offsets"]).to_list()
+                    return cls(titles, arrays["source_ids"], arrays["destination_ids"], arrays["min_distances"],
+                               embedder)
+
+        import pandas as pd
+        df = pd.read_csv(path, sep=CSV_SEPARATOR)
+        # Ids are given by the titles' first appearance, as pairs_to_ids gives them
+        ids, titles = pd.factorize(np.concatenate([df["source"].values, df["destination"].values]))
+        titles, ids = titles.tolist(), ids.astype(np.int64)
+        source_ids, destination_ids = ids[:len(df)], ids[len(df):]
+        min_distances = df["min_distance"].values.astype(np.int64)
+        if cache:
+            # The titles are kept as a StringTable, instead of a fixed width array of the longest title
+            titles_blob, titles_offsets = StringTable.from_strings(titles)
+            np.savez(cache_path, titles_blob=titles_blob, titles_offsets=titles_offsets, source_ids=source_ids,
+                     destination_ids=destination_ids, min_distances=min_distances)
+        return cls(titles, source_ids, destination_ids, min_distances, embedder)
+
+    @classmethod
+    def from_pairs(cls, path, embedder):
+        """
+        Loads a pairs dataset (see wikisearch.pairs_dataset)
+        :param path: Path to the pairs dataset directory
+        :param embedder: Embedder to be used to embed wikipedia pages
+        :return: The DistanceDataset
+        """
+        _, titles, source_ids, destination_ids, min_distances = load_pairs(path)
+        titles, source_ids, destination_ids = get_pairs_titles(titles, source_ids, destination_ids)
+        return cls(titles, source_ids, destination_ids, min_distances, embedder)
+
+    @classmethod
+    def load(cls, path, embedder, cache=False):
+        """
+        Loads a dataset, either a pairs dataset or a CSV
+        :param path: Path to the dataset
+        :param embedder: Embedder to be used to embed wikipedia pages
+        :param cache: Whether to cache the ids arrays of a CSV (see from_csv)
+        :return: The DistanceDataset
+        """
+        return cls.from_pairs(path, embedder) if is_pairs_dataset(path) else cls.from_csv(path, embedder, cache)
+
+    def __len__(self):
+        return len(self._min_distances)
+
+    @property
+    def titles(self):
+        """
+        List of the distinct titles of the dataset's pages, by their ids
+        """
+        return self._titles
+
+    def get_titles(self, ids):
+        """
+        Gets the titles of pages' ids
+        :param ids: Tensor of ids
+        :return: List of the titles
+        """
+        return [self._titles[page_id] for page_id in ids.tolist()]
+
+    @property
+    def source_ids(self):
+        return self._source_ids
+
+    @property
+    def destination_ids(self):
+        return self._destination_ids
+
+    @property
+    def min_distances(self):
+        return self._min_distances
+
+    def _gather_from_store(self, ids):
+        rows = self._store_rows[ids.numpy()]
+        in_store = rows < len(self._store)
+        if self._embeddings is None:
+            return torch.from_numpy(self._store.gather(rows))
+        vectors = torch.from_numpy(self._store.gather(np.where(in_store, rows, 0)))
+        vectors[~in_store] = self._embeddings[rows[~in_store] - len(self._store)]
+        return vectors
+
+    def _gather(self, ids):
+        if self._store is not None:
+            return self._gather_from_store(ids).to(self._device)
+        if self._sparse:
+            dense_parts, indices, offsets = self._embeddings
+            return tuple(tensor.to(self._device)
+                         for tensor in (dense_parts.index_select(0, ids),) + gather_bags(indices, offsets, ids))
+        return self._embeddings.index_select(0, ids).to(self._device)
+
+    def get_batch(self, start, end):
+        """
+        Gathers the batch of the pairs in [start, end)
+        :return: (sources, destinations, min_distances) - the batches of the sources' and destinations'
+        embeddings, and of the distances
+        """
+        return self._gather(self._source_ids[start:end]), self._gather(self._destination_ids[start:end]), \
+            self._min_distances[start:end]
+
+    def get_unique_batch(self, start, end):
+        """
+        Gathers the batch of the pairs in [start, end), with each distinct page once (see
+        EmbeddingsDistance.forward_pairs)
+        :return: (embeddings, source_rows, destination_rows, min_distances) - the batch of the distinct pages'
+        embeddings, the rows in it of the sources and the destinations, and the batch of the distances
+        """
+        source_ids = self._source_ids[start:end]
+        unique_ids, rows = torch.unique(torch.cat((source_ids, self._destination_ids[start:end])),
+                                        return_inverse=True)
+        embeddings = self._gather(unique_ids)
+        rows = rows.to(self._device)
+        return embeddings, rows[:len(source_ids)], rows[len(source_ids):], self._min_distances[start:end]
+
+
+def run_model(model, batch):
+    """
+    Runs the model on a batch of a DistanceLoader
+    :param model: The distance model
+    :param batch: The batch, with or without unique nodes
+    :return: Batch of distances
+    """
+    if len(batch) == 4:
+        embeddings, source_rows, destination_rows, _ = batch
+        return model.forward_pairs(embeddings, source_rows, destination_rows)
+    sources, destinations, _ = batch
+    return model(sources, destinations)
+
+
+class DistanceLoader:
+    """
+    Iterates over a DistanceDataset in batches, by the dataset's order
+    """
+
+    def __init__(self, dataset, batch_size, unique_nodes=False):
+        """
+        :param dataset: The DistanceDataset
+        :param batch_size: Number of pairs in a batch
+        :param unique_nodes: Whether to give the batches with each distinct page once (see get_unique_batch)
+        """
+        self.dataset = dataset
+        self.batch_size = batch_size
+        self.unique_nodes = unique_nodes
+
+    def __iter__(self):
+        get_batch = self.dataset.get_unique_batch if self.unique_nodes else self.dataset.get_batch
+        for start in range(0, len(self.dataset), self.batch_size):
+            yield get_batch(start, start + self.batch_size)
+
+    def __len__(self):
+        return math.ceil(len(self.dataset) / self.batch_size)
@@ -1,18 +1,68 @@
 import argparse
 import datetime
 import time
+from multiprocessing import Pool
 
 from scripts.loaders import load_embedder_by_name
 from scripts.utils import print_progress_bar
 from wikisearch.consts.embeddings import KMEANS
 from wikisearch.consts.mongo import WIKI_LANG, PAGES, ENTRY_TITLE, ENTRY_ID, ENTRY_REDIRECT_TO, ENTRY_EMBEDDING
-from wikisearch.embeddings import AVAILABLE_EMBEDDINGS
+from wikisearch.embeddings import AVAILABLE_EMBEDDINGS, Embedding
 from wikisearch.utils.mongo_handler import MongoHandler
 
+# The embedder and database handlers of the current worker process
+_worker = {}
+
+
+def init_worker(embedding, embedder_name):
+    """
+    Loads the embedder once per worker process
+    :param embedding: The embedder's class name
+    :param embedder_name: The embeddings' collection name
+    """
+    # The worker only computes embeddings, so it doesn't need the ones which are already in the database
+    Embedding.preload_embeddings = False
+    _worker['embedder'] = load_embedder_by_name(embedding, save_to_db=False)
+    _worker['pages'] = MongoHandler(WIKI_LANG, PAGES)
+    _worker['embeddings'] = MongoHandler(WIKI_LANG, embedder_name)
+
+
+def embed_range(id_range):
+    """
+    Embeds the pages in a range of ids which are not embedded yet
+    :param id_range: (first id, last id) of the range, inclusive
+    :return: List of the embedded pages documents
+    """
+    embedder = _worker['embedder']
+    range_query = {ENTRY_ID: {"$gte": id_range[0], "$lte": id_range[1]}}
+    embedded_ids = {page[ENTRY_ID] for page in _worker['embeddings'].get_pages(range_query, {ENTRY_ID: True})}
+    pages = _worker['pages'].get_pages(dict(range_query, **{ENTRY_REDIRECT_TO: {"$exists": False}}))
+
+    pages = [page for page in pages if page[ENTRY_ID] not in embedded_ids]
+    # The whole range is embedded at once, so embedders which can batch their work (like the KMeans ones) do
+    vectors = embedder._embed_many(pages)
+    return [{'_id': page[ENTRY_ID], ENTRY_TITLE: page[ENTRY_TITLE],
+             'last_modified': datetime.datetime.now().__str__(),
+             ENTRY_EMBEDDING: embedder._encode_vector(vector)} for page, vector in zip(pages, vectors)]
+
+
+def partition_ids(ids, chunk_size):
+    """
+    Partitions sorted ids to ranges of consecutive ids
+    :param ids: Sorted list of ids
+    :param chunk_size: Number of ids in each range
+    :return: List of (first id, last id) ranges
+    """
+    return [(ids[i], ids[min(i + chunk_size, len(ids)) - 1]) for i in range(0, len(ids), chunk_size)]
+
+
 if __name__ == "__main__":
     parser = argparse.ArgumentParser()
     parser.add_argument("--embeddings", required=True, choices=AVAILABLE_EMBEDDINGS, nargs="+")
     parser.add_argument("-b", "--batch", default=1000, type=int)
+    parser.add_argument("-w", "--workers", default=1, type=int, help="Number of worker processes")
+    parser.add_argument("-cs", "--chunk-size", default=200, type=int,
+                        help="Number of pages each worker embeds at a time")
     parser.add_argument('--overwrite', action='store_true')
     args = parser.parse_args()
 
@@ -27,27 +77,38 @@ if __name__ == "__main__":
         # set index, if there isn't one in place
         mongo_handler_embeddings.create_title_index()
 
-        embedded_pages_query = {ENTRY_EMBEDDING: {"$exists": True}}
-        embedded_titles = [page[ENTRY_TITLE] for page in mongo_handler_embeddings.get_pages(embedded_pages_query, {ENTRY_TITLE: True})]
-
-        embedder = load_embedder_by_name(embedding, save_to_db=False)
-        # Only embed pages which are not embedded yet, and which are not redirects
-        pages_without_embeddings_query = {"title": {"$nin": embedded_titles},
-                                          ENTRY_REDIRECT_TO: {"$exists": False}}
-        pages = mongo_handler_pages.get_pages(pages_without_embeddings_query).batch_size(args.batch)
-        len_pages = pages.count()
-
-        start = time.time()
-        embedded_vectors = []
-        for idx, page in enumerate(pages, 1):
-
-            page_value = {'_id': page[ENTRY_ID], ENTRY_TITLE: page[ENTRY_TITLE],
-                          'last_modified': datetime.datetime.now().__str__(),
-                          ENTRY_EMBEDDING: embedder._encode_vector(embedder._embed(page))}
-
-            embedded_vectors.append(page_value)
-            if idx == len_pages or idx % args.batch == 0:
-                mongo_handler_embeddings.insert_data(embedded_vectors)
-                embedded_vectors = []
+        # Only embed pages which are not embedded yet, and which are not redirects. The pages are partitioned by
+        # their ids, and pages which are already embedded are skipped by the workers, so a run can be resumed
+        embedded_ids = {page[ENTRY_ID] for page in mongo_handler_embeddings.get_all_documents({ENTRY_ID: True})}
+        pages_ids = [page[ENTRY_ID] for page in
+                     mongo_handler_pages.get_pages({ENTRY_REDIRECT_TO: {"$exists": False}}, {ENTRY_ID: True})
+                     .sort(ENTRY_ID).batch_size(args.batch * 10) if page[ENTRY_ID] not in embedded_ids]
+        id_ranges = partition_ids(pages_ids, args.chunk_size)
+        len_pages = len(pages_ids)
+        del embedded_ids, pages_ids
 
-            print_progress_bar(idx, len_pages, time.time() - start, prefix=f'Embedding {embedding}', length=50)
+        pool = Pool(args.workers, init_worker, (embedding, embedder_name)) if args.workers > 1 else None
+        if pool is None:
+            init_worker(embedding, embedder_name)
+        try:
+            start = time.time()
+            done_pages = 0
+            embedded_vectors = []
+            results = pool.imap_unordered(embed_range, id_ranges) if pool else map(embed_range, id_ranges)
+            for embedded_pages in results:
+                embedded_vectors.extend(embedded_pages)
+                if len(embedded_vectors) >= args.batch:
+                    mongo_handler_embeddings.bulk_write(
+                        [mongo_handler_embeddings.update_page_request(page) for page in embedded_vectors])
+                    embedded_vectors = []
+                # Pages which were added to the database since the ids were partitioned may be embedded too
+                done_pages = min(done_pages + len(embedded_pages), len_pages)
+                print_progress_bar(done_pages, len_pages, time.time() - start, prefix=f'Embedding {embedding}',
+                                   length=50)
+            if embedded_vectors:
+                mongo_handler_embeddings.bulk_write(
+                    [mongo_handler_embeddings.update_page_request(page) for page in embedded_vectors])
+        finally:
+            if pool is not None:
+                pool.close()
+                pool.join()
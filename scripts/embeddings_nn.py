@@ -6,52 +6,21 @@ import time
 
 import matplotlib.pyplot as plt
 import numpy as np
-import pandas as pd
 import torch
 import torch.multiprocessing as mp
 import torch.optim as optim
-import torch.utils.data
 from torch.nn import MSELoss
 
+from scripts.distance_dataset import DistanceDataset, DistanceLoader, run_model
 from scripts.loaders import load_embedder_by_name
 from scripts.loaders.load_model import load_model_type
 from scripts.utils import print_progress_bar
 from wikisearch.consts.embeddings import EMBEDDING_VECTOR_SIZE
-from wikisearch.consts.mongo import CSV_SEPARATOR
 from wikisearch.embeddings import AVAILABLE_EMBEDDINGS
 from wikisearch.heuristics.nn_archs import NN_ARCHS
 
 CRITERION_OPTIONS = ["MSELoss", "AsymmetricMSELoss"]
 OPTIMIZER_OPTIONS = ["SGD", "Adam"]
-mp.set_start_method('spawn')
-
-
-class DistanceDataset(torch.utils.data.Dataset):
-    """
-    Dataset class.
-    Supposed to give the whole size of the dataset, and returns the vectored elements when accessed
-    through [i]
-    """
-
-    def __init__(self, path, embedder):
-        super(DistanceDataset, self).__init__()
-        self._path = path
-        # Read Dataset file into dataframe
-        self._df = pd.read_csv(self._path, sep=CSV_SEPARATOR)
-        # Embedder to be used to embed wikipedia pages
-        self._embedder = embedder
-
-    def __len__(self):
-        return len(self._df)
-
-    def __getitem__(self, item):
-        # Get source, destination and min_distance at index item
-        item_row = self._df.iloc[item]
-        # Embed source and destination, and cast distance from string to integer.
-        return \
-            self._embedder.embed(item_row["source"]), \
-            self._embedder.embed(item_row["destination"]), \
-            int(item_row["min_distance"])
 
 
 def early_stop(val_losses, best_val_loss, consequent_deteriorations):
@@ -93,12 +62,11 @@ def train_epoch(args, model, device, train_loader, criterion, optimizer, epoch):
     """
     model.train()
     start = time.time()
-    for batch_idx, (source, destination, min_distance) in enumerate(train_loader, 1):
+    for batch_idx, batch in enumerate(train_loader, 1):
         # Move tensors to relevant devices, and handle distances tensor.
-        source, destination, min_distance = \
-            source, destination, min_distance.float().to(device).unsqueeze(1)
+        min_distance = batch[-1].float().to(device).unsqueeze(1)
         optimizer.zero_grad()
-        output = model(source, destination)
+        output = run_model(model, batch)
         loss = criterion(output, min_distance)
         loss.backward()
         optimizer.step()
@@ -122,24 +90,26 @@ def test(args, model, criterion, test_loader, device):
     test_loss = 0
     test_start_time = time.time()
     with torch.no_grad():
-        for source, destination, min_distance in test_loader:
+        for batch in test_loader:
             # Move tensors to relevant devices, and handle distances tensor.
-            source, destination, min_distance = \
-                source, destination, min_distance.float().to(device).unsqueeze(1)
-            output = model(source, destination)
+            min_distance = batch[-1].float().to(device).unsqueeze(1)
+            output = run_model(model, batch)
             # because reduction is mean, we want to "convert" it to sum by multiplying by batch size to be able to
             # handle uneven batch sizes (at end of data), and so we divide later by number of samples
-            test_loss += criterion(output, min_distance).item() * source.size(0)  # sum up batch loss
+            test_loss += criterion(output, min_distance).item() * min_distance.size(0)  # sum up batch loss
 
     test_loss /= len(test_loader.dataset)
     print("-STAT- Test set: MSE loss: {:.4f}, Time elapsed: {:.1f}s".format(test_loss, time.time() - test_start_time))
     return test_loss
 
 
-if __name__ == "__main__":
+def build_parser():
+    """
+    :return: The parser of the training arguments
+    """
     parser = argparse.ArgumentParser()
-    parser.add_argument("-tr", "--train", help="Path to training file")
-    parser.add_argument("-te", "--test", help="Path to testing file")
+    parser.add_argument("-tr", "--train", help="Path to training file (a CSV or a pairs dataset)")
+    parser.add_argument("-te", "--test", help="Path to testing file (a CSV or a pairs dataset)")
     parser.add_argument("-a", "--arch", choices=NN_ARCHS, help="NN Architecture to use")
     parser.add_argument("-b", "--batch-size", type=int, default=16)
     parser.add_argument("-e", "--epochs", type=int, default=50)
@@ -155,15 +125,28 @@ if __name__ == "__main__":
     parser.add_argument("--adam-amsgrad", action="store_true")
     parser.add_argument("-o", "--out", required=True, help="Output directory")
     parser.add_argument("--embedding", required=True, choices=AVAILABLE_EMBEDDINGS)
+    parser.add_argument("--cache-datasets", action="store_true",
+                        help="Cache the datasets' ids arrays next to their files, for the next trainings")
+    parser.add_argument("--unique-nodes", action="store_true",
+                        help="Encode each distinct page of a training batch once. Batch normalization of the "
+                             "siamese branch then sees each distinct page once")
+    return parser
 
-    args = parser.parse_args()
-
-    embedder = load_embedder_by_name(args.embedding)
 
+def train_model(args, embedder, train_dataset, test_dataset):
+    """
+    Trains a model, and saves it, its metadata and its losses plot to the output directory
+    :param args: The training arguments (see build_parser)
+    :param embedder: The embedder of the datasets
+    :param train_dataset: DistanceDataset to train on
+    :param test_dataset: DistanceDataset to validate on
+    """
     device = "cuda" if torch.cuda.is_available() else "cpu"
     model = load_model_type(args.arch, EMBEDDING_VECTOR_SIZE[embedder.type])
-    train_loader = torch.utils.data.DataLoader(DistanceDataset(args.train, embedder), batch_size=args.batch_size)
-    test_loader = torch.utils.data.DataLoader(DistanceDataset(args.test, embedder), batch_size=args.batch_size)
+    train_loader = DistanceLoader(train_dataset, args.batch_size, unique_nodes=args.unique_nodes)
+    # Evaluation doesn't depend on the batch, so the pages are always encoded once per batch
+    train_eval_loader = DistanceLoader(train_dataset, args.batch_size, unique_nodes=True)
+    test_loader = DistanceLoader(test_dataset, args.batch_size, unique_nodes=True)
 
     criterion = None
     reduction = "mean"
@@ -216,7 +199,7 @@ if __name__ == "__main__":
     for epoch in range(1, args.epochs + 1):
         train_epoch(args, model, device, train_loader, criterion, optimizer, epoch)
         # Test the model on train and test sets, for progress tracking
-        train_losses.append(round(test(args, model, criterion, train_loader, device), 4))
+        train_losses.append(round(test(args, model, criterion, train_eval_loader, device), 4))
         val_losses.append(round(test(args, model, criterion, test_loader, device), 4))
         # Update learning rate according to scheduler
         lr_scheduler.step(val_losses[-1])
@@ -257,3 +240,13 @@ if __name__ == "__main__":
     total_time = time.time() - start_of_all
     print(f"-TIME- Total time took to train the model: {total_time:.1f}s -> "
           f"{total_time / 60:.2f}m -> {total_time / 3600:.3f}h")
+
+
+if __name__ == "__main__":
+    mp.set_start_method('spawn')
+    args = build_parser().parse_args()
+
+    embedder = load_embedder_by_name(args.embedding)
+    # The datasets are embedded once, and their batches are gathered from the embeddings
+    train_model(args, embedder, DistanceDataset.load(args.train, embedder, cache=args.cache_datasets),
+                DistanceDataset.load(args.test, embedder, cache=args.cache_datasets))
@@ -0,0 +1,42 @@
+import argparse
+import time
+
+import torch
+
+from scripts.loaders import load_embedder_from_model_path, load_model_from_path, load_graph
+from scripts.utils import print_progress_bar
+from wikisearch.consts.paths import PATH_TO_GRAPH_SNAPSHOT
+from wikisearch.utils.vector_store import VectorStore
+
+if __name__ == "__main__":
+    """
+    Encodes all the graph's pages by a model's siamese branch, so NNHeuristic runs only the model's head online
+    """
+    parser = argparse.ArgumentParser()
+    parser.add_argument('-m', '--model', required=True, help='Path to the model file')
+    parser.add_argument('-o', '--out', required=True, help='Path of the encodings store directory')
+    parser.add_argument('-b', '--batch', default=1024, type=int)
+    parser.add_argument('-gs', '--graph-snapshot', default=PATH_TO_GRAPH_SNAPSHOT,
+                        help='Path to a graph snapshot directory (created if doesn\'t exist)')
+    args = parser.parse_args()
+
+    graph = load_graph(compact=True, snapshot_path=args.graph_snapshot)
+    embedder = load_embedder_from_model_path(args.model)
+    model = load_model_from_path(args.model)
+
+    # Rows of the store are ordered as the graph's nodes ids
+    titles = list(graph.keys())
+    # Categories are given to the model sparsely, when the embedder can
+    embed_batch = embedder.embed_batch_sparse if embedder.sparse_categories else embedder.embed_batch
+    with torch.no_grad():
+        encoding_shape = model.encode(embed_batch(titles[:1])).shape[1:]
+        store = VectorStore.create(args.out, titles, encoding_shape, model=args.model)
+
+        start = time.time()
+        for batch_start in range(0, len(titles), args.batch):
+            batch_titles = titles[batch_start:batch_start + args.batch]
+            embeddings = embed_batch(batch_titles)
+            store.vectors[batch_start:batch_start + len(batch_titles)] = model.encode(embeddings).cpu().numpy()
+            print_progress_bar(batch_start + len(batch_titles), len(titles), time.time() - start,
+                               prefix='Encoding the graph', length=50)
+    store.finalize()
@@ -0,0 +1,23 @@
+import os
+
+from wikisearch.compact_graph import CompactWikiGraph
+from wikisearch.graph import WikiGraph
+from wikisearch.graph_snapshot import SNAPSHOT_META
+
+
+def load_graph(compact=False, snapshot_path=None):
+    """
+    Loads the wikipedia graph
+    :param compact: Whether to load the compact graph representation, when not using a snapshot
+    :param snapshot_path: Path of a graph snapshot directory. If the snapshot doesn't exist yet, the compact graph
+    is built from the database and saved to it
+    :return: The loaded graph
+    """
+    if snapshot_path:
+        if os.path.exists(os.path.join(snapshot_path, SNAPSHOT_META)):
+            return WikiGraph.load_snapshot(snapshot_path)
+        graph = CompactWikiGraph()
+        graph.save_snapshot(snapshot_path)
+        print(f"-INFO- Saved graph snapshot to {snapshot_path}")
+        return graph
+    return CompactWikiGraph() if compact else WikiGraph()
@@ -0,0 +1,51 @@
+import argparse
+import time
+
+from scripts.utils import print_progress_bar
+from wikisearch.consts.embeddings import KMEANS
+from wikisearch.consts.mongo import WIKI_LANG, ENTRY_TITLE, ENTRY_EMBEDDING
+from wikisearch.embeddings import AVAILABLE_EMBEDDINGS, CategoriesMultiHot
+from wikisearch.utils.mongo_handler import MongoHandler
+from wikisearch.utils.vector_encoding import migrate_vector, VECTOR_DTYPE
+
+if __name__ == "__main__":
+    """
+    Migrates embeddings collections from pickled tensors to the binary vectors format. Categories are saved as the
+    indices of their multi-hot vectors, including ones which were migrated as multi-hot vectors before. Only
+    vectors which aren't in their format yet are migrated, so an interrupted migration can be resumed by running it
+    again
+    """
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--embeddings", required=True, choices=AVAILABLE_EMBEDDINGS, nargs="+")
+    parser.add_argument("-b", "--batch", default=1000, type=int)
+    args = parser.parse_args()
+
+    for embedding in args.embeddings:
+        # Same collection name as in embed_the_database.py
+        embedder_name = embedding.lower() + (str(KMEANS) if embedding.lower().find("kmeans") > -1 else "")
+        mongo_handler_embeddings = MongoHandler(WIKI_LANG, embedder_name)
+
+        # Pickled vectors are saved as binary data, while vectors in the binary format are saved as sub-documents
+        unmigrated_query = {ENTRY_EMBEDDING: {"$type": "binData"}}
+        # Categories are saved as indices, so categories which were migrated as multi-hot vectors are migrated again
+        indices = embedding == CategoriesMultiHot.__name__
+        if indices:
+            unmigrated_query = {"$or": [unmigrated_query, {f"{ENTRY_EMBEDDING}.dtype": VECTOR_DTYPE}]}
+        pages = mongo_handler_embeddings.get_pages(unmigrated_query, {ENTRY_TITLE: True, ENTRY_EMBEDDING: True})
+        len_pages = mongo_handler_embeddings.count_pages(unmigrated_query)
+        if not len_pages:
+            print(f"-INFO- {embedding} embeddings are already migrated")
+            continue
+
+        start = time.time()
+        requests = []
+        for idx, page in enumerate(pages.batch_size(args.batch), 1):
+            requests.append(mongo_handler_embeddings.update_page_request(
+                {ENTRY_TITLE: page[ENTRY_TITLE], ENTRY_EMBEDDING: migrate_vector(page[ENTRY_EMBEDDING], indices)}))
+            if idx == len_pages or idx % args.batch == 0:
+                mongo_handler_embeddings.bulk_write(requests)
+                requests = []
+            print_progress_bar(idx, len_pages, time.time() - start, prefix=f'Migrating {embedding}', length=50,
+                               interval=args.batch)
+        if requests:
+            mongo_handler_embeddings.bulk_write(requests)
@@ -0,0 +1,48 @@
+import argparse
+import time
+
+from scripts.loaders import load_embedder_by_name
+from scripts.utils import print_progress_bar
+from wikisearch.consts.mongo import WIKI_LANG, PAGES, ENTRY_TITLE, ENTRY_TEXT, ENTRY_REDIRECT_TO
+from wikisearch.embeddings import Embedding
+from wikisearch.utils.mongo_handler import MongoHandler
+from wikisearch.utils.word_vectors import prune_word_vectors
+
+# An embedder of each pretrained vectors family, whose tokenizer is shared by all the family's embedders
+_FAMILIES_EMBEDDERS = {
+    "fasttext": "FastTextTitle",
+    "word2vec": "Word2VecTitle",
+}
+
+if __name__ == "__main__":
+    """
+    Prunes the pretrained vectors to the words which appear in the pages' titles and texts, as tokenized by the
+    embedders. Point PRETRAINED_EMBEDDINGS_FASTTEXT / PRETRAINED_EMBEDDINGS_WORD2VEC to the pruned store to use it
+    """
+    parser = argparse.ArgumentParser()
+    parser.add_argument('-f', '--family', required=True, choices=_FAMILIES_EMBEDDERS.keys())
+    parser.add_argument('-o', '--out', required=True, help='Path of the pruned vectors store directory')
+    parser.add_argument('-b', '--batch', default=1000, type=int)
+    args = parser.parse_args()
+
+    Embedding.preload_embeddings = False
+    embedder = load_embedder_by_name(_FAMILIES_EMBEDDERS[args.family], save_to_db=False)
+    mongo_handler_pages = MongoHandler(WIKI_LANG, PAGES)
+    pages_filter = {ENTRY_REDIRECT_TO: {"$exists": False}}
+    len_pages = mongo_handler_pages.count_pages(pages_filter)
+
+    start = time.time()
+    vocabulary = set()
+    pages = mongo_handler_pages.get_pages(pages_filter, {ENTRY_TITLE: True, ENTRY_TEXT: True}).batch_size(args.batch)
+    # All the texts are tokenized in one stream, so embedders which tokenize in batches (like Word2Vec) do
+    texts = (text for page in pages for text in (page[ENTRY_TITLE], page[ENTRY_TEXT]))
+    for done_texts, words in enumerate(embedder.tokenize_many(texts), 1):
+        vocabulary.update(words)
+        if done_texts % 2 == 0:
+            print_progress_bar(done_texts // 2, len_pages, time.time() - start, prefix='Scanning the corpus',
+                               length=50, interval=args.batch)
+
+    num_words = prune_word_vectors(embedder._vectors, embedder._word_index, vocabulary, args.out,
+                                   source=embedder.get_metadata()['vectors_filepath'],
+                                   corpus=f"{WIKI_LANG}.{PAGES}", num_pages=len_pages)
+    print(f"-INFO- Kept {num_words} of {len(embedder._word_index)} words")
@@ -8,9 +8,10 @@ import matplotlib.pyplot as plt
 import numpy as np
 import pandas as pd
 import tabulate
-import torch.utils.data
+import torch
 
 from scripts.consts.statistics import *
+from scripts.distance_dataset import DistanceDataset, DistanceLoader, run_model
 from scripts.loaders import load_embedder_from_model_path, load_model_from_path
 from scripts.utils import print_progress_bar
 from wikisearch.consts.mongo import CSV_SEPARATOR
@@ -20,24 +21,28 @@ pd.set_option('display.max_columns', 10)
 pd.set_option('precision', 2)
 
 
-def create_distances_dataframe(dataset_file_path):
-    # Loads the dataset file
-    dataset = pd.read_csv(dataset_file_path, sep=CSV_SEPARATOR).values
-
-    df = pd.DataFrame(columns=[SRC_NODE, DST_NODE, BFS_DIST, NN_DIST])
+def create_distances_dataframe(model, dataset, batch_size=1024):
+    """
+    Predicts the distances of a dataset's pairs
+    :param model: The distance model
+    :param dataset: The DistanceDataset
+    :param batch_size: Number of pairs to predict at once
+    :return: Dataframe of the pairs, their BFS distances and their predicted distances
+    """
+    nn_distances = []
     with torch.no_grad():
         start = time.time()
-        for idx, (source, destination, actual_distance) in enumerate(dataset, 1):
-            df = df.append(
-                {
-                    SRC_NODE: source,
-                    DST_NODE: destination,
-                    BFS_DIST: actual_distance,
-                    NN_DIST: model(embedder.embed(source).unsqueeze(0), embedder.embed(destination).unsqueeze(0)).round().int().item()
-                }, ignore_index=True)
-            print_progress_bar(idx, len(dataset), time.time() - start, prefix=f'Progress: ', length=50)
+        # Each distinct page of a batch is encoded once
+        for batch in DistanceLoader(dataset, batch_size, unique_nodes=True):
+            nn_distances.extend(run_model(model, batch).round().int().view(-1).tolist())
+            print_progress_bar(len(nn_distances), len(dataset), time.time() - start, prefix=f'Progress: ', length=50)
 
-    return df.infer_objects()
+    return pd.DataFrame({
+        SRC_NODE: dataset.get_titles(dataset.source_ids),
+        DST_NODE: dataset.get_titles(dataset.destination_ids),
+        BFS_DIST: dataset.min_distances.numpy(),
+        NN_DIST: nn_distances,
+    }, columns=[SRC_NODE, DST_NODE, BFS_DIST, NN_DIST]).infer_objects()
 
 
 def create_histogram(values, values_ticks, title, output_path, histogram_name):
@@ -73,21 +78,13 @@ def create_percentile_graph(values, title, output_path):
     return auc
 
 
-if __name__ == "__main__":
-    parser = argparse.ArgumentParser()
-    parser.add_argument('-m', '--model', required=True, help='Path to the model file. When running from linux - '
-                                                             'notice to not put a \'/\' after the file name')
-    parser.add_argument('-df', '--dataset_file', required=True, help='Path to a dataset file')
-    args = parser.parse_args()
-
-    output_dir = path.dirname(args.model)
-    model_file_name = path.splitext(path.basename(args.model))[0]
-
-    embedder = load_embedder_from_model_path(args.model)
-    model = load_model_from_path(args.model)
-
-    statistics_df = create_distances_dataframe(args.dataset_file)
-
+def write_distances_statistics(statistics_df, output_dir, model_file_name):
+    """
+    Writes the predicted distances, and the statistics and plots of their differences from the BFS distances
+    :param statistics_df: The dataframe of create_distances_dataframe
+    :param output_dir: Directory to write to
+    :param model_file_name: Name of the model's file, without extension
+    """
     # Print out the statistics to csv file
     statistics_file_path = path.join(output_dir, f"{model_file_name}.stats")
     statistics_df.to_csv(statistics_file_path, sep=CSV_SEPARATOR, header=True, index=False)
@@ -157,3 +154,18 @@ if __name__ == "__main__":
     print(tabulate.tabulate(statistics_df, headers='keys', tablefmt='fancy_grid', floatfmt='.2f', showindex=False))
     with open(path.join(output_dir, "distances_differences.stats"), 'w', encoding='utf8') as f:
         f.write(tabulate.tabulate(statistics_df, headers='keys', showindex=False, tablefmt='fancy_grid', floatfmt='.2f'))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument('-m', '--model', required=True, help='Path to the model file. When running from linux - '
+                                                             'notice to not put a \'/\' after the file name')
+    parser.add_argument('-df', '--dataset_file', required=True, help='Path to a dataset file (a CSV or a pairs dataset)')
+    args = parser.parse_args()
+
+    embedder = load_embedder_from_model_path(args.model)
+    model = load_model_from_path(args.model)
+
+    # The dataset's pages are embedded once
+    statistics_df = create_distances_dataframe(model, DistanceDataset.load(args.dataset_file, embedder))
+    write_distances_statistics(statistics_df, path.dirname(args.model), path.splitext(path.basename(args.model))[0])
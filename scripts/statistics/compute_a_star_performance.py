@@ -12,16 +12,20 @@ import torch.utils.data
 from scripts.consts.model import NN_MODEL, FUNC_MODEL
 from scripts.consts.statistics import *
 from scripts.loaders import load_embedder_from_model_path, load_model_from_path, load_embedder_by_name, \
-    load_distance_method
+    load_distance_method, load_graph
 from scripts.utils import print_progress_bar, timing
 from wikisearch.astar import Astar
+from wikisearch.bidirectional_bfs import BidirectionalBFS
 from wikisearch.consts.mongo import CSV_SEPARATOR
+from wikisearch.consts.paths import PATH_TO_GRAPH_SNAPSHOT
 from wikisearch.costs.uniform_cost import UniformCost
 from wikisearch.embeddings import AVAILABLE_EMBEDDINGS
-from wikisearch.graph import WikiGraph
 from wikisearch.heuristics import BFSHeuristic
 from wikisearch.heuristics.nn_heuristic import NNHeuristic
-from wikisearch.strategies import DefaultAstarStrategy
+from wikisearch.multi_source_bfs import MultiSourceBFS, UNREACHABLE_DISTANCE
+from wikisearch.pairs_dataset import read_pairs
+from wikisearch.strategies import DefaultAstarStrategy, HeapAstarStrategy
+from wikisearch.utils.vector_store import VectorStore
 
 
 def print_path(path_pr):
@@ -45,14 +49,27 @@ def calculate_averages(distances_times: dict):
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser()
-    parser.add_argument('-df', '--dataset-file', required=True, help='Path to a dataset file')
+    parser.add_argument('-df', '--dataset-file', required=True,
+                        help='Path to a dataset file (a CSV or a pairs dataset)')
     parser.add_argument('-c', '--cost', default=1, help='The cost for the customizable model')
+    parser.add_argument('-cg', '--compact-graph', action='store_true', help='Use the compact (CSR) graph')
+    parser.add_argument('-gs', '--graph-snapshot', default=PATH_TO_GRAPH_SNAPSHOT,
+                        help='Path to a graph snapshot directory (created if doesn\'t exist)')
+    parser.add_argument('-hs', '--heap-open-set', action='store_true', help='Keep A*\'s open set as a binary heap')
+    parser.add_argument('-bb', '--bidirectional-bfs', action='store_true',
+                        help='Find the BFS distances by bidirectional BFS, instead of A* with BFS heuristic')
+    parser.add_argument('-ms', '--multi-source-bfs', action='store_true',
+                        help='Find the BFS distances of all the pairs at once by multi-source BFS (requires the '
+                             'compact graph), instead of searching each pair. The BFS paths aren\'t found, and the BFS '
+                             'time of a pair is the total time divided between the pairs')
     subparsers = parser.add_subparsers(help='sub-command help', dest="model_type")
 
     # Creates the parser for a nn model
     nn_parser = subparsers.add_parser(NN_MODEL, help='nn_model help')
     nn_parser.add_argument('-m', '--model', required=True, help='Path to the model file. When running from linux '
                                                                 '- notice to not put a \'/\' after the file name')
+    nn_parser.add_argument('-enc', '--encodings', help='Path to a store of the pages\' encodings by the model, '
+                                                       'created by scripts/encode_the_graph.py')
 
     # Creates the parser for a distance heuristic model
     dist_h_parser = subparsers.add_parser(FUNC_MODEL, help='func_model help')
@@ -63,7 +80,7 @@ if __name__ == "__main__":
     args = parser.parse_args()
 
     # Loads the dataset file
-    dataset = pd.read_csv(args.dataset_file, sep=CSV_SEPARATOR).values
+    sources, destinations, _ = read_pairs(args.dataset_file)
 
     # Prepare the statistics table
     statistics_df = pd.DataFrame(columns=[SRC_NODE, DST_NODE,
@@ -71,22 +88,32 @@ if __name__ == "__main__":
                                           NN_DIST, NN_TIME, NN_DEVELOPED, NN_H_DEVELOPED, NN_PATH])
     statistics_df = statistics_df.rename(lambda col: col.replace(' ', '\n'), axis='columns')
 
-    strategy = DefaultAstarStrategy()
-    graph = WikiGraph()
+    strategy = HeapAstarStrategy() if args.heap_open_set else DefaultAstarStrategy()
+    graph = load_graph(args.compact_graph, args.graph_snapshot)
 
-    astar_bfs = Astar(UniformCost(1), BFSHeuristic(), strategy, graph)
+    bfs_heuristic = BFSHeuristic()
+    if args.bidirectional_bfs:
+        astar_bfs = BidirectionalBFS(graph)
+    else:
+        astar_bfs = Astar(UniformCost(1), bfs_heuristic, strategy, graph)
     if args.model_type == NN_MODEL:
         model_dir_path = path.dirname(args.model)
         embedder = load_embedder_from_model_path(args.model)
         model = load_model_from_path(args.model)
-        astar_nn = Astar(UniformCost(int(args.cost)), NNHeuristic(model, embedder), strategy, graph)
+        encodings = VectorStore.load(args.encodings) if args.encodings else None
+        astar_nn = Astar(UniformCost(int(args.cost)), NNHeuristic(model, embedder, encodings), strategy, graph)
     else:
         model_dir_path = args.out
         embedder = load_embedder_by_name(args.embedding)
         distance_heuristic_method = load_distance_method(args.distance_heuristic, embedder)
         astar_nn = Astar(UniformCost(int(args.cost)), distance_heuristic_method, strategy, graph)
 
-    dataset_len = len(dataset)
+    dataset_len = len(sources)
+    if args.multi_source_bfs:
+        start = time.time()
+        bfs_distances = MultiSourceBFS(graph).pairs_distances(sources, destinations)
+        pair_bfs_time = (time.time() - start) / dataset_len
+        print(f"-TIME- Took {time.time() - start:.2f}s to find the BFS distances by multi-source BFS")
     bfs_distance_times = defaultdict(list)
     bfs_distance_developed = defaultdict(list)
     nn_distance_times = defaultdict(list)
@@ -98,8 +125,13 @@ if __name__ == "__main__":
     statistics_file_path_csv = path.join(model_dir_path, "model_a_star_stats.csv")
     with torch.no_grad():
         start = time.time()
-        for idx, (source, destination, _) in enumerate(dataset, 1):
-            bfs_path, bfs_dist, bfs_developed, bfs_time = timing(astar_bfs.run, source, destination)
+        for idx, (source, destination) in enumerate(zip(sources, destinations), 1):
+            if args.multi_source_bfs:
+                bfs_dist = bfs_distances[idx - 1]
+                bfs_path, bfs_dist, bfs_developed, bfs_time = \
+                    [], -1 if bfs_dist == UNREACHABLE_DISTANCE else int(bfs_dist), 0, pair_bfs_time
+            else:
+                bfs_path, bfs_dist, bfs_developed, bfs_time = timing(astar_bfs.run, source, destination)
             nn_path, nn_dist, nn_developed, nn_time = timing(astar_nn.run, source, destination)
             bfs_distance_times[bfs_dist].append(bfs_time)
             bfs_distance_developed[bfs_dist].append(bfs_developed)
@@ -113,7 +145,7 @@ if __name__ == "__main__":
                     BFS_DIST: bfs_dist,
                     BFS_TIME: bfs_time,
                     BFS_DEVELOPED: bfs_developed,
-                    BFS_H_DEVELOPED: astar_bfs._heuristic.count,
+                    BFS_H_DEVELOPED: bfs_heuristic.count,
                     BFS_PATH: print_path(bfs_path).replace("->", "\n->"),
                     NN_DIST: nn_dist,
                     NN_TIME: nn_time,
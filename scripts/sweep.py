@@ -0,0 +1,146 @@
+import contextlib
+import json
+import multiprocessing
+import os
+import time
+
+import torch
+
+from scripts.consts.model import MODEL_NAME
+
+# File in the output directory which records the configs that have completed, and their wall times
+SWEEP_STATE = "sweep.json"
+TRAIN_LOG = "train.log"
+TEST_LOG = "test.log"
+# The functions which train and test a config, the embedder and the datasets of the current embedding, and the
+# threads of each job
+_sweep = {}
+
+
+def params_to_argv(model_params):
+    """
+    Converts a config's parameters to the arguments of embeddings_nn.py, as they were split by the shell
+    """
+    return [token for key, value in model_params.items() for token in [str(key)] + str(value).split()]
+
+
+def get_sweep_key(model_dir):
+    """
+    Gets the key of a config in the sweep state: its model directory's name, so the state doesn't depend on how
+    the output directory is spelled
+    """
+    return os.path.basename(os.path.normpath(model_dir))
+
+
+def get_threads_per_job(threads, num_workers):
+    """
+    Divides the CPU threads between the jobs which run at once. Each job gets at least one thread
+    """
+    return max(1, threads // num_workers)
+
+
+def load_sweep_state(path):
+    """
+    Loads the state of a sweep: the record of each config that has completed, by its model directory's name
+    """
+    if not os.path.exists(path):
+        return {}
+    with open(path) as state_file:
+        return json.load(state_file)
+
+
+def save_sweep_state(path, state):
+    # The state is replaced at once, so an interrupted sweep doesn't leave a partial state
+    with open(path + ".tmp", "w") as state_file:
+        json.dump(state, state_file, indent=2)
+    os.replace(path + ".tmp", path)
+
+
+def set_config_paths(model_params, model_dir, train_file, validation_file, sweep_state):
+    """
+    Sets the datasets and the model directory of a config, unless it has completed in the past, and creates the model
+    directory. A config has completed if it's in the sweep state, or if its model directory has its model and its
+    test log. Configs whose run was interrupted are run again
+    :param model_params: The config's parameters
+    :param model_dir: The config's model directory
+    :param train_file: Path of the train dataset
+    :param validation_file: Path of the validation dataset
+    :param sweep_state: The state of the sweep (see load_sweep_state)
+    :return: Whether the config should run
+    """
+    sweep_key = get_sweep_key(model_dir)
+    if sweep_key in sweep_state:
+        return False
+    if os.path.exists(os.path.join(model_dir, MODEL_NAME)) and os.path.exists(os.path.join(model_dir, TEST_LOG)):
+        # Completed by a sweep from before the sweep state. It's recorded without wall times
+        sweep_state[sweep_key] = {}
+        return False
+    os.makedirs(model_dir, exist_ok=True)
+    model_params['-tr'] = train_file
+    model_params['-te'] = validation_file
+    model_params['-o'] = model_dir
+    return True
+
+
+def train_and_test_model(model_params):
+    """
+    Trains a config's model, and tests it, by the sweep's train and test functions. The outputs of the training and
+    of the test go to train.log and test.log in the model's directory
+    :param model_params: The config's parameters, where '-o' is the model's directory
+    :return: (key of the config in the sweep state, record of the config's wall times)
+    """
+    torch.set_num_threads(_sweep['threads_per_job'])
+    model_dir = model_params['-o']
+    start = time.time()
+    with open(os.path.join(model_dir, TRAIN_LOG), 'w') as log_file, contextlib.redirect_stdout(log_file):
+        _sweep['train'](model_params)
+    train_time = time.time() - start
+    # The test log is renamed when the test ends, so a model directory with a test log has completed
+    test_log_path = os.path.join(model_dir, TEST_LOG)
+    with open(test_log_path + ".tmp", 'w') as log_file, contextlib.redirect_stdout(log_file):
+        _sweep['test'](model_dir)
+    os.replace(test_log_path + ".tmp", test_log_path)
+    return get_sweep_key(model_dir), {
+        'train_time': train_time,
+        'test_time': time.time() - start - train_time,
+        'wall_time': time.time() - start,
+        'threads': _sweep['threads_per_job'],
+    }
+
+
+def run_sweep(configs, load_shared, train, test, num_workers, threads, state_path, sweep_state):
+    """
+    Trains and tests configs, and records each config that completes in the sweep state. The configs of each
+    embedding share its embedder and datasets, which are loaded once. The workers are forked after they're loaded,
+    so they share them
+    :param configs: The parameters of the configs to run, whose paths are set (see set_config_paths)
+    :param load_shared: Function which loads an embedding's (embedder, train dataset, validation dataset)
+    :param train: Function which trains a config's model, given the config's parameters
+    :param test: Function which tests a config's model, given its model directory
+    :param num_workers: Number of configs to run at once
+    :param threads: Number of CPU threads to divide between the workers
+    :param state_path: Path of the sweep state
+    :param sweep_state: The sweep state by which the configs were selected. It's saved before the configs run, with
+    the configs which set_config_paths recorded
+    :return: The sweep state
+    """
+    save_sweep_state(state_path, sweep_state)
+    num_workers = max(1, min(num_workers, len(configs)))
+    _sweep.update(train=train, test=test, threads_per_job=get_threads_per_job(threads, num_workers))
+    for embedding in sorted({params['--embedding'] for params in configs}):
+        embedding_configs = [params for params in configs if params['--embedding'] == embedding]
+        print(f"-INFO- Loading {embedding} and its datasets, for {len(embedding_configs)} experiments")
+        _sweep['embedder'], _sweep['train_dataset'], _sweep['validation_dataset'] = load_shared(embedding)
+
+        pool = multiprocessing.get_context('fork').Pool(min(num_workers, len(embedding_configs))) \
+            if num_workers > 1 else None
+        results = map(train_and_test_model, embedding_configs) if pool is None else \
+            pool.imap_unordered(train_and_test_model, embedding_configs)
+        for sweep_key, record in results:
+            sweep_state[sweep_key] = record
+            save_sweep_state(state_path, sweep_state)
+            print(f"-TIME- {sweep_key} took {record['wall_time']:.1f}s")
+        if pool is not None:
+            pool.close()
+            pool.join()
+    return sweep_state
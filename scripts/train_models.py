@@ -2,15 +2,19 @@ import argparse
 import itertools
 import json
 import os
-import subprocess
-import sys
+from functools import partial
 from multiprocessing import cpu_count
-from multiprocessing.pool import Pool
 
 import pandas as pd
 import tabulate
+import torch
 
 from scripts.consts.model import MODEL_NAME
+from scripts.distance_dataset import DistanceDataset
+from scripts.embeddings_nn import build_parser, train_model
+from scripts.loaders import load_embedder_by_name, load_model_from_path
+from scripts.statistics.calculate_distances_statistics import create_distances_dataframe, write_distances_statistics
+from scripts.sweep import SWEEP_STATE, _sweep, params_to_argv, load_sweep_state, set_config_paths, run_sweep
 from wikisearch.consts.embeddings import KMEANS
 
 
@@ -23,14 +27,32 @@ def remove_duplicates(l):
     return [dict(t) for t in {tuple(d.items()) for d in l}]
 
 
-def train_and_test_model(model_params):
-    print(f'Running {model_params["-o"]}...')
-    params_str = " ".join([" ".join([str(k), str(v)]) for k, v in model_params.items()])
-    train_command = f"python {os.path.join(sys.path[0], 'embeddings_nn.py')} {params_str}"
-    test_command = f"python {os.path.join(sys.path[0], 'statistics/calculate_distances_statistics.py')} -m" \
-        f"{os.path.join(model_params['-o'], 'model.pth')} -df {model_params['-te']}"
-    subprocess.call(train_command, shell=True, stdout=open(os.path.join(model_params['-o'], 'train.log'), 'w'))
-    subprocess.call(test_command, shell=True, stdout=open(os.path.join(model_params['-o'], 'test.log'), 'w+'))
+def load_shared(train_file, validation_file, embedding):
+    """
+    Loads the embedder of an embedding, and the datasets, which the embedding's configs share
+    :return: (embedder, train dataset, validation dataset)
+    """
+    embedder = load_embedder_by_name(embedding)
+    return embedder, DistanceDataset.load(train_file, embedder), DistanceDataset.load(validation_file, embedder)
+
+
+def train_config(model_params):
+    """
+    Trains a config's model on the shared train dataset, validating it on the shared validation dataset
+    :param model_params: The config's parameters
+    """
+    args = build_parser().parse_args(params_to_argv(model_params))
+    train_model(args, _sweep['embedder'], _sweep['train_dataset'], _sweep['validation_dataset'])
+
+
+def test_config(model_dir):
+    """
+    Calculates the distances statistics of a config's model on the shared validation dataset
+    :param model_dir: The model's directory
+    """
+    model = load_model_from_path(os.path.join(model_dir, MODEL_NAME))
+    statistics_df = create_distances_dataframe(model, _sweep['validation_dataset'])
+    write_distances_statistics(statistics_df, model_dir, os.path.splitext(MODEL_NAME)[0])
 
 
 if __name__ == "__main__":
@@ -38,10 +60,14 @@ if __name__ == "__main__":
     parser.add_argument(dest="dataset_dir", help="Directory where dataset train, val, test files are")
     parser.add_argument('-i', '--inp', help="Json file which includes all experiments parameters")
     parser.add_argument('-o', '--out', help="Directory to which models will be written (Default: dataset directory)")
-    parser.add_argument("-w", "--num-workers", default=1, type=int)
+    parser.add_argument("-w", "--num-workers", default=1, type=int, help="Number of configs to run at once")
+    parser.add_argument("-t", "--threads", default=cpu_count(), type=int,
+                        help="Number of CPU threads to divide between the workers")
     args = parser.parse_args()
     if args.out is None:
         args.out = args.dataset_dir
+    if args.num_workers > 1 and torch.cuda.is_available():
+        raise ValueError("The workers are forked, and CUDA can't be used in forked processes. Use one worker")
 
     # Import parameters from json file, and expand with product_dict
     with open(args.inp) as params_f:
@@ -58,6 +84,8 @@ if __name__ == "__main__":
     train_file = os.path.join(args.dataset_dir, "train.csv")
     validation_file = os.path.join(args.dataset_dir, "validation.csv")
 
+    sweep_state_path = os.path.join(args.out, SWEEP_STATE)
+    sweep_state = load_sweep_state(sweep_state_path)
     for params in all_models_params:
         model_dir = '_'.join([params['--embedding'], params['--arch'], params['--crit'], params['--opt'],
                               str(params['--lr']), str(params['-b'])] +
@@ -65,24 +93,16 @@ if __name__ == "__main__":
                              ([str(params['--sgd-momentum'])] if '--sgd-momentum' in params else []) +
                              ([f'kmeans-{KMEANS}'] if params['--embedding'].lower().find('kmeans') > -1 else []))
         model_dir = model_dir.lower().replace(' ', '_')
-        model_dir = os.path.join(args.out, model_dir)
-
-        if os.path.exists(os.path.join(model_dir, MODEL_NAME)):
-            # Filter models that were already run in the past (directory exists and is not empty!
-            continue
-        os.makedirs(model_dir, exist_ok=True)
-        params['-tr'] = train_file
-        params['-te'] = validation_file
-        params['-o'] = model_dir
+        set_config_paths(params, os.path.join(args.out, model_dir), train_file, validation_file, sweep_state)
 
     # Only models that haven't been run before will have -o parameter, and we run only them!
     all_models_params = [params for params in all_models_params if '-o' in params]
     print(f"Running {len(all_models_params)} out of {len(models_df)} experiments")
 
     # Train and test!
-    if args.num_workers == 1:
-        for params in all_models_params:
-            train_and_test_model(params)
-    else:
-        pool = Pool(min(args.num_workers, cpu_count() - 1))
-        pool.map(train_and_test_model, all_models_params)
+    os.makedirs(args.out, exist_ok=True)
+    sweep_state = run_sweep(all_models_params, partial(load_shared, train_file, validation_file), train_config,
+                            test_config, args.num_workers, args.threads, sweep_state_path, sweep_state)
+
+    sweep_df = pd.DataFrame([dict(model=sweep_key, **record) for sweep_key, record in sweep_state.items()])
+    print(tabulate.tabulate(sweep_df, headers='keys', tablefmt='fancy_grid', showindex=False, floatfmt='.1f'))
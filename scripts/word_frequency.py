@@ -8,8 +8,8 @@ import numpy as np
 
 from scripts.utils import print_progress_bar, Cache
 from wikisearch.consts.mongo import WIKI_LANG, PAGES, ENTRY_TEXT
-from wikisearch.embeddings import FastText
 from wikisearch.utils.mongo_handler import MongoHandler
+from wikisearch.utils.tokenizer import Tokenizer
 
 import matplotlib.pyplot as plt
 
@@ -46,7 +46,7 @@ if __name__ == "__main__":
     args = parser.parse_args()
 
     pages_handler = MongoHandler(WIKI_LANG, PAGES)
-    all_pages = pages_handler.get_all_documents()
+    all_pages = pages_handler.get_pages({ENTRY_TEXT: {"$exists": True}}, {ENTRY_TEXT: True})
     cache = Cache()
     pages_text = cache["word_frequency_pages_text"]
     if pages_text is None:
@@ -54,9 +54,9 @@ if __name__ == "__main__":
         all_pages_len = all_pages.count()
         start_time = time.time()
 
-        for i, page in enumerate(all_pages):
-            if ENTRY_TEXT in page:
-                pages_text.append(FastText.tokenize_text(page[ENTRY_TEXT]))
+        tokenizer = Tokenizer()
+        for i, page in enumerate(all_pages, 1):
+            pages_text.append(tokenizer.tokenize(page[ENTRY_TEXT]))
             print_progress_bar(i, all_pages_len, time.time() - start_time, length=50)
         print()
         cache["word_frequency_pages_text"] = pages_text
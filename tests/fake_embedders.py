@@ -0,0 +1,57 @@
+import zlib
+
+import torch
+
+from wikisearch.utils.sparse_categories import indices_to_bags, indices_to_multihot
+
+
+class TitleHashEmbedder:
+    """
+    An embedder which gives each title a fixed random embedding
+    """
+    sparse_categories = False
+
+    def __init__(self, embed_dim, store=None):
+        """
+        :param embed_dim: Size of the embeddings
+        :param store: VectorStore of some of the embeddings
+        """
+        self._embed_dim = embed_dim
+        self.store = store
+
+    def embed(self, title):
+        generator = torch.Generator().manual_seed(zlib.crc32(title.encode('utf-8')))
+        return torch.randn(self._embed_dim, generator=generator)
+
+    def embed_batch(self, titles):
+        return torch.stack([self.embed(title) for title in titles])
+
+    def embed_nodes(self, nodes):
+        return self.embed_batch([node.title for node in nodes])
+
+
+class TitleHashCategoriesEmbedder(TitleHashEmbedder):
+    """
+    An embedder which gives each title a fixed random embedding followed by fixed random categories, which it can
+    also give sparsely
+    """
+    sparse_categories = True
+
+    def __init__(self, embed_dim, categories_dim):
+        super(TitleHashCategoriesEmbedder, self).__init__(embed_dim)
+        self._categories_dim = categories_dim
+
+    def _categories_indices(self, title):
+        generator = torch.Generator().manual_seed(zlib.crc32(title.encode('utf-8')))
+        return torch.randperm(self._categories_dim, generator=generator)[:zlib.crc32(title.encode('utf-8')) % 5]
+
+    def embed(self, title):
+        return torch.cat((super(TitleHashCategoriesEmbedder, self).embed(title),
+                          indices_to_multihot(self._categories_indices(title), self._categories_dim)))
+
+    def embed_batch_sparse(self, titles):
+        return (torch.stack([super(TitleHashCategoriesEmbedder, self).embed(title) for title in titles]),) + \
+            indices_to_bags([self._categories_indices(title) for title in titles])
+
+    def embed_nodes_sparse(self, nodes):
+        return self.embed_batch_sparse([node.title for node in nodes])
@@ -0,0 +1,33 @@
+import random
+
+from wikisearch.consts.mongo import ENTRY_TITLE, ENTRY_PID, ENTRY_TEXT, ENTRY_LINKS, ENTRY_CATEGORIES, \
+    ENTRY_REDIRECT_TO
+
+
+def create_fake_pages(num_pages=200, num_redirects=30, max_links=8, seed=0):
+    """
+    Creates documents in the format of the pages collection, of a random graph, to test graphs without a database.
+    Links also point to redirects, to pages that don't exist and to the same page more than once
+    :param num_pages: Number of "normal" pages
+    :param num_redirects: Number of redirect pages
+    :param max_links: Maximum number of links per page
+    :param seed: Seed used by random generator
+    :return: List of pages documents
+    """
+    rnd_generator = random.Random(seed)
+    titles = [f"Page {i}" for i in range(num_pages)]
+    redirects = [f"Redirect {i}" for i in range(num_redirects)]
+    # Some links are to pages that don't exist
+    link_options = titles + redirects + [f"Missing {i}" for i in range(10)]
+
+    pages = []
+    for pid, title in enumerate(titles):
+        links = [rnd_generator.choice(link_options) for _ in range(rnd_generator.randint(0, max_links))]
+        pages.append({ENTRY_TITLE: title, ENTRY_PID: str(pid), ENTRY_TEXT: f"Text of {title}",
+                      ENTRY_LINKS: links, ENTRY_CATEGORIES: []})
+    for i, redirect in enumerate(redirects):
+        # The last redirect points to a redirect, which isn't followed
+        redirect_to = redirects[0] if i == num_redirects - 1 else rnd_generator.choice(titles)
+        pages.append({ENTRY_TITLE: redirect, ENTRY_REDIRECT_TO: redirect_to})
+    rnd_generator.shuffle(pages)
+    return pages
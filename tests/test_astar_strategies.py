@@ -0,0 +1,46 @@
+import unittest
+import zlib
+
+from tests.fake_pages import create_fake_pages
+from wikisearch.astar import Astar
+from wikisearch.compact_graph import CompactWikiGraph
+from wikisearch.costs.uniform_cost import UniformCost
+from wikisearch.graph import WikiGraph
+from wikisearch.heuristics import BFSHeuristic
+from wikisearch.heuristics.heuristic import Heuristic
+from wikisearch.strategies import DefaultAstarStrategy, HeapAstarStrategy
+
+
+class TitleHashHeuristic(Heuristic):
+    """
+    An inadmissible heuristic with many ties, so that states are reopened and tie-breaking matters
+    """
+
+    def _calculate(self, curr_state, dest_state):
+        return zlib.crc32((curr_state.title + dest_state.title).encode('utf-8')) % 3
+
+
+class TestAstarStrategies(unittest.TestCase):
+    def setUp(self):
+        pages = create_fake_pages(num_pages=300, max_links=5, seed=1)
+        self.graphs = [WikiGraph(pages), CompactWikiGraph(pages)]
+
+    def tearDown(self):
+        del self.graphs
+
+    def test_heap_strategy_same_results(self):
+        samples = [('Page 0', 'Page 1'), ('Page 5', 'Redirect 3'), ('Page 7', 'Page 250'), ('Page 9', 'Page 42')]
+        for graph in self.graphs:
+            for heuristic in [BFSHeuristic(), TitleHashHeuristic()]:
+                default_astar = Astar(UniformCost(1), heuristic, DefaultAstarStrategy(), graph)
+                heap_astar = Astar(UniformCost(1), heuristic, HeapAstarStrategy(), graph)
+                for source, destination in samples:
+                    path, distance, developed = default_astar.run(source, destination)
+                    heap_path, heap_distance, heap_developed = heap_astar.run(source, destination)
+                    self.assertEqual(distance, heap_distance)
+                    self.assertEqual(developed, heap_developed)
+                    self.assertEqual(Astar.stringify_path(path or []), Astar.stringify_path(heap_path or []))
+
+
+if __name__ == "__main__":
+    unittest.main()
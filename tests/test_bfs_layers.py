@@ -0,0 +1,40 @@
+import unittest
+
+from tests.fake_pages import create_fake_pages
+from wikisearch.bfs_layers import BFSLayers
+from wikisearch.bidirectional_bfs import BidirectionalBFS
+from wikisearch.compact_graph import CompactWikiGraph
+from wikisearch.graph import WikiGraph
+
+
+class TestBFSLayers(unittest.TestCase):
+    def setUp(self):
+        pages = create_fake_pages(num_pages=300, max_links=4, seed=3)
+        self.graphs = [WikiGraph(pages), CompactWikiGraph(pages)]
+        self.sources = sorted(self.graphs[0].keys())[:15]
+
+    def _layers_titles(self, graph, source, max_distance):
+        bfs_layers = BFSLayers(graph, graph.get_node(source), max_distance)
+        return [{bfs_layers.get_node(distance, index).title for index in range(bfs_layers.get_layer_size(distance))}
+                for distance in range(1, bfs_layers.max_distance + 1)], bfs_layers
+
+    def test_same_layers_in_both_graphs(self):
+        for source in self.sources:
+            layers, bfs_layers = self._layers_titles(self.graphs[0], source, 20)
+            compact_layers, compact_bfs_layers = self._layers_titles(self.graphs[1], source, 20)
+            self.assertEqual(layers, compact_layers)
+            self.assertEqual(bfs_layers.developed, compact_bfs_layers.developed)
+
+    def test_layers_are_shortest_distances(self):
+        graph = self.graphs[1]
+        bidirectional_bfs = BidirectionalBFS(graph)
+        for source in self.sources[:5]:
+            layers, _ = self._layers_titles(graph, source, 3)
+            self.assertLessEqual(len(layers), 3)
+            for distance, layer in enumerate(layers, 1):
+                for destination in layer:
+                    self.assertEqual(bidirectional_bfs.run(source, destination)[1], distance)
+
+
+if __name__ == '__main__':
+    unittest.main()
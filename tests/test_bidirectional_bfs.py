@@ -0,0 +1,39 @@
+import unittest
+
+from tests.fake_pages import create_fake_pages
+from wikisearch.astar import Astar
+from wikisearch.bidirectional_bfs import BidirectionalBFS
+from wikisearch.compact_graph import CompactWikiGraph
+from wikisearch.costs.uniform_cost import UniformCost
+from wikisearch.graph import WikiGraph
+from wikisearch.heuristics import BFSHeuristic
+from wikisearch.strategies import DefaultAstarStrategy
+
+
+class TestBidirectionalBFS(unittest.TestCase):
+    def setUp(self):
+        pages = create_fake_pages(num_pages=300, max_links=4, seed=2)
+        self.graphs = [WikiGraph(pages), CompactWikiGraph(pages)]
+
+    def tearDown(self):
+        del self.graphs
+
+    def test_same_distances_as_astar(self):
+        for graph in self.graphs:
+            astar = Astar(UniformCost(1), BFSHeuristic(), DefaultAstarStrategy(), graph)
+            bidirectional_bfs = BidirectionalBFS(graph)
+            titles = sorted(graph.keys())
+            for source in titles[:10]:
+                for destination in titles[::7] + ['Redirect 1']:
+                    _, distance, _ = astar.run(source, destination)
+                    path, bidirectional_distance, _ = bidirectional_bfs.run(source, destination)
+                    self.assertEqual(distance, bidirectional_distance, f'{source} -> {destination}')
+                    if path:
+                        self.assertEqual(path[0], graph.get_node(source))
+                        self.assertEqual(path[-1], graph.get_node(destination))
+                        for node, next_node in zip(path, path[1:]):
+                            self.assertIn(next_node, list(graph.get_node_neighbors(node)))
+
+
+if __name__ == "__main__":
+    unittest.main()
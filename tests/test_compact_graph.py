@@ -0,0 +1,100 @@
+import json
+import os
+import tempfile
+import unittest
+
+from tests.fake_pages import create_fake_pages
+from wikisearch.astar import Astar
+from wikisearch.compact_graph import CompactWikiGraph
+from wikisearch.costs.uniform_cost import UniformCost
+from wikisearch.graph import WikiGraph
+from wikisearch.graph_snapshot import SNAPSHOT_META
+from wikisearch.heuristics import BFSHeuristic
+from wikisearch.strategies import DefaultAstarStrategy
+
+
+class TestCompactWikiGraph(unittest.TestCase):
+    def setUp(self):
+        pages = create_fake_pages()
+        self.graph = WikiGraph(pages, build_predecessors=True)
+        self.compact_graph = CompactWikiGraph(pages)
+
+    def tearDown(self):
+        del self.graph, self.compact_graph
+
+    def test_same_nodes(self):
+        self.assertEqual(sorted(self.graph.keys()), sorted(self.compact_graph.keys()))
+        for title in ['Page 0', 'Redirect 0', 'Redirect 29', 'Missing 0']:
+            node = self.graph.get_node(title)
+            compact_node = self.compact_graph.get_node(title)
+            self.assertEqual(node is None, compact_node is None, title)
+            if node:
+                self.assertEqual(node.title, compact_node.title)
+                self.assertEqual(node.pid, compact_node.pid)
+                self.assertEqual(compact_node, self.compact_graph.get_node(node.title))
+
+    def test_same_neighbors(self):
+        for title in self.graph.keys():
+            neighbors = [node.title for node in self.graph.get_node_neighbors(self.graph.get_node(title))]
+            compact_neighbors = [node.title for node in
+                                 self.compact_graph.get_node_neighbors(self.compact_graph.get_node(title))]
+            self.assertEqual(neighbors, compact_neighbors, title)
+
+    def test_same_predecessors(self):
+        for title in self.graph.keys():
+            predecessors = [node.title for node in self.graph.get_node_predecessors(self.graph.get_node(title))]
+            compact_predecessors = [node.title for node in
+                                    self.compact_graph.get_node_predecessors(self.compact_graph.get_node(title))]
+            self.assertEqual(predecessors, compact_predecessors, title)
+            for predecessor in predecessors:
+                self.assertIn(title, [node.title for node in
+                                      self.graph.get_node_neighbors(self.graph.get_node(predecessor))])
+
+    def test_same_astar_results(self):
+        astar = Astar(UniformCost(1), BFSHeuristic(), DefaultAstarStrategy(), self.graph)
+        compact_astar = Astar(UniformCost(1), BFSHeuristic(), DefaultAstarStrategy(), self.compact_graph)
+        for source, destination in [('Page 0', 'Page 1'), ('Page 5', 'Redirect 3'), ('Page 7', 'Page 150')]:
+            path, distance, developed = astar.run(source, destination)
+            compact_path, compact_distance, compact_developed = compact_astar.run(source, destination)
+            self.assertEqual(distance, compact_distance)
+            self.assertEqual(developed, compact_developed)
+            self.assertEqual(Astar.stringify_path(path or []), Astar.stringify_path(compact_path or []))
+
+
+class TestGraphSnapshot(unittest.TestCase):
+    def setUp(self):
+        self.graph = WikiGraph(create_fake_pages())
+        self.snapshot_dir = tempfile.TemporaryDirectory()
+        self.graph.save_snapshot(self.snapshot_dir.name)
+
+    def tearDown(self):
+        self.snapshot_dir.cleanup()
+        del self.graph, self.snapshot_dir
+
+    def test_load_snapshot(self):
+        for mmap in [True, False]:
+            snapshot_graph = WikiGraph.load_snapshot(self.snapshot_dir.name, mmap=mmap)
+            self.assertEqual(sorted(self.graph.keys()), sorted(snapshot_graph.keys()))
+            for title in ['Redirect 0', 'Redirect 29', 'Missing 0'] + list(self.graph.keys()):
+                node = self.graph.get_node(title)
+                snapshot_node = snapshot_graph.get_node(title)
+                self.assertEqual(node is None, snapshot_node is None, title)
+                if node:
+                    self.assertEqual(node.title, snapshot_node.title)
+                    self.assertEqual(node.pid, snapshot_node.pid)
+                    self.assertEqual([neighbor.title for neighbor in self.graph.get_node_neighbors(node)],
+                                     [neighbor.title for neighbor in snapshot_graph.get_node_neighbors(snapshot_node)])
+
+    def test_unsupported_version(self):
+        meta_path = os.path.join(self.snapshot_dir.name, SNAPSHOT_META)
+        with open(meta_path) as meta_file:
+            metadata = json.load(meta_file)
+        metadata['version'] += 1
+        with open(meta_path, 'w') as meta_file:
+            json.dump(metadata, meta_file)
+        with self.assertRaises(ValueError):
+            WikiGraph.load_snapshot(self.snapshot_dir.name)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,131 @@
+import re
+import threading
+import time
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from corenlp_protobuf import Document, writeToDelimitedString
+
+from wikisearch.utils.corenlp_pool import CoreNLPPool, TEXTS_SEPARATOR
+
+TEXTS = [
+    "Anarchism is a political philosophy. It rejects hierarchies.",
+    "",
+    "The Beatles were an English rock band",
+    "Emoji \U0001F600 count as two Java chars. So offsets shift.",
+    "One. Two. Three.",
+] * 5
+
+
+def annotate_text(text):
+    """
+    Stand-in for CoreNLP: tokens are split by whitespace, sentences end at a token ending with '.' or at an empty
+    line, lemmas are the lowercased words and all the tokens are nouns
+    """
+    document = Document()
+    document.text = text
+    sentence = None
+    tokens_count = 0
+    for match in re.finditer(r"\S+|\n\n", text):
+        if match.group() == TEXTS_SEPARATOR:
+            sentence = None
+            continue
+        if sentence is None:
+            sentence = document.sentence.add()
+            sentence.tokenOffsetBegin = tokens_count
+        tokens_count += 1
+        sentence.tokenOffsetEnd = tokens_count
+        token = sentence.token.add()
+        token.word = match.group()
+        token.lemma = match.group().lower()
+        token.pos = "NN"
+        # CoreNLP counts offsets in UTF-16 code units
+        token.beginChar = len(text[:match.start()].encode('utf-16-le')) // 2
+        token.endChar = len(text[:match.end()].encode('utf-16-le')) // 2
+        if token.word.endswith("."):
+            sentence = None
+    return writeToDelimitedString(document).getvalue()
+
+
+class StandInCoreNLPHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        self.send_response(200)
+        self.end_headers()
+        self.wfile.write(b"pong")
+
+    def do_POST(self):
+        server = self.server
+        with server.lock:
+            server.requests_count += 1
+            request_index = server.requests_count
+            server.in_flight += 1
+            server.max_in_flight = max(server.max_in_flight, server.in_flight)
+        try:
+            text = self.rfile.read(int(self.headers['Content-Length'])).decode('utf-8')
+            time.sleep(server.slow_requests.get(request_index, server.delay))
+            body = annotate_text(text)
+            self.send_response(200)
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        except (BrokenPipeError, ConnectionResetError):
+            # The client timed out and closed the connection
+            pass
+        finally:
+            with server.lock:
+                server.in_flight -= 1
+
+    def log_message(self, *args):
+        pass
+
+
+class TestCoreNLPPool(unittest.TestCase):
+    def setUp(self):
+        self.server = ThreadingHTTPServer(("localhost", 0), StandInCoreNLPHandler)
+        self.server.lock = threading.Lock()
+        self.server.requests_count = 0
+        self.server.in_flight = 0
+        self.server.max_in_flight = 0
+        self.server.delay = 0
+        self.server.slow_requests = {}
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.endpoint = f"http://localhost:{self.server.server_address[1]}"
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def _words(self, sentences):
+        return [[token.word for token in sentence.token] for sentence in sentences]
+
+    def test_batches_keep_texts_boundaries(self):
+        pool = CoreNLPPool(["tokenize", "ssplit"], endpoint=self.endpoint, num_threads=2, batch_size=4)
+        expected = [self._words(pool.annotate(text)) for text in TEXTS]
+        requests_count = self.server.requests_count
+        self.assertEqual([self._words(sentences) for sentences in pool.annotate_many(TEXTS)], expected)
+        self.assertEqual(expected[0], [["Anarchism", "is", "a", "political", "philosophy."],
+                                       ["It", "rejects", "hierarchies."]])
+        self.assertEqual(expected[1], [])
+        # Texts are sent in batches, and empty texts are not sent at all
+        self.assertEqual(self.server.requests_count - requests_count, (len(TEXTS) + 3) // 4)
+        pool.close()
+
+    def test_concurrent_requests(self):
+        self.server.delay = 0.1
+        pool = CoreNLPPool(["tokenize", "ssplit"], endpoint=self.endpoint, num_threads=4, batch_size=1)
+        self.assertEqual(len(list(pool.annotate_many(TEXTS))), len(TEXTS))
+        self.assertGreater(self.server.max_in_flight, 1)
+        pool.close()
+
+    def test_retry_on_timeout(self):
+        # The first request takes longer than the client's timeout (twice the timeout parameter)
+        self.server.slow_requests = {1: 1.0}
+        pool = CoreNLPPool(["tokenize", "ssplit"], endpoint=self.endpoint, num_threads=1, timeout=200,
+                           retry_delay=0)
+        self.assertEqual(self._words(pool.annotate(TEXTS[2])), [TEXTS[2].split()])
+        self.assertEqual(self.server.requests_count, 2)
+        pool.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
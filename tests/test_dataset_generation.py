@@ -0,0 +1,159 @@
+import argparse
+import csv
+import io
+import multiprocessing
+import os
+import tempfile
+import unittest
+from collections import Counter
+from unittest import mock
+
+import scripts.dataset_generation
+from scripts.dataset_generation import init_worker, generate_sharded_dataset, generate_rows, get_distance_quotas, \
+    move_unreachable_quota, rnd_generator, sample_from_source
+from tests.fake_pages import create_fake_pages
+from wikisearch.bfs_layers import BFSLayers
+from wikisearch.compact_graph import CompactWikiGraph
+from wikisearch.consts.mongo import ENTRY_TITLE, ENTRY_PID, ENTRY_TEXT, ENTRY_LINKS, ENTRY_CATEGORIES
+from wikisearch.graph import WikiGraph
+from wikisearch.pairs_dataset import create_csv_writer, read_csv_pairs, CSV_COLUMNS
+
+
+def load_fake_graph():
+    return WikiGraph(create_fake_pages(num_pages=300, max_links=4, seed=3))
+
+
+class TestDatasetGeneration(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def _generate(self, args, workers, name):
+        dataset_path = os.path.join(self.temp_dir.name, name + '.csv')
+        # Spawned workers build the graph by themselves, so its nodes are at different addresses in each of them
+        with multiprocessing.get_context('spawn').Pool(workers, init_worker, (args, load_fake_graph)) as pool:
+            rows_statistics = generate_sharded_dataset(pool, 'train', 50, 8, 1234, dataset_path)
+        self.assertEqual(len(rows_statistics), 50)
+        with open(dataset_path, encoding='utf8') as dataset_file:
+            return dataset_file.read()
+
+    def test_same_rows_for_any_number_of_workers(self):
+        for rows_per_source in [None, 3]:
+            args = argparse.Namespace(rows_per_source=rows_per_source, max_distance=6, distance_weights=None,
+                                      multi_source_bfs=False, max_misses=1000)
+            datasets = [self._generate(args, workers, f'{rows_per_source}_{workers}_{run}')
+                        for workers, run in [(1, 0), (1, 1), (3, 0)]]
+            self.assertEqual(datasets[0], datasets[1])
+            self.assertEqual(datasets[0], datasets[2])
+            # The shards were merged and removed
+            self.assertFalse([name for name in os.listdir(self.temp_dir.name) if '.shard' in name])
+            sources, destinations, min_distances = read_csv_pairs(
+                os.path.join(self.temp_dir.name, f'{rows_per_source}_1_0.csv'))
+            self.assertEqual(len(sources), 50)
+            self.assertTrue(all(1 <= min_distance <= 6 for min_distance in min_distances))
+
+
+def create_star_pages(num_leaves=10):
+    """
+    Creates the pages of a star, whose hub and leaves link to each other, so no page is farther than 2 from another
+    """
+    leaves = [f'Leaf {i}' for i in range(num_leaves)]
+    return [{ENTRY_TITLE: title, ENTRY_PID: str(pid), ENTRY_TEXT: f'Text of {title}', ENTRY_LINKS: links,
+             ENTRY_CATEGORIES: []}
+            for pid, (title, links) in enumerate([('Hub', leaves)] + [(leaf, ['Hub']) for leaf in leaves])]
+
+
+class TestSamplingBySource(unittest.TestCase):
+    def setUp(self):
+        rnd_generator.seed(5)
+        pages = create_fake_pages(num_pages=300, max_links=4, seed=3)
+        self.graphs = [WikiGraph(pages), CompactWikiGraph(pages)]
+
+    def _args(self, max_distance, distance_weights=None, multi_source_bfs=False, max_misses=1000):
+        return argparse.Namespace(rows_per_source=3, max_distance=max_distance, distance_weights=distance_weights,
+                                  multi_source_bfs=multi_source_bfs, max_misses=max_misses)
+
+    def _generate_rows(self, graph, num_records, args):
+        """
+        Generates rows by generate_rows
+        :return: List of the (source, destination, distance) rows which were written
+        """
+        csv_file = io.StringIO(newline='')
+        rows_statistics = generate_rows(graph, sorted(graph.keys()), num_records, args, create_csv_writer(csv_file))
+        csv_file.seek(0)
+        reader = csv.reader(csv_file, delimiter='\t')
+        self.assertEqual(next(reader), CSV_COLUMNS)
+        rows = [(source, destination, int(distance)) for source, destination, distance in reader]
+        self.assertEqual(sorted(row[2] for row in rows), sorted(statistics[0] for statistics in rows_statistics))
+        return rows
+
+    def test_distance_quotas(self):
+        self.assertEqual(get_distance_quotas(10, 4), {1: 3, 2: 3, 3: 2, 4: 2})
+        self.assertEqual(get_distance_quotas(10, 3, [1, 3, 1]), {1: 2, 2: 6, 3: 2})
+        self.assertEqual(get_distance_quotas(2, 3), {1: 1, 2: 1, 3: 0})
+
+    def test_distances_histogram_equals_quotas(self):
+        for graph, multi_source_bfs in [(self.graphs[0], False), (self.graphs[1], False), (self.graphs[1], True)]:
+            args = self._args(4, [1, 2, 3, 4], multi_source_bfs)
+            rows = self._generate_rows(graph, 100, args)
+            self.assertEqual(Counter(row[2] for row in rows), Counter(get_distance_quotas(100, 4, [1, 2, 3, 4])))
+            for source, destination, distance in rows[:20]:
+                bfs_layers = BFSLayers(graph, graph.get_node(source), distance)
+                self.assertIn(destination, {bfs_layers.get_node(distance, index).title
+                                            for index in range(bfs_layers.get_layer_size(distance))})
+
+    def test_rows_written_through_shuffle_buffer(self):
+        graph = self.graphs[1]
+        writer = mock.Mock()
+        # With a buffer smaller than the dataset, rows are written while they're generated, and the buffer's rows
+        # at the end
+        with mock.patch.object(scripts.dataset_generation, 'SHUFFLE_BUFFER_ROWS', 8):
+            rows_statistics = generate_rows(graph, sorted(graph.keys()), 60, self._args(4), writer)
+        # A random row is written whenever the buffer fills up, so 7 rows are left in it at the end
+        self.assertEqual(writer.writerow.call_count, 60 - 7)
+        written_rows = [call.args[0] for call in writer.writerow.call_args_list] + \
+            list(writer.writerows.call_args.args[0])
+        self.assertEqual(Counter(row[2] for row in written_rows), Counter(get_distance_quotas(60, 4)))
+        self.assertEqual(sorted(row[2] for row in written_rows), sorted(row[0] for row in rows_statistics))
+
+    def test_sample_from_source(self):
+        graph = self.graphs[0]
+        for source in sorted(graph.keys())[:30]:
+            remaining_quotas = {1: 5, 2: 0, 3: 5, 4: 5, 5: 5}
+            bfs_layers = BFSLayers(graph, graph.get_node(source), 5)
+            samples = sample_from_source(bfs_layers, remaining_quotas, 3)
+            distances = [distance for _, distance, _, _ in samples]
+            # Up to rows per source rows, at distinct distances which still have a quota
+            self.assertEqual(len(samples), min(3, len([distance for distance in [1, 3, 4, 5]
+                                                       if distance <= bfs_layers.max_distance])))
+            self.assertEqual(len(set(distances)), len(distances))
+            self.assertNotIn(2, distances)
+            for dest, distance, developed, _ in samples:
+                self.assertIn(dest, [bfs_layers.get_node(distance, index)
+                                     for index in range(bfs_layers.get_layer_size(distance))])
+                self.assertEqual(developed, bfs_layers.developed[distance - 1])
+
+    def test_move_unreachable_quota(self):
+        remaining_quotas = {1: 2, 2: 0, 3: 4, 4: 0}
+        move_unreachable_quota(remaining_quotas)
+        self.assertEqual(remaining_quotas[3], 0)
+        self.assertEqual(sum(remaining_quotas.values()), 6)
+        self.assertEqual(remaining_quotas[1] + remaining_quotas[2], 6)
+        with self.assertRaises(ValueError):
+            move_unreachable_quota({1: 3, 2: 0})
+
+    def test_quota_moves_from_unreachable_distances(self):
+        graph = WikiGraph(create_star_pages())
+        rows = self._generate_rows(graph, 60, self._args(5, max_misses=5))
+        self.assertEqual(len(rows), 60)
+        distances = Counter(row[2] for row in rows)
+        # Nothing is farther than 2, so the quotas of the far distances moved to the short ones
+        self.assertEqual(set(distances), {1, 2})
+        quotas = get_distance_quotas(60, 5)
+        self.assertGreater(distances[1] + distances[2], quotas[1] + quotas[2])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,93 @@
+import tempfile
+import unittest
+
+import numpy as np
+import torch
+
+from scripts.distance_dataset import DistanceDataset, DistanceLoader, run_model
+from tests.fake_embedders import TitleHashEmbedder, TitleHashCategoriesEmbedder
+from wikisearch.heuristics.nn_archs import TitleDistance, TextKMeansCategoriesMultiHotDistance
+from wikisearch.pairs_dataset import pairs_to_ids
+from wikisearch.utils.sparse_categories import indices_to_multihot
+from wikisearch.utils.vector_store import VectorStore
+
+
+class TestDistanceDataset(unittest.TestCase):
+    def setUp(self):
+        random = np.random.RandomState(0)
+        self.sources = [f'Page {i}' for i in random.randint(0, 30, 50)]
+        self.destinations = [f'Page {i}' for i in random.randint(0, 30, 50)]
+        self.min_distances = random.randint(1, 6, 50)
+
+    def _dataset(self, embedder):
+        titles, source_ids, destination_ids = pairs_to_ids(self.sources, self.destinations)
+        return DistanceDataset(titles, source_ids, destination_ids, self.min_distances, embedder)
+
+    def test_pairs_to_ids(self):
+        titles, source_ids, destination_ids = pairs_to_ids(self.sources, self.destinations)
+        self.assertEqual(len(set(titles)), len(titles))
+        self.assertEqual([titles[i] for i in source_ids], self.sources)
+        self.assertEqual([titles[i] for i in destination_ids], self.destinations)
+
+    def test_batches_same_as_embedding_each_pair(self):
+        embedder = TitleHashEmbedder(16)
+        loader = DistanceLoader(self._dataset(embedder), batch_size=16)
+        self.assertEqual(len(loader), 4)
+        start = 0
+        for sources, destinations, min_distances in loader:
+            end = start + len(min_distances)
+            self.assertTrue(torch.equal(sources, embedder.embed_batch(self.sources[start:end])))
+            self.assertTrue(torch.equal(destinations, embedder.embed_batch(self.destinations[start:end])))
+            self.assertEqual(min_distances.tolist(), self.min_distances[start:end].tolist())
+            start = end
+        self.assertEqual(start, len(self.sources))
+
+    def test_batches_from_store(self):
+        embedder = TitleHashEmbedder(16)
+        # The store has only some of the dataset's pages
+        titles = sorted(set(self.sources + self.destinations))[::2] + ['Not In Dataset']
+        with tempfile.TemporaryDirectory() as store_path:
+            store = VectorStore.create(store_path, titles, (16,))
+            store.vectors[:] = embedder.embed_batch(titles).numpy()
+            store.finalize()
+            store_embedder = TitleHashEmbedder(16, VectorStore.load(store_path))
+            dataset = self._dataset(store_embedder)
+            # Only the pages which aren't in the store are copied
+            self.assertEqual(len(dataset._embeddings), len(set(self.sources + self.destinations)) - len(titles) + 1)
+            for batch, store_batch in zip(DistanceLoader(self._dataset(embedder), 16, unique_nodes=True),
+                                          DistanceLoader(dataset, 16, unique_nodes=True)):
+                for tensor, store_tensor in zip(batch, store_batch):
+                    self.assertTrue(torch.equal(tensor, store_tensor))
+
+    def test_sparse_batches(self):
+        embedder = TitleHashCategoriesEmbedder(16, 10)
+        dense_parts, indices, offsets = self._dataset(embedder).get_batch(5, 25)[0]
+        ends = offsets.tolist()[1:] + [len(indices)]
+        for i, title in enumerate(self.sources[5:25]):
+            embedding = torch.cat((dense_parts[i], indices_to_multihot(indices[offsets[i]:ends[i]], 10)))
+            self.assertTrue(torch.equal(embedding, embedder.embed(title)))
+
+    def test_unique_nodes_same_as_pairs(self):
+        torch.manual_seed(0)
+        models = [(TitleDistance({'embed_dim': 40}).eval(), TitleHashEmbedder(40)),
+                  (TextKMeansCategoriesMultiHotDistance({'embed_dim': 40, 'categories_dim': 24}).eval(),
+                   TitleHashCategoriesEmbedder(40, 24))]
+        for model, embedder in models:
+            dataset = self._dataset(embedder)
+            with torch.no_grad():
+                for pairs_batch, unique_batch in zip(DistanceLoader(dataset, 16),
+                                                     DistanceLoader(dataset, 16, unique_nodes=True)):
+                    self.assertTrue(torch.allclose(run_model(model, pairs_batch), run_model(model, unique_batch),
+                                                   atol=1e-5))
+
+            # The gradients of a page's pairs are accumulated to its single encoding
+            parameters = list(model.parameters())
+            pairs_gradients = torch.autograd.grad(run_model(model, dataset.get_batch(0, 50)).sum(), parameters)
+            unique_gradients = torch.autograd.grad(run_model(model, dataset.get_unique_batch(0, 50)).sum(),
+                                                   parameters)
+            for pairs_gradient, unique_gradient in zip(pairs_gradients, unique_gradients):
+                self.assertTrue(torch.allclose(pairs_gradient, unique_gradient, atol=1e-4))
+
+
+if __name__ == '__main__':
+    unittest.main()
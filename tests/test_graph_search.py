@@ -1,6 +1,7 @@
 import unittest
 
 from wikisearch.astar import Astar
+from wikisearch.consts.paths import PATH_TO_GRAPH_SNAPSHOT
 from wikisearch.costs.uniform_cost import UniformCost
 from wikisearch.graph import WikiGraph
 from wikisearch.heuristics import BFSHeuristic
@@ -12,7 +13,7 @@ class TestWikiGraphSearch(unittest.TestCase):
         self.cost = UniformCost(1)
         self.heuristic = BFSHeuristic()
         self.strategy = DefaultAstarStrategy()
-        self.graph = WikiGraph()
+        self.graph = WikiGraph.load_snapshot(PATH_TO_GRAPH_SNAPSHOT) if PATH_TO_GRAPH_SNAPSHOT else WikiGraph()
         self.astar = Astar(self.cost, self.heuristic, self.strategy, self.graph)
 
     def tearDown(self):
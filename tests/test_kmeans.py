@@ -0,0 +1,50 @@
+import unittest
+
+import numpy as np
+
+from wikisearch.utils.kmeans import k_means_many, embed_k_means_many
+
+
+class TestKMeans(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        self.k = 3
+        self.true_centers = []
+        self.points_list = []
+        for n in [4, 9, 30, 120, 500]:
+            centers = rng.normal(scale=20, size=(self.k, 8))
+            labels = np.arange(n) % self.k
+            self.true_centers.append(centers)
+            self.points_list.append((centers[labels] + rng.normal(scale=0.1, size=(n, 8))).astype(np.float32))
+
+    def _sorted(self, centers):
+        return centers[np.lexsort(centers.T[::-1])]
+
+    def test_finds_separated_clusters(self):
+        for points, centers, true_centers in zip(self.points_list, k_means_many(self.points_list, self.k),
+                                                 self.true_centers):
+            self.assertEqual(centers.shape, (self.k, 8))
+            self.assertEqual(centers.dtype, np.float32)
+            self.assertTrue(np.allclose(self._sorted(centers), self._sorted(true_centers), atol=0.2))
+
+    def test_independent_of_batching(self):
+        # A set's clusters depend only on its points and the seed, not on the sets it's batched with
+        batched_centers = k_means_many(self.points_list, self.k, n_init=2, seed=7)
+        for points, centers in zip(self.points_list, batched_centers):
+            single_centers, = k_means_many([points], self.k, n_init=2, seed=7)
+            self.assertTrue(np.allclose(centers, single_centers, atol=1e-5))
+        small_batches_centers = k_means_many(self.points_list, self.k, n_init=2, seed=7, max_batch_points=100)
+        for centers, small_batch_centers in zip(batched_centers, small_batches_centers):
+            self.assertTrue(np.allclose(centers, small_batch_centers, atol=1e-5))
+
+    def test_embed_pads_short_texts(self):
+        words_vectors_list = [self.points_list[0][:2], np.zeros((0, 8), dtype=np.float32), self.points_list[2]]
+        embeddings = embed_k_means_many(words_vectors_list, self.k, self.k * 8)
+        self.assertTrue(all(embedding.shape == (self.k * 8,) for embedding in embeddings))
+        self.assertTrue(np.array_equal(embeddings[0][:16], self.points_list[0][:2].reshape([-1])))
+        self.assertFalse(embeddings[0][16:].any())
+        self.assertFalse(embeddings[1].any())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,64 @@
+import unittest
+
+import numpy as np
+
+from tests.fake_pages import create_fake_pages
+from wikisearch.bfs_layers import BFSLayers
+from wikisearch.bidirectional_bfs import BidirectionalBFS
+from wikisearch.compact_graph import CompactWikiGraph
+from wikisearch.graph import WikiGraph
+from wikisearch.multi_source_bfs import MultiSourceBFS, UNREACHABLE_DISTANCE
+
+
+class TestMultiSourceBFS(unittest.TestCase):
+    def setUp(self):
+        pages = create_fake_pages(num_pages=300, max_links=4, seed=5)
+        self.graph = CompactWikiGraph(pages)
+        self.multi_source_bfs = MultiSourceBFS(self.graph)
+        # More than one run's sources, with a repeated source
+        self.source_ids = list(range(0, 300, 3)) + [0]
+
+    def test_same_distances_as_bfs_layers(self):
+        distances = self.multi_source_bfs.run(self.source_ids)
+        for source_id, source_distances in zip(self.source_ids, distances):
+            bfs_layers = BFSLayers(self.graph, self.graph.get_node_by_id(source_id), len(self.graph))
+            expected = np.full(len(self.graph), UNREACHABLE_DISTANCE, dtype=np.uint8)
+            expected[source_id] = 0
+            for distance, layer in enumerate(bfs_layers.layers, 1):
+                expected[layer] = distance
+            np.testing.assert_array_equal(source_distances, expected)
+
+    def test_max_distance(self):
+        distances = self.multi_source_bfs.run(self.source_ids)
+        np.testing.assert_array_equal(self.multi_source_bfs.run(self.source_ids, max_distance=2),
+                                      np.where(distances <= 2, distances, UNREACHABLE_DISTANCE))
+
+    def test_pairs_distances(self):
+        titles = self.graph.titles
+        # More than one run's sources, which aren't ordered by their ids
+        sources = [titles[(i * 7) % 300] for i in range(0, 300, 2)] + ['Not A Page']
+        destinations = [titles[(i * 13) % 300] for i in range(0, 300, 2)] + [titles[0]]
+        distances = self.multi_source_bfs.pairs_distances(sources, destinations)
+        bidirectional_bfs = BidirectionalBFS(self.graph)
+        for source, destination, distance in zip(sources[:-1], destinations[:-1], distances[:-1]):
+            expected = bidirectional_bfs.run(source, destination)[1]
+            self.assertEqual(distance, UNREACHABLE_DISTANCE if expected == -1 else expected)
+        self.assertEqual(distances[-1], UNREACHABLE_DISTANCE)
+
+    def test_layers_from_distances(self):
+        distances = self.multi_source_bfs.run(self.source_ids[:10])
+        for source_id, source_distances in zip(self.source_ids, distances):
+            source_node = self.graph.get_node_by_id(source_id)
+            bfs_layers = BFSLayers(self.graph, source_node, len(self.graph))
+            from_distances = BFSLayers.from_distances(self.graph, source_node, source_distances)
+            self.assertEqual([layer.tolist() for layer in from_distances.layers],
+                             [layer.tolist() for layer in bfs_layers.layers])
+            self.assertEqual(from_distances.developed, bfs_layers.developed)
+
+    def test_requires_compact_graph(self):
+        with self.assertRaises(ValueError):
+            MultiSourceBFS(WikiGraph(create_fake_pages(num_pages=10)))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,105 @@
+import shutil
+import tempfile
+import unittest
+
+import torch
+
+from tests.fake_embedders import TitleHashEmbedder, TitleHashCategoriesEmbedder
+from tests.fake_pages import create_fake_pages
+from wikisearch.compact_graph import CompactWikiGraph
+from wikisearch.graph import WikiGraph
+from wikisearch.heuristics.nn_archs import TitleDistance, TextKMeansCategoriesMultiHotDistance
+from wikisearch.heuristics.nn_heuristic import NNHeuristic
+from wikisearch.utils.vector_store import VectorStore
+
+
+class TestNNHeuristic(unittest.TestCase):
+    def setUp(self):
+        torch.manual_seed(0)
+        self.models = [
+            (TitleDistance({'embed_dim': 40}).eval(), TitleHashEmbedder(40)),
+            (TextKMeansCategoriesMultiHotDistance({'embed_dim': 40, 'categories_dim': 24}).eval(),
+             TitleHashEmbedder(64)),
+            (TextKMeansCategoriesMultiHotDistance({'embed_dim': 40, 'categories_dim': 24}).eval(),
+             TitleHashCategoriesEmbedder(40, 24)),
+        ]
+        self.graph = WikiGraph(create_fake_pages(num_pages=50, seed=2))
+        self.dest_state = self.graph.get_node('Page 7')
+        self.states = [self.graph.get_node(f'Page {i}') for i in range(20)]
+        self.tmp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def _expected_distances(self, model, embedder):
+        with torch.no_grad():
+            dest_embedding = embedder.embed(self.dest_state.title).unsqueeze(0)
+            return [model(embedder.embed(state.title).unsqueeze(0), dest_embedding).round().int().item()
+                    for state in self.states]
+
+    def test_split_model_same_as_forward(self):
+        for model, embedder in self.models:
+            embeddings = torch.stack([embedder.embed(state.title) for state in self.states])
+            dest_embeddings = embedder.embed(self.dest_state.title).unsqueeze(0).expand_as(embeddings)
+            with torch.no_grad():
+                split_distances = model.head(model.encode(embeddings), model.encode(dest_embeddings))
+                self.assertTrue(torch.allclose(model(embeddings, dest_embeddings), split_distances, atol=1e-5))
+
+    def test_destination_encoded_once(self):
+        for model, embedder in self.models:
+            heuristic = NNHeuristic(model, embedder)
+            expected_distances = self._expected_distances(model, embedder)
+            self.assertEqual([heuristic.calculate(state, self.dest_state) for state in self.states],
+                             expected_distances)
+            self.assertEqual(heuristic.calculate_batch(self.states, self.dest_state), expected_distances)
+
+    def test_precomputed_encodings(self):
+        for model, embedder in self.models:
+            # Only some of the pages are in the store, so the rest are encoded online
+            titles = [f'Page {i}' for i in range(0, 50, 2)]
+            with torch.no_grad():
+                encodings = model.encode(torch.stack([embedder.embed(title) for title in titles])).numpy()
+            store = VectorStore.create(self.tmp_dir, titles, encodings.shape[1:])
+            store.vectors[:] = encodings
+            store.finalize()
+
+            heuristic = NNHeuristic(model, embedder, VectorStore.load(self.tmp_dir))
+            expected_distances = self._expected_distances(model, embedder)
+            self.assertEqual([heuristic.calculate(state, self.dest_state) for state in self.states],
+                             expected_distances)
+            self.assertEqual(heuristic.calculate_batch(self.states[::2], self.dest_state), expected_distances[::2])
+
+    def test_encodings_by_node_ids(self):
+        graph = CompactWikiGraph(create_fake_pages(num_pages=50, seed=2))
+        states = [graph.get_node(f'Page {i}') for i in range(20)]
+        dest_state = graph.get_node('Page 7')
+        for model, embedder in self.models:
+            titles = list(graph.keys())
+            with torch.no_grad():
+                encodings = model.encode(torch.stack([embedder.embed(title) for title in titles])).numpy()
+            store = VectorStore.create(self.tmp_dir, titles, encodings.shape[1:])
+            store.vectors[:] = encodings
+            store.finalize()
+            store = VectorStore.load(self.tmp_dir)
+            self.assertEqual(store.get_nodes_rows(states), [state.id for state in states])
+            # The store is ordered as the compact graph, so its titles aren't looked up
+            store._title_to_row = None
+            expected_distances = NNHeuristic(model, embedder).calculate_batch(states, dest_state)
+            self.assertEqual(NNHeuristic(model, embedder, store).calculate_batch(states, dest_state),
+                             expected_distances)
+
+    def test_nodes_rows_by_titles(self):
+        # Rows of a store which isn't ordered as the nodes' graph are looked up by the nodes' titles
+        titles = [f'Page {i}' for i in range(49, -1, -1)]
+        store = VectorStore.create(self.tmp_dir, titles, (1,))
+        store.finalize()
+        store = VectorStore.load(self.tmp_dir)
+        compact_graph = CompactWikiGraph(create_fake_pages(num_pages=50, seed=2))
+        for graph in [self.graph, compact_graph]:
+            nodes = [graph.get_node(f'Page {i}') for i in range(5)]
+            self.assertEqual(store.get_nodes_rows(nodes), [49, 48, 47, 46, 45])
+        self.assertFalse(store.is_ordered_as(compact_graph))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,90 @@
+import csv
+import os
+import tempfile
+import unittest
+
+import numpy as np
+import torch
+
+from scripts.distance_dataset import DistanceDataset
+from tests.fake_embedders import TitleHashEmbedder
+from tests.fake_pages import create_fake_pages
+from wikisearch.compact_graph import CompactWikiGraph
+from wikisearch.consts.mongo import CSV_SEPARATOR
+from wikisearch.pairs_dataset import csv_to_pairs, pairs_to_csv, read_pairs, load_pairs, is_pairs_dataset, \
+    CSV_COLUMNS, PairsTitles
+
+
+class TestPairsDataset(unittest.TestCase):
+    def setUp(self):
+        self.graph = CompactWikiGraph(create_fake_pages(num_pages=100, seed=2))
+        random = np.random.RandomState(0)
+        titles = list(self.graph.keys())
+        # Titles with the CSV's separator and quotes have to be quoted
+        self.sources = [titles[i] for i in random.randint(0, 100, 40)] + ['Page\t"quoted"']
+        self.destinations = [titles[i] for i in random.randint(0, 100, 40)] + [titles[0]]
+        self.min_distances = random.randint(1, 8, 41)
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.csv_path = self._path('dataset.csv')
+        with open(self.csv_path, 'w', encoding='utf8', newline='') as csv_file:
+            writer = csv.writer(csv_file, delimiter=CSV_SEPARATOR, lineterminator='\n')
+            writer.writerow(CSV_COLUMNS)
+            writer.writerows(zip(self.sources, self.destinations, self.min_distances.tolist()))
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def _path(self, name):
+        return os.path.join(self.temp_dir.name, name)
+
+    def _assert_pairs(self, path, num_pairs=41):
+        sources, destinations, min_distances = read_pairs(path)
+        self.assertEqual(list(sources), self.sources[:num_pairs])
+        self.assertEqual(list(destinations), self.destinations[:num_pairs])
+        self.assertEqual(sources[num_pairs - 1], self.sources[num_pairs - 1])
+        self.assertEqual(min_distances.tolist(), self.min_distances[:num_pairs].tolist())
+
+    def test_round_trip(self):
+        csv_to_pairs(self.csv_path, self._path('dataset.pairs'))
+        self.assertTrue(is_pairs_dataset(self._path('dataset.pairs')))
+        self.assertFalse(is_pairs_dataset(self.csv_path))
+        self._assert_pairs(self._path('dataset.pairs'))
+        # The titles of a pairs dataset are decoded when they're accessed
+        sources, destinations, _ = read_pairs(self._path('dataset.pairs'))
+        self.assertIsInstance(sources, PairsTitles)
+        self.assertEqual(len(destinations), 41)
+        _, _, source_ids, destination_ids, min_distances = load_pairs(self._path('dataset.pairs'))
+        self.assertEqual((source_ids.dtype, destination_ids.dtype, min_distances.dtype),
+                         (np.int32, np.int32, np.uint8))
+        pairs_to_csv(self._path('dataset.pairs'), self._path('converted.csv'))
+        with open(self.csv_path, encoding='utf8') as csv_file, \
+                open(self._path('converted.csv'), encoding='utf8') as converted_file:
+            self.assertEqual(csv_file.read(), converted_file.read())
+
+    def test_snapshot_reference(self):
+        snapshot_path = self._path('snapshot')
+        self.graph.save_snapshot(snapshot_path)
+        with self.assertRaises(ValueError):
+            csv_to_pairs(self.csv_path, self._path('dataset.pairs'), snapshot_path)
+        # Without the title which isn't in the graph
+        with open(self.csv_path, encoding='utf8') as csv_file:
+            lines = csv_file.readlines()[:-1]
+        with open(self.csv_path, 'w', encoding='utf8') as csv_file:
+            csv_file.writelines(lines)
+        csv_to_pairs(self.csv_path, self._path('dataset.pairs'), snapshot_path)
+        _, _, source_ids, _, _ = load_pairs(self._path('dataset.pairs'))
+        self.assertEqual(source_ids.tolist(), [self.graph.get_node_id(title) for title in self.sources[:-1]])
+        self._assert_pairs(self._path('dataset.pairs'), num_pairs=40)
+
+    def test_distance_dataset(self):
+        csv_to_pairs(self.csv_path, self._path('dataset.pairs'))
+        embedder = TitleHashEmbedder(8)
+        dataset = DistanceDataset.load(self._path('dataset.pairs'), embedder)
+        sources, destinations, min_distances = dataset.get_batch(0, len(dataset))
+        self.assertTrue(torch.equal(sources, embedder.embed_batch(self.sources)))
+        self.assertTrue(torch.equal(destinations, embedder.embed_batch(self.destinations)))
+        self.assertEqual(min_distances.tolist(), self.min_distances.tolist())
+
+
+if __name__ == '__main__':
+    unittest.main()
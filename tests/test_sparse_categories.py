@@ -0,0 +1,52 @@
+import unittest
+
+import torch
+from torch import nn
+
+from wikisearch.heuristics.nn_archs import TitleTextKMeansCategoriesMultiHotDistance
+from wikisearch.utils.sparse_categories import indices_to_bags, indices_to_multihot, multihot_to_indices, \
+    sparse_linear
+
+
+class TestSparseCategories(unittest.TestCase):
+    def setUp(self):
+        torch.manual_seed(0)
+        self.categories_dim = 50
+        # Pages with no categories are included
+        self.indices_list = [torch.tensor([3, 7, 49]), torch.tensor([], dtype=torch.long), torch.tensor([0]),
+                             torch.randperm(self.categories_dim)[:20].sort().values]
+        self.multihot = torch.stack([indices_to_multihot(indices, self.categories_dim)
+                                     for indices in self.indices_list])
+
+    def test_multihot_round_trip(self):
+        for indices, vector in zip(self.indices_list, self.multihot):
+            self.assertTrue(torch.equal(multihot_to_indices(vector), indices))
+
+    def test_sparse_linear_same_as_dense(self):
+        dense_linear = nn.Linear(self.categories_dim, 16)
+        sparse_linear_layer = nn.Linear(self.categories_dim, 16)
+        sparse_linear_layer.load_state_dict(dense_linear.state_dict())
+
+        dense_output = dense_linear(self.multihot)
+        sparse_output = sparse_linear(*indices_to_bags(self.indices_list), sparse_linear_layer)
+        self.assertTrue(torch.allclose(dense_output, sparse_output, atol=1e-6))
+
+        dense_output.sum().backward()
+        sparse_output.sum().backward()
+        self.assertTrue(torch.allclose(dense_linear.weight.grad, sparse_linear_layer.weight.grad))
+        self.assertTrue(torch.allclose(dense_linear.bias.grad, sparse_linear_layer.bias.grad))
+
+    def test_model_same_as_dense(self):
+        embed_dim = 40
+        model = TitleTextKMeansCategoriesMultiHotDistance({'embed_dim': embed_dim,
+                                                           'categories_dim': self.categories_dim}).eval()
+        dense_parts = torch.randn(len(self.indices_list), embed_dim)
+        sparse_embeddings = (dense_parts,) + indices_to_bags(self.indices_list)
+        dense_embeddings = torch.cat((dense_parts, self.multihot), dim=1)
+        with torch.no_grad():
+            self.assertTrue(torch.allclose(model.encode(sparse_embeddings), model.encode(dense_embeddings),
+                                           atol=1e-5))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,105 @@
+import os
+import tempfile
+import unittest
+
+import torch
+
+from scripts.consts.model import MODEL_NAME
+from scripts.sweep import _sweep, get_threads_per_job, load_sweep_state, run_sweep, set_config_paths, SWEEP_STATE
+
+
+def stub_train(model_params):
+    print(f"Training {_sweep['embedder']} with {torch.get_num_threads()} threads")
+    with open(os.path.join(model_params['-o'], MODEL_NAME), 'w') as model_file:
+        model_file.write(model_params['--lr'])
+
+
+def stub_test(model_dir):
+    with open(os.path.join(model_dir, MODEL_NAME)) as model_file:
+        print(f"Tested {model_file.read()}")
+
+
+class TestSweep(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.num_threads = torch.get_num_threads()
+        self.loaded_embeddings = []
+
+    def tearDown(self):
+        torch.set_num_threads(self.num_threads)
+        _sweep.clear()
+        self.temp_dir.cleanup()
+
+    def _load_shared(self, embedding):
+        self.loaded_embeddings.append(embedding)
+        return f'{embedding} embedder', None, None
+
+    def _run_sweep(self, out, configs, num_workers=1, threads=2):
+        """
+        Runs the configs of (embedding, learning rate), which haven't completed in the sweep in out, as
+        train_models.py does
+        :return: The (embedding, learning rate) of the configs which were run
+        """
+        state_path = os.path.join(out, SWEEP_STATE)
+        sweep_state = load_sweep_state(state_path)
+        models_params = [{'--embedding': embedding, '--lr': learning_rate} for embedding, learning_rate in configs]
+        models_params = [params for params in models_params
+                         if set_config_paths(params, os.path.join(out, f"{params['--embedding']}_{params['--lr']}"),
+                                             'train.csv', 'validation.csv', sweep_state)]
+        run_sweep(models_params, self._load_shared, stub_train, stub_test, num_workers, threads, state_path,
+                  sweep_state)
+        return [(params['--embedding'], params['--lr']) for params in models_params]
+
+    def _read_log(self, model_dir, log_name):
+        with open(os.path.join(self.temp_dir.name, model_dir, log_name)) as log_file:
+            return log_file.read()
+
+    def test_restarted_sweep_skips_completed_configs(self):
+        out = self.temp_dir.name
+        configs = [('a', '0.1'), ('b', '0.1'), ('a', '0.01')]
+        self.assertEqual(self._run_sweep(out, configs), configs)
+        # Each embedding was loaded once
+        self.assertEqual(self.loaded_embeddings, ['a', 'b'])
+        sweep_state = load_sweep_state(os.path.join(out, SWEEP_STATE))
+        self.assertEqual(sorted(sweep_state), ['a_0.01', 'a_0.1', 'b_0.1'])
+        self.assertEqual(sweep_state['a_0.1']['threads'], 2)
+        self.assertEqual(self._read_log('a_0.1', 'train.log'), "Training a embedder with 2 threads\n")
+        self.assertEqual(self._read_log('b_0.1', 'test.log'), "Tested 0.1\n")
+
+        # The same output directory, spelled differently
+        relative_out = os.path.join(os.path.relpath(out), '.', '')
+        self.assertEqual(self._run_sweep(relative_out, configs + [('b', '0.001')]), [('b', '0.001')])
+        self.assertEqual(sorted(load_sweep_state(os.path.join(out, SWEEP_STATE))),
+                         ['a_0.01', 'a_0.1', 'b_0.001', 'b_0.1'])
+        self.assertEqual(self._run_sweep(out, configs + [('b', '0.001')]), [])
+
+    def test_skips_configs_completed_before_sweep_state(self):
+        out = self.temp_dir.name
+        for model_dir, files in [('a_0.1', [MODEL_NAME, 'test.log']), ('a_0.01', [MODEL_NAME])]:
+            os.makedirs(os.path.join(out, model_dir))
+            for file_name in files:
+                with open(os.path.join(out, model_dir, file_name), 'w') as model_file:
+                    model_file.write('previous')
+        # The model without a test log was interrupted, so it's run again
+        self.assertEqual(self._run_sweep(out, [('a', '0.1'), ('a', '0.01')]), [('a', '0.01')])
+        self.assertEqual(self._read_log('a_0.1', MODEL_NAME), 'previous')
+        sweep_state = load_sweep_state(os.path.join(out, SWEEP_STATE))
+        self.assertEqual(sweep_state['a_0.1'], {})
+        self.assertIn('wall_time', sweep_state['a_0.01'])
+
+    def test_threads_per_job(self):
+        self.assertEqual(get_threads_per_job(8, 3), 2)
+        self.assertEqual(get_threads_per_job(2, 4), 1)
+        configs = [('a', '0.1'), ('a', '0.01'), ('a', '0.001'), ('b', '0.1')]
+        self._run_sweep(self.temp_dir.name, configs, num_workers=3, threads=7)
+        self.assertEqual(self.loaded_embeddings, ['a', 'b'])
+        sweep_state = load_sweep_state(os.path.join(self.temp_dir.name, SWEEP_STATE))
+        for embedding, learning_rate in configs:
+            model_dir = f'{embedding}_{learning_rate}'
+            self.assertEqual(sweep_state[model_dir]['threads'], 2)
+            # The job's torch threads were set to its share, and it got its embedding's shared embedder
+            self.assertEqual(self._read_log(model_dir, 'train.log'), f"Training {embedding} embedder with 2 threads\n")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,46 @@
+import string
+import unittest
+
+from nltk import word_tokenize
+from nltk.corpus import stopwords
+
+from wikisearch.utils.tokenizer import Tokenizer
+
+TEXTS = [
+    "",
+    "Anarchism",
+    "The Beatles were an English rock band, formed in Liverpool in 1960.",
+    "In the 1960s, they were among the most \"influential\" acts; \"Yesterday\" wasn't written by George.",
+    "See https://en.wikipedia.org/wiki/Main_Page and http://example.com/path?a=1 for more (external links).",
+    "A line\nwith   several\twhitespaces\n\nand paragraphs... Isn't it? It's ''quoted'' and ``back-quoted``.",
+    "Numbers like 3.14, 1,000,000 and $5.00 - or 50% - are tokens too!",
+    "Unicode: Zürich, São Paulo, Kraków — and “curly quotes”.",
+    "THE And OF Of of: stop words in various cases",
+    "Mr. Smith went to Washington. He didn't come back; www.example.org isn't a link by http rules.",
+]
+
+
+def reference_tokenize_text(text):
+    """
+    FastText.tokenize_text, as it was before the Tokenizer
+    """
+    text = ' '.join([word for word in text.split() if "https://" not in word and "http://" not in word])
+    text = word_tokenize(text)
+    stop_words = set(stopwords.words('english')) | {word.capitalize() for word in stopwords.words('english')}
+    punctuation = set(string.punctuation) | {"\"\""} | {'\'\''} | {'``'}
+    punctuation_and_stop_words = stop_words | punctuation
+    text = [word for word in text if word not in punctuation_and_stop_words]
+    return text
+
+
+class TestTokenizer(unittest.TestCase):
+    def setUp(self):
+        self.tokenizer = Tokenizer()
+
+    def test_same_as_reference(self):
+        for text in TEXTS:
+            self.assertEqual(self.tokenizer.tokenize(text), reference_tokenize_text(text))
+
+
+if __name__ == '__main__':
+    unittest.main()
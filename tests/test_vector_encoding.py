@@ -0,0 +1,54 @@
+import pickle
+import unittest
+
+import bson
+import torch
+
+from wikisearch.utils.vector_encoding import encode_vector, decode_vector, is_pickled_vector, migrate_vector, \
+    INDICES_DTYPE, VECTOR_DTYPE
+
+
+class TestVectorEncoding(unittest.TestCase):
+    def setUp(self):
+        torch.manual_seed(0)
+        self.vectors = [torch.randn(300), torch.randn(10, 300), torch.zeros(0)]
+
+    def test_round_trip_through_bson(self):
+        for vector in self.vectors:
+            document = bson.decode(bson.encode({'embedding': encode_vector(vector)}))
+            self.assertFalse(is_pickled_vector(document['embedding']))
+            decoded_vector = decode_vector(document['embedding'])
+            self.assertEqual(decoded_vector.dtype, torch.float32)
+            self.assertTrue(torch.equal(decoded_vector, vector))
+
+    def test_decodes_pickled_vectors(self):
+        for vector in self.vectors:
+            document = bson.decode(bson.encode({'embedding': pickle.dumps(vector)}))
+            self.assertTrue(is_pickled_vector(document['embedding']))
+            self.assertTrue(torch.equal(decode_vector(document['embedding']), vector))
+
+    def test_encoded_size(self):
+        # The binary format keeps only the vector's raw bytes
+        self.assertLess(len(bson.encode(encode_vector(self.vectors[1]))), 10 * 300 * 4 + 100)
+
+    def test_migrate_vector(self):
+        document = bson.decode(bson.encode({'embedding': pickle.dumps(self.vectors[1])}))
+        migrated_vector = migrate_vector(document['embedding'])
+        self.assertEqual(migrated_vector['dtype'], VECTOR_DTYPE)
+        self.assertTrue(torch.equal(decode_vector(migrated_vector), self.vectors[1]))
+
+    def test_migrate_categories_to_indices(self):
+        multihot = torch.zeros(20000)
+        multihot[[3, 150, 19999]] = 1
+        # Pickled multi-hot vectors, and ones which were migrated as multi-hot vectors
+        for value in [pickle.dumps(multihot), encode_vector(multihot)]:
+            document = bson.decode(bson.encode({'embedding': migrate_vector(value, indices=True)}))
+            self.assertEqual(document['embedding']['dtype'], INDICES_DTYPE)
+            self.assertEqual(document['embedding']['shape'], [3])
+            indices = decode_vector(document['embedding'])
+            self.assertEqual(indices.dtype, torch.int32)
+            self.assertEqual(indices.tolist(), [3, 150, 19999])
+
+
+if __name__ == '__main__':
+    unittest.main()
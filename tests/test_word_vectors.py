@@ -0,0 +1,78 @@
+import os
+import tempfile
+import unittest
+from collections import namedtuple
+
+import numpy as np
+
+from wikisearch.utils.vector_store import VectorStore
+from wikisearch.utils.word_vectors import get_word_index, gather_word_vectors, get_word_vectors_store_path, \
+    load_word_vectors, prune_word_vectors
+
+Vocab = namedtuple('Vocab', ['index'])
+
+
+class OldKeyedVectors:
+    """
+    The vocabulary of gensim < 4 KeyedVectors
+    """
+
+    def __init__(self, words):
+        self.vocab = {word: Vocab(index) for index, word in enumerate(words)}
+
+
+class KeyedVectors:
+    """
+    The vocabulary of gensim >= 4 KeyedVectors
+    """
+
+    def __init__(self, words):
+        self.key_to_index = {word: index for index, word in enumerate(words)}
+
+
+class TestWordVectors(unittest.TestCase):
+    def setUp(self):
+        self.words = ['the', 'quick', 'brown', 'fox']
+        self.vectors = np.arange(len(self.words) * 3, dtype=np.float32).reshape(len(self.words), 3)
+
+    def test_word_index(self):
+        for keyed_vectors in [OldKeyedVectors(self.words), KeyedVectors(self.words)]:
+            self.assertEqual(get_word_index(keyed_vectors), {'the': 0, 'quick': 1, 'brown': 2, 'fox': 3})
+
+    def test_gather_word_vectors(self):
+        word_index = get_word_index(KeyedVectors(self.words))
+        text = ['fox', 'jumps', 'the', 'fox', 'dog']
+        gathered_vectors = gather_word_vectors(self.vectors, word_index, text)
+        expected_vectors = np.array([self.vectors[word_index[word]] for word in text if word in word_index])
+        self.assertTrue(np.array_equal(gathered_vectors, expected_vectors))
+        self.assertEqual(gather_word_vectors(self.vectors, word_index, ['jumps']).shape, (0, 3))
+
+    def test_load_word_vectors(self):
+        with tempfile.TemporaryDirectory() as directory:
+            pretrained_path = os.path.join(directory, 'vectors.vec')
+            store = VectorStore.create(get_word_vectors_store_path(pretrained_path), self.words, (3,))
+            store.vectors[:] = self.vectors
+            store.finalize()
+
+            vectors, word_index, _ = load_word_vectors(pretrained_path)
+            self.assertIsInstance(vectors, np.memmap)
+            self.assertEqual(word_index, {'the': 0, 'quick': 1, 'brown': 2, 'fox': 3})
+            self.assertTrue(np.array_equal(gather_word_vectors(vectors, word_index, ['fox', 'the']),
+                                           self.vectors[[3, 0]]))
+
+    def test_prune_word_vectors(self):
+        word_index = get_word_index(KeyedVectors(self.words))
+        with tempfile.TemporaryDirectory() as directory:
+            store_path = os.path.join(directory, 'pruned')
+            num_words = prune_word_vectors(self.vectors, word_index, ['fox', 'jumps', 'the', 'fox'], store_path,
+                                           corpus='test')
+            self.assertEqual(num_words, 2)
+
+            vectors, pruned_word_index, metadata = load_word_vectors(store_path)
+            self.assertEqual(pruned_word_index, {'the': 0, 'fox': 1})
+            self.assertTrue(np.array_equal(vectors, self.vectors[[0, 3]]))
+            self.assertEqual(metadata['pruning'], {'corpus': 'test', 'num_words': 2, 'original_num_words': 4})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -34,7 +34,7 @@ class Astar:
 
         parents = dict()
         closed_set = AstarSet()
-        open_set = AstarSet()
+        open_set = self._strategy.create_open_set()
         open_set[source_state] = (self._heuristic.calculate(source_state, dest_state), 0)
 
         developed = 0
@@ -52,21 +52,33 @@ class Astar:
                 return result_path, len(result_path)-1, developed
 
             developed += 1
+            # Successors which should be (re)inserted to the open set, with their new g values. Their heuristics are
+            # calculated at once, after all of the successors were gathered
+            updated_g = dict()
             for succ_state in self._graph.get_node_neighbors(next_state):
                 new_g = next_g + self._cost.calculate(next_state, succ_state)
-                if succ_state in open_set:
+                if succ_state in updated_g:
+                    if new_g < updated_g[succ_state]:
+                        parents[succ_state] = next_state
+                        updated_g[succ_state] = new_g
+                elif succ_state in open_set:
                     if new_g < open_set[succ_state].g:
                         parents[succ_state] = next_state
-                        open_set[succ_state] = (new_g + self._heuristic.calculate(succ_state, dest_state), new_g)
+                        updated_g[succ_state] = new_g
                 else:
                     if succ_state in closed_set:
                         if new_g < closed_set[succ_state].g:
                             parents[succ_state] = next_state
                             del closed_set[succ_state]
-                            open_set[succ_state] = (new_g + self._heuristic.calculate(succ_state, dest_state), new_g)
+                            updated_g[succ_state] = new_g
                     else:
                         parents[succ_state] = next_state
-                        open_set[succ_state] = (new_g + self._heuristic.calculate(succ_state, dest_state), new_g)
+                        updated_g[succ_state] = new_g
+
+            if updated_g:
+                succ_states = list(updated_g.keys())
+                for succ_state, h in zip(succ_states, self._heuristic.calculate_batch(succ_states, dest_state)):
+                    open_set[succ_state] = (updated_g[succ_state] + h, updated_g[succ_state])
 
         # Reach here if there's no path between source and destination
         return None, -1, developed
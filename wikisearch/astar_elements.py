@@ -1,3 +1,6 @@
+import heapq
+import itertools
+
 from sortedcontainers import SortedList
 
 
@@ -71,3 +74,40 @@ class AstarSet(object):
 
     def __len__(self):
         return len(self._sorted_list)
+
+
+class AstarHeapSet(object):
+    """
+        Represents a set in the A* algorithm, kept as a binary heap of (f, title, counter, element) tuples, so
+        elements are compared as tuples, ordered like AstarSetElement. Updated and removed elements stay in the
+        heap, and are skipped when they get to its top (lazy deletion)
+    """
+
+    def __init__(self):
+        self._heap = []
+        self._dict = dict()
+        # Breaks ties between entries of the same state, so elements themselves are never compared
+        self._counter = itertools.count()
+
+    def __delitem__(self, state):
+        del self._dict[state]
+
+    def __getitem__(self, state):
+        return self._dict[state]
+
+    def __setitem__(self, state, f_g_tuple):
+        element = AstarSetElement(state, f=f_g_tuple[0], g=f_g_tuple[1])
+        self._dict[state] = element
+        heapq.heappush(self._heap, (float(element.f), state.title, next(self._counter), element))
+
+    def __contains__(self, state):
+        return state in self._dict
+
+    def get_min_f(self):
+        # An entry is valid only if its element is the current element of its state
+        while self._dict.get(self._heap[0][3].state) is not self._heap[0][3]:
+            heapq.heappop(self._heap)
+        return self._heap[0][3]
+
+    def __len__(self):
+        return len(self._dict)
@@ -0,0 +1,120 @@
+import time
+
+import numpy as np
+
+from wikisearch.compact_graph import CompactWikiGraph
+from wikisearch.multi_source_bfs import UNREACHABLE_DISTANCE
+
+
+class BFSLayers:
+    """
+    The layers of a BFS from a source node: layer d holds the nodes whose shortest distance from the source is d.
+    In a CompactWikiGraph the layers are found by whole-layer operations on the CSR arrays, and are kept as
+    arrays of nodes ids
+    """
+
+    def __init__(self, graph, source_node, max_distance):
+        """
+        Runs the BFS, until max_distance or until there are no more nodes to reach
+        :param graph: The graph
+        :param source_node: The source node
+        :param max_distance: The maximal distance of a layer
+        """
+        self._graph = graph
+        self.source_node = source_node
+        # Layer i is of distance i + 1. Along with each layer, the number of nodes developed and the time it took
+        # to reach it
+        self.layers = []
+        self.developed = []
+        self.times = []
+        if isinstance(graph, CompactWikiGraph):
+            self._run_compact(max_distance)
+        else:
+            self._run(max_distance)
+
+    @classmethod
+    def from_distances(cls, graph, source_node, distances, elapsed_time=0):
+        """
+        Creates the layers of the source from its distances to all the nodes, as found by MultiSourceBFS
+        :param graph: The CompactWikiGraph
+        :param source_node: The source node
+        :param distances: The distances from the source to the nodes, by the nodes' ids
+        :param elapsed_time: The time it took to find the distances, given as the time of all the layers
+        :return: The BFSLayers
+        """
+        bfs_layers = cls.__new__(cls)
+        bfs_layers._graph = graph
+        bfs_layers.source_node = source_node
+        bfs_layers.layers, bfs_layers.developed, bfs_layers.times = [], [], []
+        degrees = np.diff(graph.indptr)
+        developed = 0
+        for distance in range(1, int(distances[distances != UNREACHABLE_DISTANCE].max()) + 1):
+            # Reaching a layer develops the neighbors of all the nodes of the previous one
+            developed += int(degrees[distances == distance - 1].sum())
+            bfs_layers._add_layer(np.flatnonzero(distances == distance).astype(np.int32), developed, elapsed_time)
+        return bfs_layers
+
+    def _run(self, max_distance):
+        start = time.time()
+        developed = 0
+        current_layer = {self.source_node}
+        all_nodes = set(current_layer)
+        while len(self.layers) < max_distance:
+            next_layer = [neighbor for node in current_layer for neighbor in self._graph.get_node_neighbors(node)]
+            developed += len(next_layer)
+            # Nodes which were found before have a shorter path, so they're not in this layer
+            next_layer = set(next_layer) - all_nodes
+            if not next_layer:
+                break
+            all_nodes.update(next_layer)
+            # Sets of nodes are ordered by the nodes' addresses, so the layer is ordered by title, to pick the same
+            # nodes from it in every run
+            self._add_layer(sorted(next_layer, key=lambda node: node.title), developed, time.time() - start)
+            current_layer = next_layer
+
+    def _run_compact(self, max_distance):
+        start = time.time()
+        developed = 0
+        indptr, indices = self._graph.indptr, self._graph.indices
+        visited = np.zeros(len(self._graph), dtype=bool)
+        current_layer = np.array([self.source_node.id], dtype=np.int64)
+        visited[current_layer] = True
+        while len(self.layers) < max_distance:
+            # The neighbors of all the layer's nodes, gathered as one array of CSR positions
+            starts = indptr[current_layer]
+            lengths = indptr[current_layer + 1] - starts
+            layer_offsets = np.cumsum(lengths) - lengths
+            positions = np.repeat(starts - layer_offsets, lengths) + np.arange(lengths.sum())
+            next_layer = np.unique(indices[positions])
+            developed += len(positions)
+            next_layer = next_layer[~visited[next_layer]]
+            if not len(next_layer):
+                break
+            visited[next_layer] = True
+            self._add_layer(next_layer, developed, time.time() - start)
+            current_layer = next_layer.astype(np.int64)
+
+    def _add_layer(self, layer, developed, elapsed_time):
+        self.layers.append(layer)
+        self.developed.append(developed)
+        self.times.append(elapsed_time)
+
+    @property
+    def max_distance(self):
+        """
+        The distance of the farthest layer
+        """
+        return len(self.layers)
+
+    def get_layer_size(self, distance):
+        return len(self.layers[distance - 1])
+
+    def get_node(self, distance, index):
+        """
+        Gets a node of a layer
+        :param distance: The layer's distance
+        :param index: The node's index in the layer
+        :return: The node
+        """
+        node = self.layers[distance - 1][index]
+        return self._graph.get_node_by_id(int(node)) if isinstance(self._graph, CompactWikiGraph) else node
@@ -0,0 +1,94 @@
+import time
+
+
+class BidirectionalBFS:
+    """
+    Finds shortest paths (in number of links) by BFS from both ends, meeting in the middle: forward from the source
+    through out-links, and backward from the destination through in-links. Requires a graph which supports
+    get_node_predecessors
+    """
+
+    def __init__(self, graph):
+        self._graph = graph
+
+    def run(self, source_title: str, destination_title: str, time_limit: float = None) -> (list, int, int):
+        """
+        Runs bidirectional BFS from the source title to the destination title till gets the time limit
+        :param source_title: The opening state of the path
+        :param destination_title: The goal state of the path
+        :param time_limit: The time assigned to the algorithm to run
+        :return: (path, path_length, developed_nodes_amount) - The shortest path between the given titles,
+        the length of the path and how much nodes have been developed
+        """
+        source_state = self._graph.get_node(source_title)
+        dest_state = self._graph.get_node(destination_title)
+        if source_state is None or dest_state is None:
+            return None, -1, 0
+        if source_state == dest_state:
+            return [source_state], 0, 0
+
+        # Parent of each state on its side: towards the source in the forward search, and towards the destination
+        # in the backward search
+        forward_parents = {source_state: None}
+        backward_parents = {dest_state: None}
+        forward_frontier = [source_state]
+        backward_frontier = [dest_state]
+
+        developed = 0
+        start_time = time.time()
+
+        while forward_frontier and backward_frontier:
+            # Develop a whole level of the smaller frontier
+            if len(forward_frontier) <= len(backward_frontier):
+                frontier, parents, other_parents, get_successors = \
+                    forward_frontier, forward_parents, backward_parents, self._graph.get_node_neighbors
+            else:
+                frontier, parents, other_parents, get_successors = \
+                    backward_frontier, backward_parents, forward_parents, self._graph.get_node_predecessors
+
+            next_frontier = []
+            for state in frontier:
+                if (time_limit is not None) and (time.time() - start_time >= time_limit):
+                    return None, -1, developed
+                developed += 1
+                for succ_state in get_successors(state):
+                    if succ_state in parents:
+                        continue
+                    parents[succ_state] = state
+                    # The frontiers are disjoint up to this level, so the first meeting state is on a shortest path
+                    if succ_state in other_parents:
+                        result_path = self._reconstruct_path(forward_parents, backward_parents, succ_state)
+                        return result_path, len(result_path) - 1, developed
+                    next_frontier.append(succ_state)
+
+            if parents is forward_parents:
+                forward_frontier = next_frontier
+            else:
+                backward_frontier = next_frontier
+
+        # Reach here if there's no path between source and destination
+        return None, -1, developed
+
+    @staticmethod
+    def _reconstruct_path(forward_parents, backward_parents, meeting_state):
+        """
+        Reconstruct the path from the opening state till the destination state, through the state where the
+        forward and backward searches met
+        :param forward_parents: the parents of each state of the forward search
+        :param backward_parents: the parents of each state of the backward search
+        :param meeting_state: the state which both searches reached
+        :return: The reconstructed path from the opening state till the destination state
+        """
+        path = []
+        state = meeting_state
+        while state is not None:
+            path.append(state)
+            state = forward_parents[state]
+        path.reverse()
+
+        state = backward_parents[meeting_state]
+        while state is not None:
+            path.append(state)
+            state = backward_parents[state]
+
+        return path
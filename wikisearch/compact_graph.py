@@ -0,0 +1,310 @@
+import time
+
+import numpy as np
+
+from wikisearch import graph_snapshot
+from wikisearch.consts.mongo import *
+from wikisearch.utils.mongo_handler import MongoHandler
+
+
+def transpose_csr(indptr, indices):
+    """
+    Transposes a graph's CSR arrays, so the neighbors of each node in the transposed graph are its predecessors
+    :param indptr: The CSR row pointers array
+    :param indices: The CSR column indices array
+    :return: (indptr, indices) arrays of the transposed graph
+    """
+    num_nodes = len(indptr) - 1
+    rows = np.repeat(np.arange(num_nodes, dtype=np.int32), np.diff(indptr))
+    transposed_indptr = np.zeros(num_nodes + 1, dtype=np.int64)
+    np.cumsum(np.bincount(indices, minlength=num_nodes), out=transposed_indptr[1:])
+    # A stable sort keeps the predecessors of each node ordered by their ids
+    return transposed_indptr, rows[np.argsort(indices, kind='stable')]
+
+
+class CompactGraphNode:
+    """
+    A light-weight node of the compact wikipedia graph. It holds only the node's integer id and a reference to
+    its graph, so nodes are created on demand when the graph is walked
+    """
+    __slots__ = ('_graph', '_id')
+
+    def __init__(self, graph, node_id):
+        """
+        :param graph: The CompactWikiGraph the node belongs to
+        :param node_id: The node's integer id in the graph
+        """
+        self._graph = graph
+        self._id = node_id
+
+    @property
+    def id(self):
+        """
+        The node's integer id in the graph
+        """
+        return self._id
+
+    @property
+    def graph(self):
+        """
+        The CompactWikiGraph the node belongs to
+        """
+        return self._graph
+
+    @property
+    def title(self):
+        """
+        The node's title
+        """
+        return self._graph.titles[self._id]
+
+    @property
+    def pid(self):
+        """
+        The node's pid
+        """
+        return int(self._graph.pids[self._id])
+
+    @property
+    def categories(self):
+        return self._graph.get_page_field(self._id, ENTRY_CATEGORIES)
+
+    @property
+    def neighbors(self):
+        """
+        The node's neighbors. Links are resolved when the graph is built, so these are titles of existing nodes
+        """
+        titles = self._graph.titles
+        for neighbor_id in self._graph.get_neighbors_ids(self._id).tolist():
+            yield titles[neighbor_id]
+
+    @property
+    def text(self):
+        """
+        The node's text. The compact graph doesn't keep the pages' texts, so it is fetched from the database
+        """
+        return self._graph.get_page_field(self._id, ENTRY_TEXT)
+
+    def __eq__(self, other):
+        return isinstance(other, CompactGraphNode) and self._id == other._id and self._graph is other._graph
+
+    def __hash__(self):
+        return hash(self._id)
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}({self._id}, '{self.title}')"
+
+
+class CompactWikiGraph:
+    """
+    A graph containing all the wikipedia pages as nodes, kept in a compact representation: each page gets an
+    integer id, and the links are kept as CSR (indptr/indices) arrays of ids. Redirects and links to pages that
+    don't exist are resolved once, when the graph is built
+    """
+
+    def __init__(self, documents=None):
+        """
+        :param documents: Iterable of pages documents to build the graph from. If None, the pages are loaded
+        from the database
+        """
+        start = time.time()
+        self._mongo_handler = None
+        self._source = None
+        if documents is None:
+            self._source = self._get_mongo_handler().get_collection_fingerprint()
+            # Texts are not kept in the graph, so there's no need to load them
+            documents = self._get_mongo_handler().get_all_documents(
+                projection={ENTRY_TITLE: True, ENTRY_PID: True, ENTRY_LINKS: True, ENTRY_REDIRECT_TO: True})
+
+        titles = []
+        pids = []
+        links = []
+        links_counts = []
+        redirects = {}
+        self._title_to_id = {}
+        for entry in documents:
+            # Handle redirections by inserting into redirects dict
+            if ENTRY_REDIRECT_TO in entry:
+                redirects[entry[ENTRY_TITLE]] = entry[ENTRY_REDIRECT_TO]
+            # Handle "normal" entries
+            else:
+                title = entry[ENTRY_TITLE]
+                if title in self._title_to_id:
+                    raise ValueError(f"More than 1 entry with title: '{title}'")
+                self._title_to_id[title] = len(titles)
+                titles.append(title)
+                pids.append(int(entry[ENTRY_PID]))
+                links.extend(entry[ENTRY_LINKS])
+                links_counts.append(len(entry[ENTRY_LINKS]))
+
+        # A redirect is followed only if it points to an existing page, same as in WikiGraph.get_node
+        self._redirects = {title: self._title_to_id[redirect_to] for title, redirect_to in redirects.items()
+                           if title not in self._title_to_id and redirect_to in self._title_to_id}
+
+        self._titles = titles
+        self._pids = np.array(pids, dtype=np.int64)
+        self._indptr, self._indices = self._build_csr(links, links_counts)
+        self._reverse_indptr, self._reverse_indices = None, None
+        print(f"-TIME- Took {time.time() - start:.2f}s to load CompactWikiGraph")
+
+    def _build_csr(self, links, links_counts):
+        """
+        Resolves the links' titles to nodes ids, and builds the CSR arrays out of them. Links to pages that don't
+        exist are dropped
+        :param links: All the nodes' links titles, concatenated by the nodes' order
+        :param links_counts: The number of links of each node
+        :return: (indptr, indices) arrays
+        """
+        links_ids = np.fromiter((self._get_node_id(link, -1) for link in links), dtype=np.int64, count=len(links))
+        links_rows = np.repeat(np.arange(len(links_counts)), links_counts)
+        existing_links = links_ids >= 0
+        indptr = np.zeros(len(links_counts) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(links_rows[existing_links], minlength=len(links_counts)), out=indptr[1:])
+        return indptr, links_ids[existing_links].astype(np.int32)
+
+    @classmethod
+    def load_snapshot(cls, path, mmap=True, verify_source=True):
+        """
+        Loads a graph from a snapshot which was saved by save_snapshot
+        :param path: Path of the snapshot directory
+        :param mmap: Whether to memory-map the snapshot instead of reading it to memory
+        :param verify_source: Whether to check that the snapshot was built from the current data in the database
+        :return: The loaded CompactWikiGraph
+        """
+        start = time.time()
+        graph = cls.__new__(cls)
+        graph._mongo_handler = None
+        metadata, graph._titles, graph._title_to_id, graph._redirects, graph._pids, graph._indptr, \
+            graph._indices = graph_snapshot.load_snapshot(path, mmap)
+        graph._source = metadata["source"]
+        graph._reverse_indptr, graph._reverse_indices = None, None
+        if verify_source and graph._source is not None:
+            current_source = graph._get_mongo_handler().get_collection_fingerprint()
+            if current_source != graph._source:
+                raise ValueError(f"Graph snapshot in '{path}' is stale: it was built from {graph._source}, "
+                                 f"but the database has {current_source}")
+        print(f"-TIME- Took {time.time() - start:.2f}s to load CompactWikiGraph snapshot")
+        return graph
+
+    def save_snapshot(self, path):
+        """
+        Saves the graph to a snapshot directory, from which it can be loaded by load_snapshot
+        :param path: Path of the snapshot directory
+        """
+        graph_snapshot.save_snapshot(path, self._titles, self._pids, self._indptr, self._indices,
+                                     self._redirects.items(), self._source)
+
+    def _get_mongo_handler(self):
+        if self._mongo_handler is None:
+            self._mongo_handler = MongoHandler(WIKI_LANG, PAGES)
+        return self._mongo_handler
+
+    @property
+    def titles(self):
+        """
+        The nodes' titles, indexed by the nodes' ids
+        """
+        return self._titles
+
+    @property
+    def pids(self):
+        """
+        The nodes' pids, indexed by the nodes' ids
+        """
+        return self._pids
+
+    @property
+    def indptr(self):
+        """
+        CSR row pointers: the neighbors of node i are indices[indptr[i]:indptr[i + 1]]
+        """
+        return self._indptr
+
+    @property
+    def indices(self):
+        """
+        CSR column indices: the neighbors' ids of all the nodes, concatenated by the nodes' order
+        """
+        return self._indices
+
+    def get_page_field(self, node_id, field):
+        """
+        Gets a field of the node's page from the database, for fields which are not kept in the graph
+        :param node_id: The node's id
+        :param field: The name of the field in the page's document
+        :return: The field's value, or None if doesn't exist
+        """
+        page = self._get_mongo_handler().get_page(self._titles[node_id], {field: True})
+        return page.get(field) if page else None
+
+    def _get_node_id(self, title, default=None):
+        node_id = self._title_to_id.get(title)
+        # If no node with the title exists, maybe it's a redirect
+        return self._redirects.get(title, default) if node_id is None else node_id
+
+    def get_node_id(self, title):
+        """
+        Gets the id of the wikipedia page with the given title (following a redirect if needed)
+        :param title: The wikipedia page title
+        :return: The page's id, or None if doesn't exist
+        """
+        return self._get_node_id(title)
+
+    def get_node_by_id(self, node_id):
+        return CompactGraphNode(self, node_id)
+
+    def get_node(self, title):
+        """
+        Gets the wikipedia page with the given title
+        :param title: The wikipedia page title to return
+        :return: The wikipedia page with the given title, or None if doesn't exist
+        """
+        node_id = self._get_node_id(title)
+        return None if node_id is None else CompactGraphNode(self, node_id)
+
+    def get_neighbors_ids(self, node_id):
+        """
+        Gets the ids of the node's neighbors, as a view on the CSR indices array
+        :param node_id: The node's id
+        """
+        return self._indices[self._indptr[node_id]:self._indptr[node_id + 1]]
+
+    def get_node_neighbors(self, node):
+        """
+        Gets the node's neighbors
+        :param node: The node to returns its neighbors
+        """
+        for neighbor_id in self.get_neighbors_ids(node.id).tolist():
+            yield CompactGraphNode(self, neighbor_id)
+
+    def get_predecessors_ids(self, node_id):
+        """
+        Gets the ids of the nodes which link to the node. The in-links index is built on first use
+        :param node_id: The node's id
+        """
+        if self._reverse_indptr is None:
+            self._reverse_indptr, self._reverse_indices = transpose_csr(self._indptr, self._indices)
+        return self._reverse_indices[self._reverse_indptr[node_id]:self._reverse_indptr[node_id + 1]]
+
+    def get_node_predecessors(self, node):
+        """
+        Gets the nodes which link to the node
+        :param node: The node to returns its predecessors
+        """
+        for predecessor_id in self.get_predecessors_ids(node.id).tolist():
+            yield CompactGraphNode(self, predecessor_id)
+
+    def keys(self):
+        """
+        The titles of all the nodes in the graph (without redirects)
+        """
+        return iter(self._titles)
+
+    def __iter__(self):
+        return self.keys()
+
+    def __len__(self):
+        return len(self._titles)
+
+    def __contains__(self, title):
+        return title in self._title_to_id
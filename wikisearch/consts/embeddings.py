@@ -8,6 +8,9 @@ _WORD2VEC = 300
 _categories_mongo = MongoHandler(WIKI_LANG, CATEGORIES)
 _CATEGORIES_MULTIHOT = len(_categories_mongo.get_page(CATEGORIES)[CATEGORIES])
 KMEANS = int(os.environ.get("WIKISEARCH_K_MEANS"))
+# Number of k-means++ initializations of the KMeans embeddings, and their random seed
+KMEANS_N_INIT = int(os.environ.get("WIKISEARCH_K_MEANS_N_INIT") or 10)
+KMEANS_SEED = int(os.environ.get("WIKISEARCH_K_MEANS_SEED") or 0)
 
 EMBEDDING_VECTOR_SIZE = {
     "FastTextTitle": {"embed_dim": _FASTTEXT},
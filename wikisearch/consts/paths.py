@@ -3,3 +3,7 @@ import os
 # Consts for environment variables which point to paths
 PATH_TO_PRETRAINED_WORD2VEC_MODEL = os.environ.get("PRETRAINED_EMBEDDINGS_WORD2VEC")
 PATH_TO_PRETRAINED_FASTTEXT_MODEL = os.environ.get("PRETRAINED_EMBEDDINGS_FASTTEXT")
+# Path to a directory of a graph snapshot (see WikiGraph.save_snapshot)
+PATH_TO_GRAPH_SNAPSHOT = os.environ.get("WIKISEARCH_GRAPH_SNAPSHOT")
+# Path to a directory of embeddings stores, named by the embeddings' collections (see Embedding.get_store_path)
+PATH_TO_EMBEDDINGS_STORES = os.environ.get("WIKISEARCH_EMBEDDINGS_STORES")
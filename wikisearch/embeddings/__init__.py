@@ -1,5 +1,6 @@
 from .categories_multihot import CategoriesMultiHot
 from .embedding import Embedding
+from .composite_embedding import CompositeEmbedding
 from .fasttext import FastText
 from .fasttext_text_average import FastTextTextAverage
 from .fasttext_text_kmeans import FastTextTextKMeans
@@ -3,9 +3,16 @@ import torch
 from wikisearch.consts.mongo import WIKI_LANG, CATEGORIES
 from wikisearch.embeddings.embedding import Embedding
 from wikisearch.utils.mongo_handler import MongoHandler
+from wikisearch.utils.sparse_categories import multihot_to_indices, indices_to_multihot, indices_to_bags
+from wikisearch.utils.vector_encoding import encode_vector, INDICES_DTYPE
 
 
 class CategoriesMultiHot(Embedding):
+    """
+    The multi-hot vector of the page's categories. Pages have few of the many categories, so the categories are
+    stored and cached as the indices of the ones, and multi-hot vectors are built from them when requested
+    """
+
     def __init__(self, save_to_db=True):
         super(CategoriesMultiHot, self).__init__(save_to_db)
         categories_mongo = MongoHandler(WIKI_LANG, CATEGORIES)
@@ -23,9 +30,41 @@ class CategoriesMultiHot(Embedding):
             'type': self.type,
         }
 
-    def _embed(self, page):
-        vector = torch.zeros(len(self._categories_map), dtype=torch.float)
-        page_categories_indices = [self._categories_map[category] for category in page[CATEGORIES]
-                                   if category in self._categories_map]
-        vector.scatter_(0, torch.Tensor(page_categories_indices).long(), 1)
+    def _load_embedding(self, title):
+        vector = super(CategoriesMultiHot, self)._load_embedding(title)
+        # Stores keep the multi-hot vectors
+        if vector is not None and vector.is_floating_point():
+            vector = multihot_to_indices(vector)
         return vector
+
+    def embed_indices(self, title):
+        """
+        Embeds the title's categories as the indices of the ones in their multi-hot vector
+        :param title: The title
+        :return: int64 tensor of the indices
+        """
+        return super(CategoriesMultiHot, self).embed(title)
+
+    def embed_batch_indices(self, titles):
+        """
+        Embeds the titles' categories as bags of indices
+        :param titles: Sequence of titles
+        :return: (indices, offsets) - the concatenated indices of the titles, and the offset of each title's indices
+        """
+        return indices_to_bags([self.embed_indices(title) for title in titles])
+
+    def embed(self, title):
+        return indices_to_multihot(self.embed_indices(title), len(self._categories_map))
+
+    @staticmethod
+    def _encode_vector(vector):
+        return encode_vector(vector, dtype=INDICES_DTYPE)
+
+    def _decode_vector(self, vector):
+        vector = super(CategoriesMultiHot, self)._decode_vector(vector)
+        # Categories used to be saved as multi-hot vectors
+        return multihot_to_indices(vector) if vector.is_floating_point() else vector.long()
+
+    def _embed(self, page):
+        return torch.tensor(sorted({self._categories_map[category] for category in page[CATEGORIES]
+                                    if category in self._categories_map}), dtype=torch.long)
@@ -0,0 +1,89 @@
+import torch
+
+from wikisearch.consts.mongo import ENTRY_TITLE
+from wikisearch.embeddings.categories_multihot import CategoriesMultiHot
+from wikisearch.embeddings.embedding import Embedding
+
+
+class CompositeEmbedding(Embedding):
+    """
+    Base class for embeddings which are the concatenation of other embeddings. The parts keep their own
+    embeddings, and the concatenated ones are assembled from them on demand, so they are not held twice.
+    When the last part is the categories, the embedding can also be given sparsely: the dense parts, and the
+    categories' indices (see wikisearch.utils.sparse_categories)
+    """
+
+    def _set_parts(self, *parts):
+        """
+        :param parts: The embedders of the parts, by their order in the concatenation
+        """
+        self._parts = parts
+        self._categories_part = parts[-1] if isinstance(parts[-1], CategoriesMultiHot) else None
+        self._dense_parts = parts[:-1] if self._categories_part is not None else parts
+
+    @property
+    def sparse_categories(self):
+        """
+        Whether the embedding can be given sparsely, which the distance models with categories take instead of
+        the concatenated embedding. Embeddings which have their own store are given from it
+        """
+        return self._categories_part is not None and self._store is None
+
+    def embed(self, title):
+        """
+        Embeds the title from the composite's own store, or assembles its embedding from the parts' embeddings
+        :param title: The title
+        :return: The concatenated embedding
+        """
+        if self._store is not None:
+            vector = self._store.get(title)
+            if vector is not None:
+                return torch.from_numpy(vector).to(self._device)
+        return torch.cat([part.embed(title) for part in self._parts], dim=0)
+
+    def embed_batch(self, titles):
+        """
+        Embeds the titles' texts. Unless the composite has its own store, each part gathers its embeddings as one
+        block, and the blocks are concatenated
+        :param titles: Sequence of titles to embed their texts
+        :return: Matrix whose i'th row is the embedded text of titles[i]
+        """
+        if self._store is not None:
+            return super(CompositeEmbedding, self).embed_batch(titles)
+        return torch.cat([part.embed_batch(titles) for part in self._parts], dim=1)
+
+    def embed_nodes(self, nodes):
+        """
+        Embeds graph nodes. Unless the composite has its own store, each part gathers its embeddings as one block,
+        and the blocks are concatenated
+        :param nodes: Sequence of graph nodes
+        :return: Matrix whose i'th row is the embedding of nodes[i]
+        """
+        if self._store is not None:
+            return super(CompositeEmbedding, self).embed_nodes(nodes)
+        return torch.cat([part.embed_nodes(nodes) for part in self._parts], dim=1)
+
+    def embed_batch_sparse(self, titles):
+        """
+        Embeds the titles sparsely, in the form the distance models with categories take
+        :param titles: Sequence of titles
+        :return: (dense parts, categories indices, categories offsets) - matrix whose i'th row is the concatenation
+        of the dense parts' embeddings of titles[i], and the bags of the titles' categories indices
+        """
+        dense_parts = torch.cat([part.embed_batch(titles) for part in self._dense_parts], dim=1)
+        indices, offsets = self._categories_part.embed_batch_indices(titles)
+        return dense_parts, indices.to(self._device), offsets.to(self._device)
+
+    def embed_nodes_sparse(self, nodes):
+        """
+        Embeds graph nodes sparsely (see embed_batch_sparse). The dense parts are gathered by the nodes' ids when
+        their stores are ordered as the nodes' compact graph
+        :param nodes: Sequence of graph nodes
+        :return: (dense parts, categories indices, categories offsets)
+        """
+        dense_parts = torch.cat([part.embed_nodes(nodes) for part in self._dense_parts], dim=1)
+        indices, offsets = self._categories_part.embed_batch_indices([node.title for node in nodes])
+        return dense_parts, indices.to(self._device), offsets.to(self._device)
+
+    def _embed(self, page):
+        return torch.cat([part.embed(page[ENTRY_TITLE]) for part in self._parts], dim=0)
@@ -1,5 +1,5 @@
 import datetime
-import pickle
+import os
 import time
 from abc import ABCMeta, abstractmethod
 
@@ -7,13 +7,21 @@ import torch
 
 from wikisearch.consts.embeddings import EMBEDDING_VECTOR_SIZE
 from wikisearch.consts.mongo import WIKI_LANG, ENTRY_ID, PAGES, ENTRY_TITLE, ENTRY_EMBEDDING
+from wikisearch.consts.paths import PATH_TO_EMBEDDINGS_STORES
 from wikisearch.utils.mongo_handler import MongoHandler
+from wikisearch.utils.vector_encoding import encode_vector, decode_vector
+from wikisearch.utils.vector_store import VectorStore, STORE_META
 
 
 class Embedding(metaclass=ABCMeta):
     """
     Base class for representing an embedding type
     """
+    # Whether to load the whole embeddings collection to memory when the embedder is created. Processes which only
+    # compute embeddings (see embed_the_database.py) don't need it
+    preload_embeddings = True
+    # Whether the embedding can be given sparsely, with the categories as indices (see CompositeEmbedding)
+    sparse_categories = False
 
     def __init__(self, save_to_db=True, db_prefix=""):
         start = time.time()
@@ -22,26 +30,58 @@ class Embedding(metaclass=ABCMeta):
         self._device = "cuda" if torch.cuda.is_available() else "cpu"
         self._mongo_handler_pages = MongoHandler(WIKI_LANG, PAGES)
         self._mongo_handler_embeddings = MongoHandler(WIKI_LANG, self.type.lower() + db_prefix)
-        self._cached_embeddings = {doc[ENTRY_TITLE]: self._decode_vector(doc[ENTRY_EMBEDDING])
-                                   for doc in self._mongo_handler_embeddings.get_all_documents()}
+        self.store_name = self.type.lower() + db_prefix
+        self._store = self._load_store()
+        # When there's a store, only embeddings which are not in it are cached in memory
+        self._cached_embeddings = {} if self._store is not None or not self.preload_embeddings else \
+            {doc[ENTRY_TITLE]: self._decode_vector(doc[ENTRY_EMBEDDING])
+             for doc in self._mongo_handler_embeddings.get_all_documents()}
         print(f"-TIME- Took {time.time() - start:2f}s to load {self.__class__.__name__} embedder")
 
+    def get_store_path(self):
+        """
+        Gets the path of the embeddings store (see scripts/build_embeddings_stores.py). The store is named as the
+        embeddings' collection
+        :return: The store's path, or None if the stores' directory is not configured
+        """
+        return os.path.join(PATH_TO_EMBEDDINGS_STORES, self.store_name) if PATH_TO_EMBEDDINGS_STORES else None
+
+    def _load_store(self):
+        """
+        Loads the embeddings store, memory-mapped, if exists
+        :return: The VectorStore of the embeddings, or None if doesn't exist
+        """
+        store_path = self.get_store_path()
+        if store_path is None or not os.path.exists(os.path.join(store_path, STORE_META)):
+            return None
+        return VectorStore.load(store_path)
+
+    @property
+    def store(self):
+        """
+        The VectorStore of the embeddings, or None if there's no store
+        """
+        return self._store
+
     def _load_embedding(self, title):
         """
-        Loads the title's embedding from the database. If doesn't exist returns None
+        Loads the title's embedding from the store or the database. If doesn't exist returns None
         :param title: the title to search its embedding in the database
         :return: the title's embedding, or None if doesn't exist
         """
+        if self._store is not None:
+            vector = self._store.get(title)
+            if vector is not None:
+                # A view on the store's row, which is not copied
+                return torch.from_numpy(vector)
         # Check if vector is cached in memory
         vector = self._cached_embeddings.get(title)
         if vector is not None:
-            # Don't need to send to device, because _decode_vector already does it
             return vector
         page = self._mongo_handler_embeddings.get_page(title, {"title": True, ENTRY_EMBEDDING: True})
         if page:
             vector = page.get(ENTRY_EMBEDDING)
             if vector is not None:
-                # Don't need to send to device, because _decode_vector already does it
                 decoded_vector = self._decode_vector(vector)
                 # Cache in memory, for next use
                 self._cached_embeddings[title] = decoded_vector
@@ -77,6 +117,42 @@ class Embedding(metaclass=ABCMeta):
         self._store_embedding(page[ENTRY_ID], title, embedded_vector)
         return embedded_vector.to(self._device)
 
+    def embed_batch(self, titles):
+        """
+        Embeds the titles' texts. Embeddings which are in the store are gathered from it as one block
+        :param titles: Sequence of titles to embed their texts
+        :return: Matrix whose i'th row is the embedded text of titles[i]
+        """
+        if self._store is None:
+            return torch.stack([self.embed(title) for title in titles])
+        return self._gather_rows([self._store.get_row(title) for title in titles], titles.__getitem__)
+
+    def embed_nodes(self, nodes):
+        """
+        Embeds graph nodes. Embeddings which are in the store are gathered from it as one block, by the nodes' ids
+        when the store is ordered as the nodes' compact graph
+        :param nodes: Sequence of graph nodes
+        :return: Matrix whose i'th row is the embedding of nodes[i]
+        """
+        if self._store is None:
+            return self.embed_batch([node.title for node in nodes])
+        return self._gather_rows(self._store.get_nodes_rows(nodes), lambda i: nodes[i].title)
+
+    def _gather_rows(self, rows, get_title):
+        """
+        Gathers embeddings from the store. Embeddings which are not in the store are embedded one by one
+        :param rows: The rows of the embeddings in the store, where a missing embedding's row is None
+        :param get_title: Function which gets the title of the i'th embedding
+        :return: Matrix of the embeddings
+        """
+        missing = [i for i, row in enumerate(rows) if row is None]
+        if not missing:
+            return torch.from_numpy(self._store.gather(rows)).to(self._device)
+        vectors = torch.from_numpy(self._store.gather([0 if row is None else row for row in rows]))
+        for i in missing:
+            vectors[i] = self.embed(get_title(i))
+        return vectors.to(self._device)
+
     @abstractmethod
     def get_metadata(self):
         """
@@ -95,15 +171,16 @@ class Embedding(metaclass=ABCMeta):
         :param vector: The vector to encode
         :return: The encoded vector
         """
-        return pickle.dumps(vector)
+        return encode_vector(vector)
 
     def _decode_vector(self, vector):
         """
-        Decodes the vector's value in the database to its original representation
+        Decodes the vector's value in the database to its original representation. Both the binary format and
+        pickled tensors are supported
         :param vector: The vector to decode
         :return: The decoded vector
         """
-        return pickle.loads(vector)
+        return decode_vector(vector)
 
     @abstractmethod
     def _embed(self, page):
@@ -113,5 +190,20 @@ class Embedding(metaclass=ABCMeta):
         """
         raise NotImplementedError
 
-    def _zeros_if_empty_vector(self, vector):
-        return vector if len(vector.size()) else torch.zeros(sum(EMBEDDING_VECTOR_SIZE[self.type].values()), dtype=torch.float)
+    def _embed_many(self, pages):
+        """
+        Embeds a batch of pages. Embedding types which can embed many pages faster than one at a time override it
+        :param pages: List of pages
+        :return: List of the pages' embeddings
+        """
+        return [self._embed(page) for page in pages]
+
+    def _mean_words_vectors(self, words_vectors):
+        """
+        Averages the words' vectors
+        :param words_vectors: Matrix of the words' vectors
+        :return: The mean vector, or a zeros vector if there are no words
+        """
+        if not len(words_vectors):
+            return torch.zeros(sum(EMBEDDING_VECTOR_SIZE[self.type].values()), dtype=torch.float)
+        return torch.from_numpy(words_vectors).mean(0)
@@ -1,13 +1,9 @@
-import string
 import time
 
-import gensim
-from nltk import word_tokenize
-from nltk.corpus import stopwords
-
-from scripts.utils import Cache
 from wikisearch.consts.paths import PATH_TO_PRETRAINED_FASTTEXT_MODEL
 from wikisearch.embeddings.embedding import Embedding
+from wikisearch.utils.tokenizer import Tokenizer
+from wikisearch.utils.word_vectors import gather_word_vectors, load_word_vectors
 
 
 class FastText(Embedding):
@@ -20,31 +16,36 @@ class FastText(Embedding):
         Load the embedding pre-trained model
         """
         super(FastText, self).__init__(save_to_db, db_prefix)
-        cache = Cache()
+        self._tokenizer = Tokenizer()
         start = time.time()
-        self._model = cache['fasttext_model']
-        if not self._model:
-            self._model = gensim.models.KeyedVectors.load_word2vec_format(PATH_TO_PRETRAINED_FASTTEXT_MODEL)
-            cache['fasttext_model'] = self._model
+        # The vectors are memory-mapped, and shared by all the processes which load them
+        self._vectors, self._word_index, vectors_metadata = load_word_vectors(PATH_TO_PRETRAINED_FASTTEXT_MODEL)
+        self._vectors_pruning = vectors_metadata.get('pruning')
         print(f"-TIME- Took {time.time() - start}s to load the pretrained model")
 
-    @staticmethod
-    def tokenize_text(text):
+    def tokenize_text(self, text):
         """
         Tokenizes the title's text by the embedding class
-        :param title: The title to tokenize its text
-        """
-        # Filters out external links
-        text = ' '.join([word for word in text.split() if "https://" not in word and "http://" not in word])
-        # Tokenize the text
-        text = word_tokenize(text)
-        # Removes stop words
-        stop_words = set(stopwords.words('english')) | {word.capitalize() for word in stopwords.words('english')}
-        # Removes punctuation from each word
-        punctuation = set(string.punctuation) | {"\"\""} | {'\'\''} | {'``'}
-        punctuation_and_stop_words = stop_words | punctuation
-        text = [word for word in text if word not in punctuation_and_stop_words]
-        return text
+        :param text: The text to tokenize
+        """
+        return self._tokenizer.tokenize(text)
+
+    def tokenize_many(self, texts):
+        """
+        Tokenizes texts, one by one. It has the interface of Word2Vec.tokenize_many, which tokenizes in batches
+        :param texts: Iterable of texts to tokenize
+        :return: Generator of the texts' lists of words, by the texts' order
+        """
+        tokenize = self._tokenizer.tokenize
+        return (tokenize(text) for text in texts)
+
+    def _embed_words(self, words):
+        """
+        Gathers the vectors of the words which have a vector
+        :param words: Iterable of words
+        :return: Matrix whose rows are the words' vectors, by the words' order
+        """
+        return gather_word_vectors(self._vectors, self._word_index, words)
 
     def get_metadata(self):
         """
@@ -57,4 +58,6 @@ class FastText(Embedding):
         return {
             'type': self.type,
             'vectors_filepath': PATH_TO_PRETRAINED_FASTTEXT_MODEL,
+            # The corpus the vectors were pruned by (see scripts/prune_word_vectors.py), or None
+            'vectors_pruning': self._vectors_pruning,
         }
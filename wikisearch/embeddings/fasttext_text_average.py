@@ -1,5 +1,3 @@
-import torch
-
 from wikisearch.consts.mongo import ENTRY_TEXT
 from wikisearch.embeddings import FastText
 
@@ -12,15 +10,12 @@ class FastTextTextAverage(FastText):
 
     def _embed(self, page):
         tokenized_text = self.tokenize_text(page[ENTRY_TEXT])
-        embedded_words = [self._model[tagged_word] for tagged_word in tokenized_text
-                          if tagged_word in self._model.__dict__['vocab']]
+        embedded_words = self._embed_words(tokenized_text)
 
         # Getting also the words without a vector representation
         # embedded_words, missing_vector_words = self._get_embedded_words_and_missing_vectors(tokenized_text)
 
-        torched_words_vectors = torch.Tensor(embedded_words)
-
-        return self._zeros_if_empty_vector(torch.mean(torched_words_vectors, 0))
+        return self._mean_words_vectors(embedded_words)
 
     def _get_embedded_words_and_missing_vectors(self, text):
         """
@@ -31,8 +26,8 @@ class FastTextTextAverage(FastText):
         embedded_words = []
         missing_vector_words = set()
         for word in text:
-            if word in self._model.__dict__['vocab']:
-                embedded_words.append(self._model[word])
+            if word in self._word_index:
+                embedded_words.append(self._vectors[self._word_index[word]])
             else:
                 missing_vector_words |= {word}
         print(f"-INFO- Found {len(missing_vector_words)} words without vector representation.\n"
@@ -1,14 +1,11 @@
-import string
 import time
 
-import corenlp
-import gensim
-from nltk.corpus import stopwords
-
-from scripts.utils import Cache
 from wikisearch.consts.paths import PATH_TO_PRETRAINED_WORD2VEC_MODEL
 from wikisearch.consts.pos_conversion import TREEBANK_TO_UNIVERSAL
 from wikisearch.embeddings import Embedding
+from wikisearch.utils.corenlp_pool import CoreNLPPool
+from wikisearch.utils.tokenizer import Tokenizer
+from wikisearch.utils.word_vectors import gather_word_vectors, load_word_vectors
 
 
 class Word2Vec(Embedding):
@@ -21,34 +18,43 @@ class Word2Vec(Embedding):
         Load the embedding pre-trained model
         """
         super(Word2Vec, self).__init__(save_to_db, db_prefix)
-        cache = Cache()
+        # Start the coreNLPServer separately
+        self._corenlp = CoreNLPPool(annotators="tokenize ssplit lemma pos".split())
+        self._filtered_words = Tokenizer().filtered_words
         start = time.time()
-        self._model = cache['word2vec_model']
-        if not self._model:
-            self._model = gensim.models.KeyedVectors.load_word2vec_format(PATH_TO_PRETRAINED_WORD2VEC_MODEL)
-            cache['word2vec_model'] = self._model
+        # The vectors are memory-mapped, and shared by all the processes which load them
+        self._vectors, self._word_index, vectors_metadata = load_word_vectors(PATH_TO_PRETRAINED_WORD2VEC_MODEL)
+        self._vectors_pruning = vectors_metadata.get('pruning')
         print(f"-TIME- Took {time.time() - start:.1f}s to load the pretrained model")
 
-    @staticmethod
-    def tokenize_text(text):
+    def tokenize_text(self, text):
         """
         Tokenizes the title's text by the embedding class
-        :param title: The title to tokenize its text
+        :param text: The text to tokenize
+        """
+        return next(self.tokenize_many([text]))
+
+    def tokenize_many(self, texts):
+        """
+        Tokenizes a batch of texts. The texts are annotated by the CoreNLP server in batches, concurrently
+        :param texts: Iterable of texts to tokenize
+        :return: Generator of the texts' lists of words, by the texts' order
         """
         # Filters out external links
-        text = ' '.join([word for word in text.split() if "https://" not in word and "http://" not in word])
-        # Start the coreNLPServer separately
-        with corenlp.CoreNLPClient(start_server=False, timeout=10000, annotators="tokenize ssplit lemma pos".split()) as client:
-            ann = client.annotate(text)
-        # Filters out stop words
-        stop_words = set(stopwords.words('english')) | {word.capitalize() for word in stopwords.words('english')}
-        # Removes punctuation from each word
-        punctuation = set(string.punctuation) | {"\"\""} | {'\'\''} | {'``'}
-        punctuation_and_stop_words = stop_words | punctuation
-        # Couple each word with its pos tag if the word isn't a stop word and isn't a punctuation
-        text = [f"{token.lemma}_{TREEBANK_TO_UNIVERSAL[token.pos]}" for sentence in ann.sentence
-                for token in sentence.token if token.lemma not in punctuation_and_stop_words]
-        return text
+        texts = (' '.join([word for word in text.split() if "https://" not in word and "http://" not in word])
+                 for text in texts)
+        for sentences in self._corenlp.annotate_many(texts):
+            # Couple each word with its pos tag if the word isn't a stop word and isn't a punctuation
+            yield [f"{token.lemma}_{TREEBANK_TO_UNIVERSAL[token.pos]}" for sentence in sentences
+                   for token in sentence.token if token.lemma not in self._filtered_words]
+
+    def _embed_words(self, words):
+        """
+        Gathers the vectors of the words which have a vector
+        :param words: Iterable of words
+        :return: Matrix whose rows are the words' vectors, by the words' order
+        """
+        return gather_word_vectors(self._vectors, self._word_index, words)
 
     def get_metadata(self):
         """
@@ -61,4 +67,6 @@ class Word2Vec(Embedding):
         return {
             'type': self.type,
             'vectors_filepath': PATH_TO_PRETRAINED_WORD2VEC_MODEL,
+            # The corpus the vectors were pruned by (see scripts/prune_word_vectors.py), or None
+            'vectors_pruning': self._vectors_pruning,
         }
@@ -1,10 +1,9 @@
-import numpy as np
 import torch
-from sklearn.cluster import k_means
 
-from wikisearch.consts.embeddings import KMEANS, EMBEDDING_VECTOR_SIZE
+from wikisearch.consts.embeddings import KMEANS, KMEANS_N_INIT, KMEANS_SEED, EMBEDDING_VECTOR_SIZE
 from wikisearch.consts.mongo import ENTRY_TEXT
 from wikisearch.embeddings import Word2Vec
+from wikisearch.utils.kmeans import embed_k_means_many
 
 
 class Word2VecTextKMeans(Word2Vec):
@@ -17,18 +16,12 @@ class Word2VecTextKMeans(Word2Vec):
         super(Word2VecTextKMeans, self).__init__(save_to_db=save_to_db, db_prefix=str(KMEANS))
 
     def _embed(self, page):
-        tokenized_text = self.tokenize_text(page[ENTRY_TEXT])
-        embedded_words = [self._model[tagged_word] for tagged_word in tokenized_text
-                          if tagged_word in self._model.__dict__['vocab']]
+        return self._embed_many([page])[0]
 
-        if len(embedded_words) > KMEANS:
-            mean_vectors, _, _ = k_means(embedded_words, KMEANS, n_init=10)
-            # Flatten vectors to one long vector
-            return torch.from_numpy(mean_vectors.reshape([-1])).float()
-
-        else:
-            mean_vectors = np.concatenate(embedded_words, axis=0) if len(embedded_words) else np.zeros(EMBEDDING_VECTOR_SIZE[self.type]["embed_dim"])
-            mean_vectors = np.pad(mean_vectors,
-                                  pad_width=(0, EMBEDDING_VECTOR_SIZE[self.type]["embed_dim"] - mean_vectors.size),
-                                  mode="constant", constant_values=0)
-            return torch.from_numpy(mean_vectors).float()
+    def _embed_many(self, pages):
+        # The pages are clustered together
+        words_vectors_list = [self._embed_words(tokenized_text)
+                              for tokenized_text in self.tokenize_many(page[ENTRY_TEXT] for page in pages)]
+        embeddings = embed_k_means_many(words_vectors_list, KMEANS, EMBEDDING_VECTOR_SIZE[self.type]["embed_dim"],
+                                        n_init=KMEANS_N_INIT, seed=KMEANS_SEED)
+        return [torch.from_numpy(embedding) for embedding in embeddings]
@@ -1,5 +1,3 @@
-import torch
-
 from wikisearch.consts.mongo import ENTRY_TITLE
 from wikisearch.embeddings import Word2Vec
 
@@ -7,12 +5,9 @@ from wikisearch.embeddings import Word2Vec
 class Word2VecTitle(Word2Vec):
     def _embed(self, page):
         tokenized_text = self.tokenize_text(page[ENTRY_TITLE])
-        embedded_words = [self._model[tagged_word] for tagged_word in tokenized_text
-                          if tagged_word in self._model.__dict__['vocab']]
+        embedded_words = self._embed_words(tokenized_text)
 
         # Getting also the words without a vector representation
         # embedded_words, missing_vector_words = self._get_embedded_words_and_missing_vectors(tokenized_text)
 
-        torched_words_vectors = torch.Tensor(embedded_words)
-
-        return self._zeros_if_empty_vector(torch.mean(torched_words_vectors, 0))
+        return self._mean_words_vectors(embedded_words)
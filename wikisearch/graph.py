@@ -1,5 +1,9 @@
+import array
 import time
 
+import numpy as np
+
+from wikisearch.compact_graph import CompactWikiGraph, transpose_csr
 from wikisearch.consts.mongo import *
 from wikisearch.graph_node import GraphNode
 from wikisearch.utils.mongo_handler import MongoHandler
@@ -10,13 +14,25 @@ class WikiGraph(dict):
     A graph containing all the wikipedia pages as nodes
     """
 
-    def __init__(self):
+    def __init__(self, documents=None, build_predecessors=False):
+        """
+        :param documents: Iterable of pages documents to build the graph from. If None, the pages are loaded
+        from the database
+        :param build_predecessors: Whether to build the in-links index now. Otherwise, it is built on first use of
+        get_node_predecessors
+        """
         super(WikiGraph, self).__init__()
         start = time.time()
         self._mongo_handler = MongoHandler(WIKI_LANG, PAGES)
         self._redirects = {}
+        self._source = None
+        self._nodes = None
+        self._predecessors_indptr, self._predecessors_indices = None, None
 
-        for entry in self._mongo_handler.get_all_documents():
+        if documents is None:
+            self._source = self._mongo_handler.get_collection_fingerprint()
+            documents = self._mongo_handler.get_all_documents()
+        for entry in documents:
             # Handle redirections by inserting into redirects dict
             if ENTRY_REDIRECT_TO in entry:
                 self._redirects[entry[ENTRY_TITLE]] = entry[ENTRY_REDIRECT_TO]
@@ -26,9 +42,25 @@ class WikiGraph(dict):
                                                       entry[ENTRY_TEXT], entry[ENTRY_LINKS], entry[ENTRY_CATEGORIES]
                 if title in self:
                     raise ValueError(f"More than 1 entry with title: '{title}'")
-                self[title] = GraphNode(title, pid, text, links, categories)
+                self[title] = GraphNode(title, pid, text, links, categories, node_id=len(self))
+        if build_predecessors:
+            self._build_predecessors_index()
         print(f"-TIME- Took {time.time() - start:.2f}s to load WikiGraph")
 
+    def _build_predecessors_index(self):
+        """
+        Builds the in-links index, kept as CSR arrays of the nodes' ids. Links are resolved the same as in
+        get_node_neighbors, so links to redirects are folded into the pages they redirect to
+        """
+        self._nodes = list(self.values())
+        indptr = np.zeros(len(self._nodes) + 1, dtype=np.int64)
+        indices = array.array('i')
+        for node in self._nodes:
+            indices.extend(neighbor.id for neighbor in self.get_node_neighbors(node))
+            indptr[node.id + 1] = len(indices)
+        self._predecessors_indptr, self._predecessors_indices = \
+            transpose_csr(indptr, np.array(indices, dtype=np.int32))
+
     def get_node(self, title):
         """
         Gets the wikipedia page with the given title
@@ -47,3 +79,39 @@ class WikiGraph(dict):
             node = self.get_node(link)
             if node:
                 yield node
+
+    def get_node_predecessors(self, node):
+        """
+        Gets the nodes which link to the node
+        :param node: The node to returns its predecessors
+        """
+        if self._predecessors_indptr is None:
+            self._build_predecessors_index()
+        start, end = self._predecessors_indptr[node.id], self._predecessors_indptr[node.id + 1]
+        for predecessor_id in self._predecessors_indices[start:end].tolist():
+            yield self._nodes[predecessor_id]
+
+    def save_snapshot(self, path):
+        """
+        Saves the graph to a snapshot directory, in the compact graph representation
+        :param path: Path of the snapshot directory
+        """
+        documents = [{ENTRY_TITLE: node.title, ENTRY_PID: node.pid, ENTRY_LINKS: list(node.neighbors)}
+                     for node in self.values()]
+        documents.extend({ENTRY_TITLE: title, ENTRY_REDIRECT_TO: redirect_to}
+                         for title, redirect_to in self._redirects.items())
+        compact_graph = CompactWikiGraph(documents)
+        compact_graph._source = self._source
+        compact_graph.save_snapshot(path)
+
+    @staticmethod
+    def load_snapshot(path, mmap=True, verify_source=True):
+        """
+        Loads a graph from a snapshot directory. Snapshots are kept in the compact graph representation, which has
+        the same API as WikiGraph
+        :param path: Path of the snapshot directory
+        :param mmap: Whether to memory-map the snapshot instead of reading it to memory
+        :param verify_source: Whether to check that the snapshot was built from the current data in the database
+        :return: The loaded CompactWikiGraph
+        """
+        return CompactWikiGraph.load_snapshot(path, mmap, verify_source)
@@ -3,20 +3,29 @@ class GraphNode:
     A Node in the wikipedia graph. Each node represents a page in wikipedia
     """
 
-    def __init__(self, title, pid, text, links, categories):
+    def __init__(self, title, pid, text, links, categories, node_id=None):
         """
         :param title: title of the entry, string
         :param pid: pageID, string
         :param text: text of the entry, string
         :param links: list of strings, which are titles of neighbors
         :param categories: list of strings, categories of the entry
+        :param node_id: integer id of the node in its graph
         """
+        self._id = node_id
         self._title = title
         self._pid = pid
         self._text = text
         self._links = links
         self._categories = categories
 
+    @property
+    def id(self):
+        """
+        The node's integer id in its graph
+        """
+        return self._id
+
     @property
     def title(self):
         """
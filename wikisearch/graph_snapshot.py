@@ -0,0 +1,185 @@
+import datetime
+import json
+import os
+
+import numpy as np
+
+SNAPSHOT_FORMAT = "wikisearch-graph-snapshot"
+SNAPSHOT_VERSION = 1
+SNAPSHOT_META = "meta.json"
+_ARRAYS = ["pids", "indptr", "indices", "titles_blob", "titles_offsets", "titles_order",
+           "redirects_blob", "redirects_offsets", "redirects_ids"]
+
+
+class StringTable:
+    """
+    A read-only table of strings, kept as one utf-8 bytes blob and the offsets of the strings in it, so it can be
+    memory-mapped from disk instead of holding a Python object per string
+    """
+
+    def __init__(self, blob, offsets):
+        """
+        :param blob: uint8 array of all the strings' utf-8 bytes, concatenated
+        :param offsets: int64 array, where string i is blob[offsets[i]:offsets[i + 1]]
+        """
+        self._blob = blob
+        self._offsets = offsets
+
+    @staticmethod
+    def from_strings(strings):
+        """
+        Encodes the strings into the (blob, offsets) arrays of a StringTable
+        :param strings: List of strings
+        :return: (blob, offsets) arrays
+        """
+        encoded_strings = [string.encode('utf-8') for string in strings]
+        offsets = np.zeros(len(encoded_strings) + 1, dtype=np.int64)
+        np.cumsum([len(encoded_string) for encoded_string in encoded_strings], out=offsets[1:])
+        blob = np.array(bytearray(b''.join(encoded_strings)), dtype=np.uint8)
+        return blob, offsets
+
+    def get_bytes(self, index):
+        return self._blob[self._offsets[index]:self._offsets[index + 1]].tobytes()
+
+    def __getitem__(self, index):
+        return self.get_bytes(index).decode('utf-8')
+
+    def __len__(self):
+        return len(self._offsets) - 1
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield self[index]
+
+    def equals(self, other):
+        """
+        Whether the table has the same strings, in the same order, as another StringTable
+        """
+        return np.array_equal(self._offsets, other._offsets) and np.array_equal(self._blob, other._blob)
+
+    def to_list(self):
+        """
+        Decodes all the strings at once, which is much faster than getting them one by one
+        :return: List of the strings
+        """
+        blob = self._blob.tobytes()
+        offsets = self._offsets.tolist()
+        return [blob[start:end].decode('utf-8') for start, end in zip(offsets, offsets[1:])]
+
+
+class SortedStringIndex:
+    """
+    A read-only mapping from strings to integers, looked up by binary search over the strings in sorted order.
+    Utf-8 bytes order is the same as Python's strings order, so the strings are compared as bytes
+    """
+
+    def __init__(self, table, values, order=None):
+        """
+        :param table: StringTable of the keys
+        :param values: The values, in the keys' sorted order
+        :param order: Permutation which sorts the table. If None, the table is already sorted
+        """
+        self._table = table
+        self._values = values
+        self._order = order
+
+    def _key_bytes(self, position):
+        return self._table.get_bytes(position if self._order is None else self._order[position])
+
+    def get(self, key, default=None):
+        key_bytes = key.encode('utf-8')
+        low, high = 0, len(self._table)
+        while low < high:
+            middle = (low + high) // 2
+            if self._key_bytes(middle) < key_bytes:
+                low = middle + 1
+            else:
+                high = middle
+        if low < len(self._table) and self._key_bytes(low) == key_bytes:
+            return int(self._values[low])
+        return default
+
+    def __contains__(self, key):
+        return self.get(key) is not None
+
+    def items(self):
+        for position in range(len(self._table)):
+            yield self._key_bytes(position).decode('utf-8'), int(self._values[position])
+
+    def __len__(self):
+        return len(self._table)
+
+
+def save_snapshot(path, titles, pids, indptr, indices, redirects, source=None):
+    """
+    Saves a compact graph to a snapshot directory
+    :param path: Path of the snapshot directory
+    :param titles: Sequence of the nodes' titles, indexed by the nodes' ids
+    :param pids: The nodes' pids array
+    :param indptr: The CSR row pointers array
+    :param indices: The CSR column indices array
+    :param redirects: Iterable of (redirect title, node id) pairs
+    :param source: Description of the database data the graph was built from, or None
+    """
+    os.makedirs(path, exist_ok=True)
+    titles = list(titles)
+    redirects = sorted(redirects)
+    titles_blob, titles_offsets = StringTable.from_strings(titles)
+    redirects_blob, redirects_offsets = StringTable.from_strings([title for title, _ in redirects])
+    arrays = {
+        "pids": np.asarray(pids, dtype=np.int64),
+        "indptr": np.asarray(indptr, dtype=np.int64),
+        "indices": np.asarray(indices, dtype=np.int32),
+        "titles_blob": titles_blob,
+        "titles_offsets": titles_offsets,
+        "titles_order": np.array(sorted(range(len(titles)), key=titles.__getitem__), dtype=np.int32),
+        "redirects_blob": redirects_blob,
+        "redirects_offsets": redirects_offsets,
+        "redirects_ids": np.array([node_id for _, node_id in redirects], dtype=np.int32),
+    }
+    for name, array in arrays.items():
+        np.save(os.path.join(path, name + ".npy"), array)
+
+    # Metadata is written last, so a snapshot which wasn't fully written can't be loaded
+    metadata = {
+        "format": SNAPSHOT_FORMAT,
+        "version": SNAPSHOT_VERSION,
+        "created": datetime.datetime.now().__str__(),
+        "num_nodes": len(titles),
+        "num_links": len(arrays["indices"]),
+        "num_redirects": len(redirects),
+        "source": source,
+    }
+    with open(os.path.join(path, SNAPSHOT_META), "w") as meta_file:
+        json.dump(metadata, meta_file, indent=2)
+
+
+def load_snapshot_metadata(path):
+    """
+    Loads the metadata of a snapshot, and checks that its format is supported
+    :param path: Path of the snapshot directory
+    :return: The snapshot's metadata dictionary
+    """
+    with open(os.path.join(path, SNAPSHOT_META)) as meta_file:
+        metadata = json.load(meta_file)
+    if metadata.get("format") != SNAPSHOT_FORMAT or metadata.get("version") != SNAPSHOT_VERSION:
+        raise ValueError(f"Unsupported graph snapshot in '{path}': format {metadata.get('format')}, "
+                         f"version {metadata.get('version')} (expected version {SNAPSHOT_VERSION})")
+    return metadata
+
+
+def load_snapshot(path, mmap=True):
+    """
+    Loads a snapshot's arrays
+    :param path: Path of the snapshot directory
+    :param mmap: Whether to memory-map the arrays instead of reading them to memory. Memory-mapped snapshots are
+    loaded instantly, and processes which load the same snapshot share its pages through the OS page cache
+    :return: (metadata, titles, title_to_id, redirects, pids, indptr, indices)
+    """
+    metadata = load_snapshot_metadata(path)
+    arrays = {name: np.load(os.path.join(path, name + ".npy"), mmap_mode="r" if mmap else None) for name in _ARRAYS}
+    titles = StringTable(arrays["titles_blob"], arrays["titles_offsets"])
+    title_to_id = SortedStringIndex(titles, arrays["titles_order"], arrays["titles_order"])
+    redirects = SortedStringIndex(StringTable(arrays["redirects_blob"], arrays["redirects_offsets"]),
+                                  arrays["redirects_ids"])
+    return metadata, titles, title_to_id, redirects, arrays["pids"], arrays["indptr"], arrays["indices"]
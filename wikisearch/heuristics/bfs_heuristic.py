@@ -8,3 +8,6 @@ class BFSHeuristic(Heuristic):
 
     def _calculate(self, curr_state, dest_state):
         return 0
+
+    def _calculate_batch(self, curr_states, dest_state):
+        return [0] * len(curr_states)
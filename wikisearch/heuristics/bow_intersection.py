@@ -2,6 +2,7 @@ import itertools
 from collections import defaultdict
 
 from wikisearch.heuristics.heuristic import Heuristic
+from wikisearch.utils.tokenizer import Tokenizer
 
 
 class BoWIntersection(Heuristic):
@@ -11,10 +12,17 @@ class BoWIntersection(Heuristic):
 
     def __init__(self, repeat=False):
         self._repeat = repeat
+        self._tokenizer = Tokenizer()
+        # The destination is the same for the whole query, so its text is tokenized once
+        self._dest_state = None
+        self._dest_state_text = None
 
     def calculate(self, curr_state, dest_state):
-        curr_state_text = curr_state.text
-        dest_state_text = dest_state.text
+        curr_state_text = self._tokenizer.tokenize(curr_state.text)
+        if dest_state != self._dest_state:
+            self._dest_state_text = self._tokenizer.tokenize(dest_state.text)
+            self._dest_state = dest_state
+        dest_state_text = self._dest_state_text
         if self._repeat:
             # Add a suffix to each word, so that same words are mapped to different words, to count
             # repetitions
@@ -26,6 +34,9 @@ class BoWIntersection(Heuristic):
         dest_words = set(dest_state_text)
         # curr_words_size = len(curr_words)
         dest_words_size = len(dest_words)
+        # A destination without words, like a title of stop words or punctuation, shares no words with any state
+        if dest_words_size == 0:
+            return 0
         # Divide by size of destination state because that is the state that is important and we're trying
         # to get to
         return len(curr_words & dest_words) / float(dest_words_size)
@@ -12,3 +12,9 @@ class CosineDistance(Heuristic):
         dest_embed = self._embedder.embed(dest_state.title)
         # We calculate 1 / cosine-similarity, because we want distance, which is the opposite of similarity
         return (curr_embed.norm() * dest_embed.norm()).item() / max(curr_embed.matmul(dest_embed).item(), self.eps)
+
+    def _calculate_batch(self, curr_states, dest_state):
+        curr_embeds = self._embedder.embed_nodes(curr_states)
+        dest_embed = self._embedder.embed(dest_state.title)
+        return ((curr_embeds.norm(dim=1) * dest_embed.norm()) /
+                curr_embeds.matmul(dest_embed).clamp(min=self.eps)).tolist()
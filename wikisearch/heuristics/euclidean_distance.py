@@ -11,3 +11,8 @@ class EuclideanDistance(Heuristic):
         curr_embed = self._embedder.embed(curr_state.title)
         dest_embed = self._embedder.embed(dest_state.title)
         return ((curr_embed - dest_embed) ** self.p).sum() ** (1 / self.p)
+
+    def _calculate_batch(self, curr_states, dest_state):
+        curr_embeds = self._embedder.embed_nodes(curr_states)
+        dest_embed = self._embedder.embed(dest_state.title)
+        return (((curr_embeds - dest_embed) ** self.p).sum(dim=1) ** (1 / self.p)).tolist()
@@ -21,6 +21,16 @@ class Heuristic(metaclass=ABCMeta):
         self._count += 1
         return self._calculate(curr_state, dest_state)
 
+    def calculate_batch(self, curr_states, dest_state):
+        """
+        Calculates the heuristic distances between each of the given states and the destination state
+        :param curr_states: List of current states
+        :param dest_state: The destination state
+        :return: List of the heuristic distances, by the order of the current states
+        """
+        self._count += len(curr_states)
+        return self._calculate_batch(curr_states, dest_state)
+
     @abstractmethod
     def _calculate(self, curr_state, dest_state):
         """
@@ -29,3 +39,12 @@ class Heuristic(metaclass=ABCMeta):
         :param dest_state: The destination state
         """
         raise NotImplementedError
+
+    def _calculate_batch(self, curr_states, dest_state):
+        """
+        Calculates the heuristic distances between each of the given states and the destination state. Heuristics
+        which can be vectorized should override it, by default the distances are calculated one by one
+        :param curr_states: List of current states
+        :param dest_state: The destination state
+        """
+        return [self._calculate(curr_state, dest_state) for curr_state in curr_states]
@@ -1,5 +1,7 @@
-from abc import ABCMeta
+from abc import ABCMeta, abstractmethod
 
+import torch
+import torch.nn.functional as F
 from torch import nn
 
 
@@ -9,6 +11,46 @@ class EmbeddingsDistance(nn.Module, metaclass=ABCMeta):
         self._dims = dims
         self._embed_dim = dims['embed_dim']
 
+    @abstractmethod
+    def encode(self, x):
+        """
+        Runs the siamese branch of the network on a batch of embeddings. The encoding of a page doesn't depend on
+        the other page, so it can be computed once and reused
+        :param x: Batch of embeddings
+        :return: Batch of encodings, to be fed to head
+        """
+        raise NotImplementedError
+
+    def head(self, x1, x2):
+        """
+        Runs the part of the network which follows the siamese branch on pairs of encodings
+        :param x1: Batch of encodings of the source pages
+        :param x2: Batch of encodings of the destination pages
+        :return: Batch of distances
+        """
+        x = torch.cat((x1, x2), dim=1)
+        x = F.relu(F.max_pool1d(self.batchnorm1(self.conv1(x)), 2))
+        x = F.relu(F.max_pool1d(self.batchnorm2(self.conv2(x)), 2))
+        x = self.fc1(x).squeeze(2)
+
+        return x
+
+    def forward(self, x1, x2):
+        return self.head(self.encode(x1), self.encode(x2))
+
+    def forward_pairs(self, x, x1_rows, x2_rows):
+        """
+        Runs the network on pairs of pages, where pages repeat in the batch. Each distinct page is encoded once,
+        and its encoding is selected for every pair it's in, so the gradients of all its pairs are accumulated
+        to it. When training, the siamese branch's batch normalization sees each distinct page once
+        :param x: Batch of embeddings of the distinct pages
+        :param x1_rows: int64 tensor of the rows in x of the source pages
+        :param x2_rows: int64 tensor of the rows in x of the destination pages
+        :return: Batch of distances
+        """
+        encodings = self.encode(x)
+        return self.head(encodings.index_select(0, x1_rows), encodings.index_select(0, x2_rows))
+
     def get_metadata(self):
         """
         Returns metadata relevant to the model
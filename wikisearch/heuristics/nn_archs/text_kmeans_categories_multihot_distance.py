@@ -3,6 +3,7 @@ import torch.nn as nn
 import torch.nn.functional as F
 
 from wikisearch.heuristics.nn_archs.embeddings_distance import EmbeddingsDistance
+from wikisearch.utils.sparse_categories import sparse_linear
 
 
 class TextKMeansCategoriesMultiHotDistance(EmbeddingsDistance):
@@ -35,24 +36,25 @@ class TextKMeansCategoriesMultiHotDistance(EmbeddingsDistance):
         assert linear_size == linear_size_float
         self.fc1 = nn.Linear(linear_size, 1)
 
-    def forward(self, x1, x2):
-        x1 = x1.unsqueeze(1)
-        x2 = x2.unsqueeze(1)
-        x1_embed, x1_categories = x1.split([self._embed_dim, self._categories_dim], dim=2)
-        x2_embed, x2_categories = x2.split([self._embed_dim, self._categories_dim], dim=2)
-        x1_embed, x2_embed = self.siamese_fc2(F.relu(self.siamese_fc1(x1_embed))), \
-                             self.siamese_fc2(F.relu(self.siamese_fc1(x2_embed)))
-        x1_categories = self.siamese_categories_fc2(F.relu(self.siamese_categories_fc1(x1_categories)))
-        x2_categories = self.siamese_categories_fc2(F.relu(self.siamese_categories_fc1(x2_categories)))
-        x1 = torch.cat((x1_embed, x1_categories), dim=2)
-        x2 = torch.cat((x2_embed, x2_categories), dim=2)
-        x1, x2 = F.relu(F.max_pool1d(self.siamese_batchnorm1(self.siamese_conv1(x1)), 2)),\
-                 F.relu(F.max_pool1d(self.siamese_batchnorm1(self.siamese_conv1(x2)), 2))
-        x1, x2 = F.relu(F.max_pool1d(self.siamese_batchnorm2(self.siamese_conv2(x1)), 2)),\
-                 F.relu(F.max_pool1d(self.siamese_batchnorm2(self.siamese_conv2(x2)), 2))
-        x = torch.cat((x1, x2), dim=1)
-        x = F.relu(F.max_pool1d(self.batchnorm1(self.conv1(x)), 2))
-        x = F.relu(F.max_pool1d(self.batchnorm2(self.conv2(x)), 2))
-        x = self.fc1(x).squeeze(2)
+    def encode(self, x):
+        """
+        :param x: Batch of the concatenated embeddings, or of sparse embeddings - (dense parts, categories indices,
+        categories offsets) (see CompositeEmbedding.embed_batch_sparse)
+        """
+        if isinstance(x, tuple):
+            x_embed, categories_indices, categories_offsets = x
+            x_embed = x_embed.unsqueeze(1)
+            # Sums only the weights of the pages' categories, which equals the layer on the multi-hot vectors
+            x_categories = sparse_linear(categories_indices, categories_offsets, self.siamese_categories_fc1)
+            x_categories = x_categories.unsqueeze(1)
+        else:
+            x = x.unsqueeze(1)
+            x_embed, x_categories = x.split([self._embed_dim, self._categories_dim], dim=2)
+            x_categories = self.siamese_categories_fc1(x_categories)
+        x_embed = self.siamese_fc2(F.relu(self.siamese_fc1(x_embed)))
+        x_categories = self.siamese_categories_fc2(F.relu(x_categories))
+        x = torch.cat((x_embed, x_categories), dim=2)
+        x = F.relu(F.max_pool1d(self.siamese_batchnorm1(self.siamese_conv1(x)), 2))
+        x = F.relu(F.max_pool1d(self.siamese_batchnorm2(self.siamese_conv2(x)), 2))
 
         return x
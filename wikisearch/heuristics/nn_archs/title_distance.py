@@ -1,4 +1,3 @@
-import torch
 import torch.nn as nn
 import torch.nn.functional as F
 
@@ -28,17 +27,10 @@ class TitleDistance(EmbeddingsDistance):
         assert linear_size == linear_size_float
         self.fc1 = nn.Linear(linear_size, 1)
 
-    def forward(self, x1, x2):
-        x1 = x1.unsqueeze(1)
-        x2 = x2.unsqueeze(1)
-        x1, x2 = self.siamese_fc1(x1), self.siamese_fc1(x2)
-        x1, x2 = F.relu(F.max_pool1d(self.siamese_batchnorm1(self.siamese_conv1(x1)), 2)),\
-                 F.relu(F.max_pool1d(self.siamese_batchnorm1(self.siamese_conv1(x2)), 2))
-        x1, x2 = F.relu(F.max_pool1d(self.siamese_batchnorm2(self.siamese_conv2(x1)), 2)),\
-                 F.relu(F.max_pool1d(self.siamese_batchnorm2(self.siamese_conv2(x2)), 2))
-        x = torch.cat((x1, x2), dim=1)
-        x = F.relu(F.max_pool1d(self.batchnorm1(self.conv1(x)), 2))
-        x = F.relu(F.max_pool1d(self.batchnorm2(self.conv2(x)), 2))
-        x = self.fc1(x).squeeze(2)
+    def encode(self, x):
+        x = x.unsqueeze(1)
+        x = self.siamese_fc1(x)
+        x = F.relu(F.max_pool1d(self.siamese_batchnorm1(self.siamese_conv1(x)), 2))
+        x = F.relu(F.max_pool1d(self.siamese_batchnorm2(self.siamese_conv2(x)), 2))
 
         return x
\ No newline at end of file
@@ -1,3 +1,5 @@
+import torch
+
 from .heuristic import Heuristic
 
 
@@ -6,13 +8,44 @@ class NNHeuristic(Heuristic):
     The NN Heuristic class
     """
 
-    def __init__(self, model, embedder):
+    def __init__(self, model, embedder, encodings=None):
+        """
+        :param model: The distance model
+        :param embedder: The embedder the model was trained with
+        :param encodings: VectorStore of the pages' encodings by the model (see scripts/encode_the_graph.py), or
+        None. Pages which are not in it are encoded online
+        """
         super(NNHeuristic, self).__init__()
         self._model = model
         self._embedder = embedder
+        self._encodings = encodings
+        self._device = next(model.parameters()).device
+        # The destination is the same for the whole query, so its encoding is computed once
+        self._dest_state = None
+        self._dest_encoding = None
+
+    def _encode(self, states):
+        if self._encodings is not None:
+            rows = self._encodings.get_nodes_rows(states)
+            if None not in rows:
+                return torch.from_numpy(self._encodings.gather(rows)).to(self._device)
+        # Categories are given to the model sparsely, when the embedder can
+        embeddings = self._embedder.embed_nodes_sparse(states) if self._embedder.sparse_categories else \
+            self._embedder.embed_nodes(states)
+        return self._model.encode(embeddings)
+
+    def _encode_destination(self, dest_state):
+        if dest_state != self._dest_state:
+            self._dest_encoding = self._encode([dest_state])
+            self._dest_state = dest_state
+        return self._dest_encoding
 
     def _calculate(self, curr_state, dest_state):
-        curr_embedding = self._embedder.embed(curr_state.title).unsqueeze(0)
-        dest_embedding = self._embedder.embed(dest_state.title).unsqueeze(0)
+        return self._calculate_batch([curr_state], dest_state)[0]
 
-        return self._model(curr_embedding, dest_embedding).round().int().item()
+    def _calculate_batch(self, curr_states, dest_state):
+        # Only the source branch and the head of the model run for each state
+        with torch.no_grad():
+            curr_encodings = self._encode(curr_states)
+            dest_encodings = self._encode_destination(dest_state).expand_as(curr_encodings)
+            return self._model.head(curr_encodings, dest_encodings).round().int().squeeze(1).tolist()
@@ -0,0 +1,102 @@
+import numpy as np
+
+from wikisearch.compact_graph import CompactWikiGraph
+
+# Number of sources run together: each node keeps one bit per source in a uint64 mask
+SOURCES_PER_RUN = 64
+# The distance of nodes which aren't reachable from the source. Distances are kept as uint8
+UNREACHABLE_DISTANCE = np.iinfo(np.uint8).max
+_BITS = np.arange(SOURCES_PER_RUN, dtype=np.uint64)
+
+
+class MultiSourceBFS:
+    """
+    Exact shortest distances from many sources at once (MS-BFS). Up to 64 sources advance together: each node has
+    a uint64 mask of the sources which visited it, and of the sources whose frontier it is in, so a level of all
+    the sources is one pass over the CSR arrays of a CompactWikiGraph
+    """
+
+    def __init__(self, graph):
+        """
+        :param graph: The CompactWikiGraph
+        """
+        if not isinstance(graph, CompactWikiGraph):
+            raise ValueError("Multi-source BFS requires a CompactWikiGraph")
+        self._graph = graph
+
+    def run(self, source_ids, max_distance=None):
+        """
+        Finds the distances from each source to every node
+        :param source_ids: The sources' node ids
+        :param max_distance: Distance after which to stop. Farther nodes are left UNREACHABLE_DISTANCE
+        :return: uint8 matrix whose [i, j] is the distance from source_ids[i] to node j
+        """
+        source_ids = np.asarray(source_ids, dtype=np.int64)
+        distances = np.empty((len(source_ids), len(self._graph)), dtype=np.uint8)
+        for start in range(0, len(source_ids), SOURCES_PER_RUN):
+            distances[start:start + SOURCES_PER_RUN] = \
+                self._run_batch(source_ids[start:start + SOURCES_PER_RUN], max_distance)
+        return distances
+
+    def pairs_distances(self, sources, destinations, max_distance=None):
+        """
+        Finds the distances of pairs of titles. Each distinct source is run once, 64 sources at a time
+        :param sources: Sequence of the pairs' source titles
+        :param destinations: Sequence of the pairs' destination titles
+        :param max_distance: Distance after which to stop
+        :return: uint8 array of the pairs' distances, UNREACHABLE_DISTANCE for pairs with no path (or with a title
+        which isn't in the graph)
+        """
+        source_ids = self._titles_to_ids(sources)
+        destination_ids = self._titles_to_ids(destinations)
+        distances = np.full(len(source_ids), UNREACHABLE_DISTANCE, dtype=np.uint8)
+        known = (source_ids >= 0) & (destination_ids >= 0)
+        unique_sources, pairs_sources = np.unique(source_ids[known], return_inverse=True)
+        # The pairs are sorted by their sources, so the pairs of each batch of sources are a contiguous slice
+        order = np.argsort(pairs_sources, kind='stable')
+        pairs_sources = pairs_sources[order]
+        known_pairs = np.flatnonzero(known)[order]
+        batches_bounds = np.searchsorted(pairs_sources, np.arange(0, len(unique_sources) + SOURCES_PER_RUN,
+                                                                  SOURCES_PER_RUN))
+        for batch_index, start in enumerate(range(0, len(unique_sources), SOURCES_PER_RUN)):
+            batch_distances = self._run_batch(unique_sources[start:start + SOURCES_PER_RUN], max_distance)
+            batch_pairs = slice(batches_bounds[batch_index], batches_bounds[batch_index + 1])
+            pairs = known_pairs[batch_pairs]
+            distances[pairs] = batch_distances[pairs_sources[batch_pairs] - start, destination_ids[pairs]]
+        return distances
+
+    def _titles_to_ids(self, titles):
+        node_ids = (self._graph.get_node_id(title) for title in titles)
+        return np.fromiter((-1 if node_id is None else node_id for node_id in node_ids), dtype=np.int64)
+
+    def _run_batch(self, source_ids, max_distance):
+        indptr, indices = self._graph.indptr, self._graph.indices
+        distances = np.full((len(source_ids), len(self._graph)), UNREACHABLE_DISTANCE, dtype=np.uint8)
+        visited = np.zeros(len(self._graph), dtype=np.uint64)
+        # Several sources may be the same node, so their bits are or-ed
+        np.bitwise_or.at(visited, source_ids, np.left_shift(np.uint64(1), _BITS[:len(source_ids)]))
+        frontier = visited.copy()
+        distances[np.arange(len(source_ids)), source_ids] = 0
+        distance = 0
+        while max_distance is None or distance < max_distance:
+            frontier_nodes = np.flatnonzero(frontier)
+            if not len(frontier_nodes):
+                break
+            distance += 1
+            if distance == UNREACHABLE_DISTANCE:
+                raise ValueError(f"Distances of {UNREACHABLE_DISTANCE} and more can't be kept")
+            # Each frontier node passes its sources' bits to its neighbors
+            starts = indptr[frontier_nodes]
+            lengths = indptr[frontier_nodes + 1] - starts
+            nodes_offsets = np.cumsum(lengths) - lengths
+            positions = np.repeat(starts - nodes_offsets, lengths) + np.arange(lengths.sum())
+            next_frontier = np.zeros_like(frontier)
+            np.bitwise_or.at(next_frontier, indices[positions], np.repeat(frontier[frontier_nodes], lengths))
+            # A node is in a source's next frontier only if that source hasn't visited it yet
+            next_frontier &= ~visited
+            visited |= next_frontier
+            # The nodes each source reached are found bit by bit, without a matrix of the reached nodes' bits
+            for source_row, bit in enumerate(_BITS[:len(source_ids)]):
+                distances[source_row, np.flatnonzero(next_frontier & (np.uint64(1) << bit))] = distance
+            frontier = next_frontier
+        return distances
@@ -0,0 +1,260 @@
+import csv
+import datetime
+import itertools
+import json
+import os
+
+import numpy as np
+
+from wikisearch import graph_snapshot
+from wikisearch.consts.mongo import CSV_SEPARATOR
+from wikisearch.graph_snapshot import StringTable
+
+PAIRS_DATASET_FORMAT = "wikisearch-pairs-dataset"
+PAIRS_DATASET_VERSION = 1
+PAIRS_DATASET_META = "meta.json"
+CSV_COLUMNS = ["source", "destination", "min_distance"]
+_ARRAYS = ["source_ids", "destination_ids", "min_distances"]
+_TITLES_ARRAYS = ["titles_blob", "titles_offsets"]
+
+# A pairs dataset is the binary form of a dataset CSV (source, destination, min_distance): a directory of
+# memory-mappable arrays of the pairs' int32 source and destination ids and uint8 distances. The ids are either
+# of the dataset's own titles table, or of the nodes of a graph snapshot, which the dataset references
+
+
+def is_pairs_dataset(path):
+    return os.path.exists(os.path.join(path, PAIRS_DATASET_META))
+
+
+def save_pairs(path, source_ids, destination_ids, min_distances, titles=None, snapshot_path=None):
+    """
+    Saves pairs to a pairs dataset directory
+    :param path: Path of the dataset directory
+    :param source_ids: The pairs' source ids
+    :param destination_ids: The pairs' destination ids
+    :param min_distances: The pairs' distances
+    :param titles: Sequence of the titles, indexed by the ids. Not given when the ids are of a graph snapshot
+    :param snapshot_path: Path of the graph snapshot whose nodes' ids are the ids, if titles aren't given
+    """
+    if (titles is None) == (snapshot_path is None):
+        raise ValueError("Either the titles or the graph snapshot of the ids should be given")
+    min_distances = np.asarray(min_distances)
+    if len(min_distances) and (min_distances.min() < 0 or min_distances.max() > np.iinfo(np.uint8).max):
+        raise ValueError(f"Distances should be between 0 and {np.iinfo(np.uint8).max}")
+    os.makedirs(path, exist_ok=True)
+    arrays = {
+        "source_ids": np.asarray(source_ids, dtype=np.int32),
+        "destination_ids": np.asarray(destination_ids, dtype=np.int32),
+        "min_distances": min_distances.astype(np.uint8),
+    }
+    if titles is not None:
+        arrays["titles_blob"], arrays["titles_offsets"] = StringTable.from_strings(list(titles))
+        titles_metadata = {"table": True, "num_titles": len(arrays["titles_offsets"]) - 1}
+    else:
+        snapshot_metadata = graph_snapshot.load_snapshot_metadata(snapshot_path)
+        titles_metadata = {"snapshot": os.path.abspath(snapshot_path), "created": snapshot_metadata["created"],
+                           "num_titles": snapshot_metadata["num_nodes"]}
+    for name, array in arrays.items():
+        np.save(os.path.join(path, name + ".npy"), array)
+
+    # Metadata is written last, so a dataset which wasn't fully written can't be loaded
+    metadata = {
+        "format": PAIRS_DATASET_FORMAT,
+        "version": PAIRS_DATASET_VERSION,
+        "created": datetime.datetime.now().__str__(),
+        "num_pairs": len(arrays["min_distances"]),
+        "titles": titles_metadata,
+    }
+    with open(os.path.join(path, PAIRS_DATASET_META), "w") as meta_file:
+        json.dump(metadata, meta_file, indent=2)
+
+
+def load_pairs(path, mmap=True):
+    """
+    Loads a pairs dataset's arrays
+    :param path: Path of the dataset directory
+    :param mmap: Whether to memory-map the arrays instead of reading them to memory
+    :return: (metadata, titles, source_ids, destination_ids, min_distances) - titles is the StringTable of the ids
+    """
+    with open(os.path.join(path, PAIRS_DATASET_META)) as meta_file:
+        metadata = json.load(meta_file)
+    if metadata.get("format") != PAIRS_DATASET_FORMAT or metadata.get("version") != PAIRS_DATASET_VERSION:
+        raise ValueError(f"Unsupported pairs dataset in '{path}': format {metadata.get('format')}, "
+                         f"version {metadata.get('version')} (expected version {PAIRS_DATASET_VERSION})")
+    mmap_mode = "r" if mmap else None
+    arrays = {name: np.load(os.path.join(path, name + ".npy"), mmap_mode=mmap_mode) for name in _ARRAYS}
+    titles_metadata = metadata["titles"]
+    if titles_metadata.get("table"):
+        titles = StringTable(*[np.load(os.path.join(path, name + ".npy"), mmap_mode=mmap_mode)
+                               for name in _TITLES_ARRAYS])
+    else:
+        snapshot_path = titles_metadata["snapshot"]
+        snapshot_metadata = graph_snapshot.load_snapshot_metadata(snapshot_path)
+        if snapshot_metadata["created"] != titles_metadata["created"]:
+            raise ValueError(f"Pairs dataset in '{path}' references graph snapshot '{snapshot_path}' created at "
+                             f"{titles_metadata['created']}, but the snapshot was created at "
+                             f"{snapshot_metadata['created']}")
+        titles = graph_snapshot.load_snapshot(snapshot_path, mmap)[1]
+    return metadata, titles, arrays["source_ids"], arrays["destination_ids"], arrays["min_distances"]
+
+
+def get_pairs_titles(titles, source_ids, destination_ids):
+    """
+    Gets the distinct titles of pairs of ids
+    :param titles: StringTable of the ids
+    :param source_ids: The pairs' source ids
+    :param destination_ids: The pairs' destination ids
+    :return: (titles, source_ids, destination_ids) - list of the distinct titles, and the int64 arrays of the
+    pairs' ids in it
+    """
+    used = np.zeros(len(titles), dtype=bool)
+    used[source_ids] = True
+    used[destination_ids] = True
+    ids = np.flatnonzero(used)
+    # The id of each title among the distinct titles
+    distinct_ids = np.cumsum(used) - 1
+    # Decoding all the titles at once is faster, when most of them are in the pairs
+    if len(ids) == len(titles):
+        pairs_titles = titles.to_list()
+    else:
+        pairs_titles = [titles[node_id] for node_id in ids.tolist()]
+    return pairs_titles, distinct_ids[source_ids], distinct_ids[destination_ids]
+
+
+class PairsTitles:
+    """
+    A read-only sequence of the titles of the pairs' ids, which decodes each title when it's accessed, so the titles
+    of a large dataset are not all held in memory
+    """
+    # Number of ids which are converted to Python integers at once, when iterating
+    _CHUNK_SIZE = 65536
+
+    def __init__(self, titles, ids):
+        """
+        :param titles: StringTable of the ids
+        :param ids: Array of the pairs' ids
+        """
+        self._titles = titles
+        self._ids = ids
+
+    def __getitem__(self, index):
+        return self._titles[int(self._ids[index])]
+
+    def __len__(self):
+        return len(self._ids)
+
+    def __iter__(self):
+        for chunk_start in range(0, len(self._ids), self._CHUNK_SIZE):
+            for title_id in self._ids[chunk_start:chunk_start + self._CHUNK_SIZE].tolist():
+                yield self._titles[title_id]
+
+
+def pairs_to_ids(sources, destinations):
+    """
+    Converts pairs of titles to pairs of ids of the distinct titles. Each distinct title gets an id by its first
+    appearance
+    :param sources: Sequence of the pairs' source titles
+    :param destinations: Sequence of the pairs' destination titles
+    :return: (titles, source_ids, destination_ids) - list of the distinct titles, and the int64 arrays of the ids
+    """
+    titles_ids = {}
+    ids = np.fromiter((titles_ids.setdefault(title, len(titles_ids))
+                       for title in itertools.chain(sources, destinations)),
+                      dtype=np.int64, count=len(sources) + len(destinations))
+    return list(titles_ids), ids[:len(sources)], ids[len(sources):]
+
+
+def read_csv_pairs(csv_path):
+    """
+    Reads a dataset CSV, without pandas
+    :param csv_path: Path of the CSV
+    :return: (sources, destinations, min_distances) - lists of the pairs' titles, and array of their distances
+    """
+    with open(csv_path, encoding="utf8", newline="") as csv_file:
+        reader = csv.reader(csv_file, delimiter=CSV_SEPARATOR)
+        columns = next(reader)
+        if columns != CSV_COLUMNS:
+            raise ValueError(f"Dataset '{csv_path}' has columns {columns}, instead of {CSV_COLUMNS}")
+        sources, destinations, min_distances = [], [], []
+        for source, destination, min_distance in reader:
+            sources.append(source)
+            destinations.append(destination)
+            min_distances.append(int(min_distance))
+    return sources, destinations, np.array(min_distances, dtype=np.int64)
+
+
+def create_csv_writer(csv_file):
+    """
+    Creates a writer of a dataset CSV's rows (source, destination, min_distance), as pandas writes them, and writes
+    the CSV's header
+    :param csv_file: The CSV's file, opened for writing with newline=""
+    :return: The csv.writer
+    """
+    writer = csv.writer(csv_file, delimiter=CSV_SEPARATOR, lineterminator="\n")
+    writer.writerow(CSV_COLUMNS)
+    return writer
+
+
+def write_csv_pairs(csv_path, sources, destinations, min_distances):
+    """
+    Writes a dataset CSV, as pandas writes it, without pandas
+    :param csv_path: Path of the CSV
+    :param sources: Sequence of the pairs' source titles
+    :param destinations: Sequence of the pairs' destination titles
+    :param min_distances: Sequence of the pairs' distances
+    """
+    with open(csv_path, "w", encoding="utf8", newline="") as csv_file:
+        create_csv_writer(csv_file).writerows(zip(sources, destinations,
+                                                  [int(min_distance) for min_distance in min_distances]))
+
+
+def read_pairs(path):
+    """
+    Reads a dataset, either a pairs dataset or a CSV, as titles. The titles of a pairs dataset are decoded when
+    they're accessed (see PairsTitles)
+    :param path: Path of the dataset
+    :return: (sources, destinations, min_distances) - sequences of the pairs' titles, and array of their distances
+    """
+    if not is_pairs_dataset(path):
+        return read_csv_pairs(path)
+    _, titles, source_ids, destination_ids, min_distances = load_pairs(path)
+    return PairsTitles(titles, source_ids), PairsTitles(titles, destination_ids), min_distances.astype(np.int64)
+
+
+def csv_to_pairs(csv_path, path, snapshot_path=None):
+    """
+    Converts a dataset CSV to a pairs dataset
+    :param csv_path: Path of the CSV
+    :param path: Path of the pairs dataset directory
+    :param snapshot_path: Path of a graph snapshot, whose nodes' ids are used instead of a titles table of the
+    dataset. Titles which are redirects are resolved to their pages
+    """
+    sources, destinations, min_distances = read_csv_pairs(csv_path)
+    titles, source_ids, destination_ids = pairs_to_ids(sources, destinations)
+    if snapshot_path is None:
+        save_pairs(path, source_ids, destination_ids, min_distances, titles=titles)
+        return
+
+    _, _, title_to_id, redirects, _, _, _ = graph_snapshot.load_snapshot(snapshot_path)
+    node_ids = []
+    for title in titles:
+        node_id = title_to_id.get(title)
+        node_id = redirects.get(title) if node_id is None else node_id
+        if node_id is None:
+            raise ValueError(f"'{title}' of dataset '{csv_path}' isn't in graph snapshot '{snapshot_path}'")
+        node_ids.append(node_id)
+    node_ids = np.array(node_ids, dtype=np.int64)
+    save_pairs(path, node_ids[source_ids], node_ids[destination_ids], min_distances, snapshot_path=snapshot_path)
+
+
+def pairs_to_csv(path, csv_path):
+    """
+    Converts a pairs dataset to a dataset CSV
+    :param path: Path of the pairs dataset directory
+    :param csv_path: Path of the CSV
+    """
+    _, titles, source_ids, destination_ids, min_distances = load_pairs(path)
+    # All the titles are written, so they're decoded at once
+    titles = titles.to_list()
+    write_csv_pairs(csv_path, [titles[source_id] for source_id in source_ids.tolist()],
+                    [titles[destination_id] for destination_id in destination_ids.tolist()], min_distances)
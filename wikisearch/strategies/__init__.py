@@ -1 +1,2 @@
 from .default_astar_strategy import DefaultAstarStrategy
+from .heap_astar_strategy import HeapAstarStrategy
@@ -0,0 +1,12 @@
+from wikisearch.astar_elements import AstarHeapSet
+from .default_astar_strategy import DefaultAstarStrategy
+
+
+class HeapAstarStrategy(DefaultAstarStrategy):
+    """
+    The A* classic strategy, where the open set is kept as a binary heap. Gives the same results as
+    DefaultAstarStrategy, with cheaper open set operations
+    """
+
+    def create_open_set(self):
+        return AstarHeapSet()
@@ -1,5 +1,7 @@
 from abc import ABCMeta, abstractmethod
 
+from wikisearch.astar_elements import AstarSet
+
 
 class Strategy(metaclass=ABCMeta):
     """
@@ -13,3 +15,9 @@ class Strategy(metaclass=ABCMeta):
         :param open_set: The states which are still relevant to walk by
         """
         raise NotImplementedError
+
+    def create_open_set(self):
+        """
+        Creates the set of the states which are still relevant to walk by, of the type the strategy works with
+        """
+        return AstarSet()
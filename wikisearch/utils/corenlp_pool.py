@@ -0,0 +1,137 @@
+import bisect
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+import corenlp
+import requests
+
+# Texts in the same annotate request are separated by an empty line, which CoreNLP's sentence splitter always
+# treats as a sentence break (ssplit.newlineIsSentenceBreak=two), so no sentence crosses two texts
+TEXTS_SEPARATOR = "\n\n"
+
+
+def _java_length(text):
+    """
+    The length of the text in Java chars (UTF-16 code units), which CoreNLP's characters offsets count
+    """
+    return len(text.encode('utf-16-le')) // 2
+
+
+class CoreNLPPool:
+    """
+    A long-lived pool of clients to a CoreNLP server, which is started separately. Texts are annotated in
+    batches: several texts are sent as one document per annotate request, and the requests are sent concurrently
+    from a thread pool, each thread with its own client
+    """
+
+    def __init__(self, annotators, endpoint="http://localhost:9000", num_threads=4, batch_size=16,
+                 max_batch_chars=50000, timeout=10000, retries=3, retry_delay=1.0):
+        """
+        :param annotators: List of the annotators to run
+        :param endpoint: The CoreNLP server's address
+        :param num_threads: Number of concurrent annotate requests
+        :param batch_size: Maximal number of texts in an annotate request
+        :param max_batch_chars: Maximal number of characters in an annotate request. Longer texts are sent alone
+        :param timeout: Timeout of an annotate request, in milliseconds
+        :param retries: Number of times to retry a request which timed out
+        :param retry_delay: Seconds to wait before the first retry, doubled on every retry
+        """
+        self._annotators = annotators
+        self._endpoint = endpoint
+        self._num_threads = num_threads
+        self._batch_size = batch_size
+        self._max_batch_chars = max_batch_chars
+        self._timeout = timeout
+        self._retries = retries
+        self._retry_delay = retry_delay
+        self._local = threading.local()
+        self._executor = ThreadPoolExecutor(num_threads)
+
+    def _get_client(self):
+        client = getattr(self._local, 'client', None)
+        if client is None:
+            client = corenlp.CoreNLPClient(start_server=False, endpoint=self._endpoint, timeout=self._timeout,
+                                           annotators=self._annotators)
+            self._local.client = client
+        return client
+
+    def _annotate(self, text):
+        """
+        Annotates the text, retrying if the request timed out
+        :param text: The text to annotate
+        :return: The annotated Document
+        """
+        for attempt in range(self._retries + 1):
+            try:
+                return self._get_client().annotate(text)
+            except (corenlp.TimeoutException, requests.exceptions.Timeout):
+                if attempt == self._retries:
+                    raise
+                time.sleep(self._retry_delay * 2 ** attempt)
+
+    def _annotate_batch(self, texts):
+        """
+        Annotates a batch of texts in one request
+        :param texts: List of the texts
+        :return: List of the sentences of each text
+        """
+        texts_sentences = [[] for _ in texts]
+        # Empty texts have no sentences, and are not sent
+        indices = [i for i, text in enumerate(texts) if text.strip()]
+        if not indices:
+            return texts_sentences
+
+        # The offset of each text in the joined document, to tell which text each sentence belongs to
+        starts = []
+        offset = 0
+        for i in indices:
+            starts.append(offset)
+            offset += _java_length(texts[i]) + len(TEXTS_SEPARATOR)
+        document = self._annotate(TEXTS_SEPARATOR.join(texts[i] for i in indices))
+        for sentence in document.sentence:
+            if not sentence.token:
+                continue
+            text_index = indices[bisect.bisect_right(starts, sentence.token[0].beginChar) - 1]
+            texts_sentences[text_index].append(sentence)
+        return texts_sentences
+
+    def _batches(self, texts):
+        batch = []
+        batch_chars = 0
+        for text in texts:
+            if batch and (len(batch) == self._batch_size or batch_chars + len(text) > self._max_batch_chars):
+                yield batch
+                batch = []
+                batch_chars = 0
+            batch.append(text)
+            batch_chars += len(text)
+        if batch:
+            yield batch
+
+    def annotate_many(self, texts):
+        """
+        Annotates the texts
+        :param texts: Iterable of texts
+        :return: Generator of the list of annotated sentences of each text, by the texts' order
+        """
+        # Requests are sent ahead, up to twice the number of threads
+        in_flight = deque()
+        for batch in self._batches(texts):
+            in_flight.append(self._executor.submit(self._annotate_batch, batch))
+            if len(in_flight) >= 2 * self._num_threads:
+                yield from in_flight.popleft().result()
+        while in_flight:
+            yield from in_flight.popleft().result()
+
+    def annotate(self, text):
+        """
+        Annotates the text
+        :param text: The text
+        :return: List of the text's annotated sentences
+        """
+        return self._annotate_batch([text])[0]
+
+    def close(self):
+        self._executor.shutdown()
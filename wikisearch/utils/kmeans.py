@@ -0,0 +1,174 @@
+import zlib
+
+import numpy as np
+
+
+def _points_rng(points, seed):
+    """
+    A random generator for clustering the points, seeded by their content, so a page gets the same clusters no
+    matter which pages it's clustered with
+    """
+    return np.random.default_rng([seed, zlib.crc32(np.ascontiguousarray(points).tobytes())])
+
+
+def _k_means_plus_plus(points, mask, squared_norms, uniforms):
+    """
+    Chooses initial centers by k-means++, for a batch of padded points sets at once
+    :param points: (B, N, d) array of the padded points
+    :param mask: (B, N) array, True for real points
+    :param squared_norms: (B, N) array of the points' squared norms
+    :param uniforms: (B, k) array of uniform samples, which decide the chosen points
+    :return: (B, k, d) array of the initial centers
+    """
+    batch_size, _, dim = points.shape
+    k = uniforms.shape[1]
+    batch_range = np.arange(batch_size)
+    counts = mask.sum(axis=1)
+    centers = np.empty((batch_size, k, dim), dtype=points.dtype)
+
+    # The first center is chosen uniformly, the rest with probability proportional to the squared distance from
+    # the nearest chosen center
+    chosen = np.minimum((uniforms[:, 0] * counts).astype(np.int64), counts - 1)
+    centers[:, 0] = points[batch_range, chosen]
+    closest_distances = None
+    for j in range(1, k):
+        distances = _squared_distances(points, squared_norms, centers[:, j - 1:j])[:, :, 0]
+        distances = np.where(mask, np.maximum(distances, 0), 0)
+        closest_distances = distances if closest_distances is None else np.minimum(closest_distances, distances)
+        cumulative_distances = np.cumsum(closest_distances, axis=1)
+        thresholds = uniforms[:, j] * cumulative_distances[:, -1]
+        chosen = np.minimum((cumulative_distances <= thresholds[:, None]).sum(axis=1), counts - 1)
+        centers[:, j] = points[batch_range, chosen]
+    return centers
+
+
+def _squared_distances(points, squared_norms, centers):
+    """
+    The squared distances between each point and each center, for a batch of padded points sets
+    :return: (B, N, k) array of the distances
+    """
+    return squared_norms[:, :, None] - 2 * np.matmul(points, centers.transpose(0, 2, 1)) + \
+        np.einsum('bkd,bkd->bk', centers, centers)[:, None, :]
+
+
+def _lloyd(points, mask, squared_norms, centers, tolerances, max_iter):
+    """
+    Runs Lloyd's iterations for a batch of padded points sets at once. Each set stops when it converges, and once
+    most of the sets converge the rest are compacted to a smaller batch
+    :return: (centers, inertias) - (B, k, d) array of the centers, and (B,) array of the clusterings' inertias
+    """
+    k = centers.shape[1]
+    weights = mask.astype(points.dtype)
+    final_centers = centers.copy()
+    # The sets which are still iterated, and their arrays
+    active = np.arange(len(points))
+    active_points, active_weights, active_norms, active_tolerances = points, weights, squared_norms, tolerances
+    converged = np.zeros(len(points), dtype=bool)
+    for _ in range(max_iter):
+        labels = _squared_distances(active_points, active_norms, centers).argmin(axis=2)
+        assignments = (labels[:, :, None] == np.arange(k)) * active_weights[:, :, None]
+        counts = assignments.sum(axis=1)
+        sums = np.matmul(assignments.transpose(0, 2, 1), active_points)
+        # Empty clusters keep their center, and so do sets which have already converged
+        new_centers = np.where(counts[:, :, None] > 0, sums / np.maximum(counts, 1)[:, :, None], centers)
+        new_centers[converged] = centers[converged]
+        converged |= ((new_centers - centers) ** 2).sum(axis=(1, 2)) <= active_tolerances
+        centers = new_centers
+        if converged.all():
+            break
+        if converged.mean() >= 0.5:
+            final_centers[active[converged]] = centers[converged]
+            remaining = ~converged
+            active, centers = active[remaining], centers[remaining]
+            active_points, active_weights = active_points[remaining], active_weights[remaining]
+            active_norms, active_tolerances = active_norms[remaining], active_tolerances[remaining]
+            converged = converged[remaining]
+    final_centers[active] = centers
+
+    distances = _squared_distances(points, squared_norms, final_centers)
+    inertias = (np.maximum(distances.min(axis=2), 0) * weights).sum(axis=1)
+    return final_centers, inertias
+
+
+def _k_means_batch(points_list, k, n_init, max_iter, tol, seed):
+    batch_size = len(points_list)
+    max_points = max(len(points) for points in points_list)
+    dim = points_list[0].shape[1]
+    points = np.zeros((batch_size, max_points, dim), dtype=np.result_type(*points_list))
+    mask = np.zeros((batch_size, max_points), dtype=bool)
+    uniforms = np.empty((n_init, batch_size, k))
+    tolerances = np.empty(batch_size)
+    for i, page_points in enumerate(points_list):
+        points[i, :len(page_points)] = page_points
+        mask[i, :len(page_points)] = True
+        uniforms[:, i] = _points_rng(page_points, seed).random((n_init, k))
+        # Same tolerance as scikit-learn: relative to the points' mean variance
+        tolerances[i] = np.mean(np.var(page_points, axis=0)) * tol
+    squared_norms = np.einsum('bnd,bnd->bn', points, points)
+
+    best_centers, best_inertias = None, None
+    for init in range(n_init):
+        centers = _k_means_plus_plus(points, mask, squared_norms, uniforms[init])
+        centers, inertias = _lloyd(points, mask, squared_norms, centers, tolerances, max_iter)
+        if best_centers is None:
+            best_centers, best_inertias = centers, inertias
+        else:
+            better = inertias < best_inertias
+            best_centers[better] = centers[better]
+            best_inertias[better] = inertias[better]
+    return best_centers
+
+
+def k_means_many(points_list, k, n_init=10, max_iter=300, tol=1e-4, seed=0, max_batch_points=100000):
+    """
+    Clusters many sets of points to k clusters each, by k-means with k-means++ seeding. The sets are clustered
+    together, padded to batches of similar sizes, so each Lloyd iteration is a few array operations for the whole
+    batch. The result of each set depends only on its points and the seed
+    :param points_list: List of (n_i, d) arrays of points, with n_i >= k
+    :param k: Number of clusters
+    :param n_init: Number of k-means++ initializations of each set, of which the one with the least inertia is kept
+    :param max_iter: Maximal number of Lloyd iterations
+    :param tol: Tolerance of the centers' shift to declare convergence, relative to the points' mean variance
+    :param seed: The random seed
+    :param max_batch_points: Maximal number of (padded) points which are clustered together
+    :return: List of the (k, d) arrays of the centers of each set
+    """
+    results = [None] * len(points_list)
+    # Sets of similar sizes are batched together, to waste less on padding
+    order = sorted(range(len(points_list)), key=lambda i: len(points_list[i]))
+    batch_start = 0
+    while batch_start < len(order):
+        batch_end = batch_start + 1
+        while batch_end < len(order) and \
+                len(points_list[order[batch_end]]) * (batch_end + 1 - batch_start) <= max_batch_points:
+            batch_end += 1
+        batch_indices = order[batch_start:batch_end]
+        centers = _k_means_batch([points_list[i] for i in batch_indices], k, n_init, max_iter, tol, seed)
+        for i, page_centers in zip(batch_indices, centers):
+            results[i] = page_centers.astype(points_list[i].dtype)
+        batch_start = batch_end
+    return results
+
+
+def embed_k_means_many(words_vectors_list, k, embed_dim, n_init=10, seed=0):
+    """
+    Embeds texts by the k-means of their words' vectors. Texts with no more than k words are embedded by their
+    words' vectors, padded with zeros
+    :param words_vectors_list: List of the (n_i, d) arrays of each text's words' vectors
+    :param k: Number of clusters
+    :param embed_dim: Size of the embedding, k * d
+    :param n_init: Number of k-means++ initializations
+    :param seed: The random seed
+    :return: List of the flat embeddings, of size embed_dim each
+    """
+    embeddings = [None] * len(words_vectors_list)
+    clustered = [i for i, words_vectors in enumerate(words_vectors_list) if len(words_vectors) > k]
+    centers = k_means_many([words_vectors_list[i] for i in clustered], k, n_init=n_init, seed=seed)
+    for i, text_centers in zip(clustered, centers):
+        # Flatten vectors to one long vector
+        embeddings[i] = text_centers.reshape([-1]).astype(np.float32)
+    for i, words_vectors in enumerate(words_vectors_list):
+        if embeddings[i] is None:
+            embeddings[i] = np.zeros(embed_dim, dtype=np.float32)
+            embeddings[i][:words_vectors.size] = words_vectors.reshape([-1])
+    return embeddings
@@ -40,6 +40,19 @@ class MongoHandler:
         updated_value = {"$set": page}
         self._collection.update_one(filter_title, updated_value, upsert=True)
 
+    def get_collection_fingerprint(self):
+        """
+        Describes the collection's data, to be able to tell later if it has changed
+        :return: dictionary with the database and collection names, and the collection's size
+        """
+        database = self._collection.database
+        stats = database.command('collstats', self._collection.name)
+        return {'database': database.name, 'collection': self._collection.name,
+                'documents_count': stats['count'], 'data_size': stats['size']}
+
+    def count_pages(self, filter):
+        return self._collection.count_documents(filter)
+
     def is_empty_collection(self):
         return self._collection.count_documents({}) == 0
 
@@ -0,0 +1,77 @@
+import torch
+
+# Categories are kept as the sorted indices of the page's categories, instead of their multi-hot vector, and a
+# batch of them as bags: the indices of all the pages, concatenated, and the offset of each page's indices
+
+
+def multihot_to_indices(vector):
+    """
+    Converts a multi-hot vector to the indices of its ones
+    :param vector: The multi-hot vector
+    :return: int64 tensor of the indices
+    """
+    return vector.nonzero().view(-1)
+
+
+def indices_to_multihot(indices, dim):
+    """
+    Converts indices to their multi-hot vector
+    :param indices: The indices
+    :param dim: Size of the vector
+    :return: The multi-hot vector
+    """
+    vector = torch.zeros(dim, dtype=torch.float, device=indices.device)
+    vector[indices] = 1
+    return vector
+
+
+def indices_to_bags(indices_list):
+    """
+    Concatenates the indices of a batch of pages to bags
+    :param indices_list: List of the indices tensors of the pages
+    :return: (indices, offsets) - the concatenated indices, and the offset of each page's indices in them
+    """
+    lengths = torch.tensor([len(indices) for indices in indices_list], dtype=torch.long)
+    offsets = torch.zeros(len(indices_list), dtype=torch.long)
+    torch.cumsum(lengths[:-1], dim=0, out=offsets[1:])
+    indices = torch.cat(indices_list) if indices_list else torch.zeros(0, dtype=torch.long)
+    return indices.long(), offsets.to(indices.device)
+
+
+def _bags_lengths(indices, offsets):
+    return torch.cat((offsets[1:], offsets.new_tensor([len(indices)]))) - offsets
+
+
+def gather_bags(indices, offsets, rows):
+    """
+    Gathers some of the bags, at once
+    :param indices: The concatenated indices of the bags
+    :param offsets: The offset of each bag's indices
+    :param rows: int64 tensor of the bags to gather
+    :return: (indices, offsets) of the gathered bags, by the rows' order
+    """
+    lengths = _bags_lengths(indices, offsets)[rows]
+    gathered_offsets = torch.zeros_like(lengths)
+    torch.cumsum(lengths[:-1], dim=0, out=gathered_offsets[1:])
+    # Each gathered index is at its bag's offset plus its position in the bag
+    positions = torch.repeat_interleave(offsets[rows] - gathered_offsets, lengths) + \
+        torch.arange(int(lengths.sum()), device=indices.device)
+    return indices[positions], gathered_offsets
+
+
+def sparse_linear(indices, offsets, linear):
+    """
+    Applies a linear layer to a batch of multi-hot vectors given as bags of indices. The layer's output for a
+    multi-hot vector is the sum of the weights' columns of its ones, plus the bias, so only those columns are
+    gathered, like in an EmbeddingBag with mode 'sum'
+    :param indices: The concatenated indices of the batch
+    :param offsets: The offset of each vector's indices
+    :param linear: The nn.Linear layer
+    :return: Batch of the layer's outputs
+    """
+    batch_size = len(offsets)
+    lengths = _bags_lengths(indices, offsets)
+    bags = torch.repeat_interleave(torch.arange(batch_size, device=indices.device), lengths)
+    output = torch.zeros(batch_size, linear.out_features, dtype=linear.weight.dtype, device=linear.weight.device)
+    output = output.index_add(0, bags, linear.weight.index_select(1, indices).t())
+    return output if linear.bias is None else output + linear.bias
@@ -0,0 +1,40 @@
+import string
+
+from nltk import word_tokenize
+from nltk.corpus import stopwords
+
+
+class Tokenizer:
+    """
+    Tokenizes texts to words, without stop words and punctuation. The filters are built once, when the tokenizer
+    is created
+    """
+
+    def __init__(self, language='english'):
+        """
+        :param language: The language of the stop words
+        """
+        stop_words = set(stopwords.words(language))
+        stop_words |= {word.capitalize() for word in stop_words}
+        punctuation = set(string.punctuation) | {"\"\""} | {'\'\''} | {'``'}
+        self._filtered_words = frozenset(stop_words | punctuation)
+
+    @property
+    def filtered_words(self):
+        """
+        The stop words and punctuation which are filtered out of the texts
+        """
+        return self._filtered_words
+
+    def tokenize(self, text):
+        """
+        Tokenizes the text
+        :param text: The text to tokenize
+        :return: List of the text's words
+        """
+        words = text.split()
+        # Filters out external links
+        if "http" in text:
+            words = [word for word in words if "https://" not in word and "http://" not in word]
+        filtered_words = self._filtered_words
+        return [word for word in word_tokenize(' '.join(words)) if word not in filtered_words]
@@ -0,0 +1,61 @@
+import pickle
+import warnings
+
+import numpy as np
+import torch
+from bson.binary import Binary
+
+from wikisearch.utils.sparse_categories import multihot_to_indices
+
+# Vectors are saved as raw little-endian float32 bytes
+VECTOR_DTYPE = '<f4'
+# Indices (like the categories of a page) are saved as raw little-endian int32 bytes
+INDICES_DTYPE = '<i4'
+
+
+def encode_vector(vector, dtype=VECTOR_DTYPE):
+    """
+    Encodes the vector to a value which can be saved in the database: its raw bytes, with their dtype and shape
+    :param vector: The vector (tensor or array) to encode
+    :param dtype: The dtype to save the vector's values as
+    :return: The encoded vector
+    """
+    array = np.ascontiguousarray(torch.as_tensor(vector).detach().cpu().numpy(), dtype=dtype)
+    return {'dtype': dtype, 'shape': list(array.shape), 'data': Binary(array.tobytes())}
+
+
+def is_pickled_vector(value):
+    """
+    Whether the vector's value in the database is a pickled tensor, as vectors were saved before the binary format
+    """
+    return not isinstance(value, dict)
+
+
+def decode_vector(value):
+    """
+    Decodes the vector's value in the database to a tensor. Binary vectors are decoded without copying their bytes,
+    so the returned tensor must not be modified in place
+    :param value: The encoded vector, either in the binary format or a pickled tensor
+    :return: The decoded tensor
+    """
+    if is_pickled_vector(value):
+        return pickle.loads(value)
+    array = np.frombuffer(value['data'], dtype=value['dtype']).reshape(value['shape'])
+    # The array is read-only, because it's a view on the document's bytes
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore', UserWarning)
+        return torch.from_numpy(array)
+
+
+def migrate_vector(value, indices=False):
+    """
+    Re-encodes a vector's value in the database to the binary format
+    :param value: The encoded vector, either in the binary format or a pickled tensor
+    :param indices: Whether the vector is a multi-hot vector, which is saved as the indices of its ones, like the
+    categories of CategoriesMultiHot
+    :return: The encoded vector
+    """
+    vector = decode_vector(value)
+    if not indices:
+        return encode_vector(vector)
+    return encode_vector(multihot_to_indices(vector) if vector.is_floating_point() else vector, dtype=INDICES_DTYPE)
@@ -0,0 +1,178 @@
+import datetime
+import json
+import os
+
+import numpy as np
+
+from wikisearch.compact_graph import CompactGraphNode
+from wikisearch.graph_snapshot import SortedStringIndex, StringTable
+
+STORE_FORMAT = "wikisearch-vector-store"
+STORE_VERSION = 1
+STORE_META = "meta.json"
+_VECTORS = "vectors.npy"
+_TITLES_ARRAYS = ["titles_blob", "titles_offsets", "titles_order"]
+
+
+class VectorStore:
+    """
+    A read-only store of vectors of wikipedia pages, kept as one contiguous float32 matrix whose row i is the
+    vector of the i'th title. The store is saved as a directory of .npy files, so it can be memory-mapped instead
+    of being read to memory
+    """
+
+    def __init__(self, vectors, titles, title_to_row, metadata=None, path=None):
+        """
+        :param vectors: The vectors matrix, where row i is the vector of titles[i]
+        :param titles: The titles of the rows
+        :param title_to_row: Mapping from title to its row
+        :param metadata: The store's metadata dictionary
+        :param path: Path of the store directory
+        """
+        self._vectors = vectors
+        self._titles = titles
+        self._title_to_row = title_to_row
+        self._metadata = metadata or {}
+        self._path = path
+        # The last graph whose node ids were found to be the store's rows
+        self._ordered_graph = None
+
+    @classmethod
+    def create(cls, path, titles, vector_shape, **metadata):
+        """
+        Creates a new store on disk, whose vectors are filled in place through the returned writable memory-map.
+        The store can be loaded only after finalize is called
+        :param path: Path of the store directory
+        :param titles: List of the titles of the rows
+        :param vector_shape: The shape of each vector
+        :param metadata: Additional metadata to keep in the store, like how the vectors were computed
+        :return: The new VectorStore
+        """
+        os.makedirs(path, exist_ok=True)
+        # An existing store in the path is invalidated until the new one is finalized
+        if os.path.exists(os.path.join(path, STORE_META)):
+            os.remove(os.path.join(path, STORE_META))
+        titles = list(titles)
+        titles_blob, titles_offsets = StringTable.from_strings(titles)
+        arrays = {
+            "titles_blob": titles_blob,
+            "titles_offsets": titles_offsets,
+            "titles_order": np.array(sorted(range(len(titles)), key=titles.__getitem__), dtype=np.int32),
+        }
+        for name, array in arrays.items():
+            np.save(os.path.join(path, name + ".npy"), array)
+        vectors = np.lib.format.open_memmap(os.path.join(path, _VECTORS), mode="w+", dtype=np.float32,
+                                            shape=(len(titles),) + tuple(vector_shape))
+        metadata = dict(metadata, num_vectors=len(titles), vector_shape=list(vector_shape))
+        return cls(vectors, titles, {title: row for row, title in enumerate(titles)}, metadata, path)
+
+    def finalize(self):
+        """
+        Flushes the vectors of a store which was created by create, and writes its metadata, so it can be loaded
+        """
+        self._vectors.flush()
+        # Metadata is written last, so a store which wasn't fully written can't be loaded
+        metadata = dict(self._metadata, format=STORE_FORMAT, version=STORE_VERSION,
+                        created=datetime.datetime.now().__str__())
+        with open(os.path.join(self._path, STORE_META), "w") as meta_file:
+            json.dump(metadata, meta_file, indent=2)
+
+    @classmethod
+    def load(cls, path, mmap=True):
+        """
+        Loads a store which was saved by create and finalize
+        :param path: Path of the store directory
+        :param mmap: Whether to memory-map the store instead of reading it to memory. The vectors are mapped
+        copy-on-write, so they can be wrapped by writable tensors without copying them
+        :return: The loaded VectorStore
+        """
+        with open(os.path.join(path, STORE_META)) as meta_file:
+            metadata = json.load(meta_file)
+        if metadata.get("format") != STORE_FORMAT or metadata.get("version") != STORE_VERSION:
+            raise ValueError(f"Unsupported vector store in '{path}': format {metadata.get('format')}, "
+                             f"version {metadata.get('version')} (expected version {STORE_VERSION})")
+        arrays = {name: np.load(os.path.join(path, name + ".npy"), mmap_mode="r" if mmap else None)
+                  for name in _TITLES_ARRAYS}
+        vectors = np.load(os.path.join(path, _VECTORS), mmap_mode="c" if mmap else None)
+        titles = StringTable(arrays["titles_blob"], arrays["titles_offsets"])
+        title_to_row = SortedStringIndex(titles, arrays["titles_order"], arrays["titles_order"])
+        return cls(vectors, titles, title_to_row, metadata, path)
+
+    @property
+    def vectors(self):
+        """
+        The vectors matrix
+        """
+        return self._vectors
+
+    @property
+    def titles(self):
+        """
+        The titles of the rows
+        """
+        return self._titles
+
+    @property
+    def metadata(self):
+        return self._metadata
+
+    def get_row(self, title):
+        """
+        Gets the row of the title's vector
+        :param title: The wikipedia page title
+        :return: The row, or None if the title is not in the store
+        """
+        return self._title_to_row.get(title)
+
+    def is_ordered_as(self, graph):
+        """
+        Whether the store's rows are the node ids of a compact graph: the store has the graph's titles, by the nodes'
+        order. The titles are compared once per graph
+        :param graph: The CompactWikiGraph
+        """
+        if graph is self._ordered_graph:
+            return True
+        graph_titles = graph.titles
+        if len(graph_titles) != len(self._titles):
+            return False
+        if isinstance(graph_titles, StringTable) and isinstance(self._titles, StringTable):
+            ordered = graph_titles.equals(self._titles)
+        else:
+            ordered = all(graph_title == title for graph_title, title in zip(graph_titles, self._titles))
+        if ordered:
+            self._ordered_graph = graph
+        return ordered
+
+    def get_nodes_rows(self, nodes):
+        """
+        Gets the rows of the graph nodes' vectors. When the nodes are of a CompactWikiGraph which the store is ordered
+        as (see scripts/build_embeddings_stores.py), their rows are their ids, and their titles aren't looked up
+        :param nodes: Sequence of nodes of one graph
+        :return: List of the rows, where the row of a node which is not in the store is None
+        """
+        if len(nodes) and isinstance(nodes[0], CompactGraphNode) and self.is_ordered_as(nodes[0].graph):
+            return [node.id for node in nodes]
+        return [self._title_to_row.get(node.title) for node in nodes]
+
+    def get(self, title):
+        """
+        Gets the title's vector, as a view on the vectors matrix
+        :param title: The wikipedia page title
+        :return: The vector, or None if the title is not in the store
+        """
+        row = self._title_to_row.get(title)
+        return None if row is None else self._vectors[row]
+
+    def gather(self, rows):
+        """
+        Gathers the vectors of the given rows into one block
+        :param rows: Sequence of rows
+        :return: Matrix whose i'th vector is the vector of rows[i]
+        """
+        return self._vectors[np.asarray(rows, dtype=np.int64)]
+
+    def __contains__(self, title):
+        return self._title_to_row.get(title) is not None
+
+    def __len__(self):
+        return len(self._vectors)
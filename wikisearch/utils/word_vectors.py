@@ -0,0 +1,112 @@
+import os
+import shutil
+import tempfile
+
+import numpy as np
+
+from wikisearch.utils.vector_store import VectorStore
+
+# Suffix of the vector store directory which pretrained vectors are converted to, next to their file
+WORD_VECTORS_STORE_SUFFIX = ".store"
+
+
+def get_word_index(keyed_vectors):
+    """
+    Gets the mapping from the words of pretrained vectors to their rows in the vectors matrix
+    :param keyed_vectors: gensim's KeyedVectors
+    :return: Dictionary from word to row
+    """
+    # gensim >= 4 keeps the mapping, older versions keep a vocabulary entry with the row of each word
+    if hasattr(keyed_vectors, 'key_to_index'):
+        return keyed_vectors.key_to_index
+    return {word: vocab.index for word, vocab in keyed_vectors.vocab.items()}
+
+
+def get_words_indices(word_index, words):
+    """
+    Maps the words to their rows in the vectors matrix, in one pass. Words without a vector are dropped
+    :param word_index: Dictionary from word to row
+    :param words: Iterable of words
+    :return: int64 array of the rows
+    """
+    get_index = word_index.get
+    return np.fromiter((index for index in map(get_index, words) if index is not None), dtype=np.int64)
+
+
+def gather_word_vectors(vectors, word_index, words):
+    """
+    Gathers the vectors of the words which have one, in a single fancy-index of the vectors matrix
+    :param vectors: The vectors matrix
+    :param word_index: Dictionary from word to row
+    :param words: Iterable of words
+    :return: Matrix whose rows are the words' vectors, by the words' order
+    """
+    return vectors[get_words_indices(word_index, words)]
+
+
+def get_word_vectors_store_path(pretrained_path):
+    """
+    Gets the path of the vector store which the pretrained vectors are converted to
+    :param pretrained_path: Path to the pretrained vectors, in word2vec format
+    """
+    return pretrained_path + WORD_VECTORS_STORE_SUFFIX
+
+
+def convert_word_vectors(pretrained_path, store_path):
+    """
+    Converts pretrained vectors in word2vec format to a vector store, whose rows are the words' vectors. The store
+    is written to a temporary directory which is then renamed, so processes which convert at the same time don't
+    see a partial store
+    :param pretrained_path: Path to the pretrained vectors, in word2vec format
+    :param store_path: Path of the store directory
+    """
+    import gensim
+
+    keyed_vectors = gensim.models.KeyedVectors.load_word2vec_format(pretrained_path)
+    word_index = get_word_index(keyed_vectors)
+    words = sorted(word_index, key=word_index.__getitem__)
+    temp_path = tempfile.mkdtemp(prefix=os.path.basename(store_path) + ".", dir=os.path.dirname(store_path) or None)
+    store = VectorStore.create(temp_path, words, keyed_vectors.vectors.shape[1:], source=pretrained_path)
+    store.vectors[:] = keyed_vectors.vectors
+    store.finalize()
+    try:
+        os.rename(temp_path, store_path)
+    except OSError:
+        # Another process has already converted the vectors
+        shutil.rmtree(temp_path)
+
+
+def load_word_vectors(pretrained_path):
+    """
+    Loads pretrained vectors, converting them to a vector store on the first load. The vectors matrix is
+    memory-mapped, so all the processes which load the same vectors share one copy of it
+    :param pretrained_path: Path to the pretrained vectors in word2vec format, or to a vector store of words'
+    vectors (like a pruned one, see prune_word_vectors)
+    :return: (vectors, word_index, metadata) - the vectors matrix, dictionary from word to row, and the store's
+    metadata
+    """
+    store_path = pretrained_path if os.path.isdir(pretrained_path) else get_word_vectors_store_path(pretrained_path)
+    if not os.path.exists(store_path):
+        print(f"-INFO- Converting '{pretrained_path}' to a vector store in '{store_path}'")
+        convert_word_vectors(pretrained_path, store_path)
+    store = VectorStore.load(store_path)
+    return store.vectors, {word: row for row, word in enumerate(store.titles.to_list())}, store.metadata
+
+
+def prune_word_vectors(vectors, word_index, words, store_path, **metadata):
+    """
+    Saves the vectors of only the given words to a new vector store, keeping their original order
+    :param vectors: The vectors matrix
+    :param word_index: Dictionary from word to row
+    :param words: Iterable of the words to keep. Words without a vector are ignored
+    :param store_path: Path of the pruned store directory
+    :param metadata: Additional metadata to keep in the store's pruning record, like the corpus it was pruned by
+    :return: Number of words in the pruned store
+    """
+    rows = np.unique(get_words_indices(word_index, set(words)))
+    index_word = {row: word for word, row in word_index.items()}
+    store = VectorStore.create(store_path, [index_word[row] for row in rows.tolist()], vectors.shape[1:],
+                               pruning=dict(metadata, num_words=len(rows), original_num_words=len(word_index)))
+    store.vectors[:] = vectors[rows]
+    store.finalize()
+    return len(rows)